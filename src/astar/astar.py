@@ -1,10 +1,14 @@
 #!/usr/bin/env python3
 
 from __future__ import annotations, barry_as_FLUFL
+from collections.abc import Callable, Iterable, Sequence
 from dataclasses import dataclass
+from time import perf_counter_ns
 
+from timing.profiling import profiled
 from timing.timing import timeit
 from heap.heap import GenericHeap
+from .masks import MOVE_TABLE, build_masks, get_delta_table
 import heapq
 
 @dataclass
@@ -45,36 +49,6 @@ def _get_return_path(n:PfNode) -> tuple[tuple[int, int], ...]:
     return tuple(path)
 
 
-def _get_valid_adj_pts(curr_node:PfNode, steps:dict[str, Point], blockers:tuple[Point, ...], col:int, row:int) -> dict[str, Point]:
-    children_dict:dict[str, Point] = {}
-    block_dict:dict[str, bool] = {
-        "t": False,
-        "r": False,
-        "b": False,
-        "l": False
-    }
-
-    for k in steps:
-        new_x:int = curr_node.pt.x + steps[k].x
-        new_y:int = curr_node.pt.y + steps[k].y
-
-        if new_x < 0 or new_x >= col or new_y < 0 or new_y >= row:
-            continue
-
-        child:Point = Point(new_x, new_y)
-        if child in blockers:
-            block_dict[k] = True
-            continue
-
-        if len(k) == 2:
-            if block_dict[k[0]] and block_dict[k[1]]:
-                continue
-
-        children_dict[k] = child
-
-    return children_dict
-
-
 def _get_index_in_heap(pt:Point, heap:GenericHeap[PfNode]) -> int:
     for i in range(heap.len()):
         node = heap.get_at_index(i)
@@ -102,46 +76,290 @@ def _cmp_func(a:PfNode, b:PfNode) -> bool:
     return a.f < b.f
 
 
+# Priority queue operations reported to an engine recorder, as (op, cell, key)
+# with cell = y * col + x
+QUEUE_PUSH:int = 0
+QUEUE_POP:int = 1
+QUEUE_DECREASE:int = 2
+
+
+def _make_square_heuristic(col:int) -> Callable[[int, int], int]:
+    def _square_cell(a:int, b:int) -> int:
+        c:int = a % col - b % col
+        d:int = a // col - b // col
+        return c * c + d * d
+
+    return _square_cell
+
+
+def _octile_xy(dx:int, dy:int) -> int:
+    # Exact cost of an unobstructed 10 / 15 path, admissible and consistent
+    dx = abs(dx)
+    dy = abs(dy)
+    if dx > dy:
+        return 10 * dx + 5 * dy
+
+    return 10 * dy + 5 * dx
+
+
+def _octile(col:int, a:int, b:int) -> int:
+    return _octile_xy(a % col - b % col, a // col - b // col)
+
+
+def _make_octile_heuristic(col:int) -> Callable[[int, int], int]:
+    def _octile_cell(a:int, b:int) -> int:
+        return _octile(col, a, b)
+
+    return _octile_cell
+
+
+def _check_pruning(pruning:Callable[[int, int], int]|None, costs:Sequence[int]|None) -> None:
+    # Goal-bounding tables come from the plain 10 / 15 distances, over a cost
+    # layer they would cut moves on the cheapest weighted path
+    if pruning is not None and costs is not None:
+        raise ValueError("Pruning tables assume unit costs and cannot be used with a terrain cost layer")
+
+
+def get_min_cost(costs:Sequence[int]) -> int:
+    # Smallest terrain cost, heuristics are scaled by it to stay admissible.
+    # Membership tests on a bytearray are memchr calls, so this stays cheap.
+    for cost in range(256):
+        if cost in costs:
+            return cost
+
+    return 1
+
+
+def _get_return_path_grid(col:int, parents:dict[int, int], end:int) -> tuple[tuple[int, int], ...]:
+    path:list[tuple[int, int]] = []
+
+    current:int = end
+    while current >= 0:
+        path.append((current % col, current // col))
+        current = parents[current]
+
+    return tuple(path)
+
+
+def _search_grid(col:int, row:int, grid:Sequence[int], start:tuple[int, int], end:tuple[int, int], heuristic:Callable[[int, int], int]|None = None, recorder:Callable[[int, int, int], None]|None = None, pruning:Callable[[int, int], int]|None = None, costs:Sequence[int]|None = None) -> tuple[tuple[int, int], ...]|None:
+    # grid is a flat row-major occupancy buffer, non-zero cells are blockers
+    return _search_masks(col, row, build_masks(col, row, grid), start, end, heuristic, recorder, pruning, costs)
+
+
+# SearchHandle.status
+SEARCHING:int = 0
+FOUND:int = 1
+NO_PATH:int = 2
+
+# Expansions between clock reads when a step has a time budget
+_CLOCK_STRIDE:int = 4
+
+
+class SearchHandle:
+    # The masks search, resumable: step() expands cells until the search
+    # ends or a budget runs out, and the open heap and the g / parent tables
+    # stay on the handle in between. _search_masks is one unbudgeted step,
+    # astar.sliced spreads handles over frames. masks and costs must not
+    # change while the handle runs.
+    def __init__(self, col:int, row:int, masks:Sequence[int], start:tuple[int, int], end:tuple[int, int], heuristic:Callable[[int, int], int]|None = None, recorder:Callable[[int, int, int], None]|None = None, pruning:Callable[[int, int], int]|None = None, costs:Sequence[int]|None = None) -> None:
+        _check_pruning(pruning, costs)
+        self.col:int = col
+        self.row:int = row
+        self.start:tuple[int, int] = start
+        self.end:tuple[int, int] = end
+        self.status:int = SEARCHING
+        self.path:tuple[tuple[int, int], ...]|None = None
+        self.expanded:int = 0
+        self.steps:int = 0
+
+        self._masks:Sequence[int] = masks
+        self._costs:Sequence[int]|None = costs
+        self._pruning:Callable[[int, int], int]|None = pruning
+        self._recorder:Callable[[int, int, int], None]|None = recorder
+        self._delta_table = get_delta_table(col)
+        self._heuristic:Callable[[int, int], int] = _make_square_heuristic(col) if heuristic is None else heuristic
+        self._h_scale:int = 1 if costs is None else get_min_cost(costs)
+
+        start_i:int = start[1] * col + start[0]
+        self._end_i:int = end[1] * col + end[0]
+        self._g_costs:dict[int, int] = {start_i: 0}
+        self._parents:dict[int, int] = {start_i: -1}
+        # Sets and dicts so memory follows the explored area, not the map size
+        self._closed:set[int] = set()
+        self._counter:int = 0
+        self._open_heap:list[tuple[int, int, int, int]] = [(self._heuristic(start_i, self._end_i) * self._h_scale, 0, 0, start_i)]
+        if recorder is not None:
+            recorder(QUEUE_PUSH, start_i, self._open_heap[0][0])
+
+    @property
+    def done(self) -> bool:
+        return self.status != SEARCHING
+
+    def step(self, max_expansions:int|None = None, max_ns:int|None = None) -> int:
+        # Expands cells until the search ends or a budget runs out, at least
+        # one cell per call so a step always makes progress. Returns status.
+        if self.status != SEARCHING:
+            return self.status
+
+        # Without budgets the loop runs to the end, as _search_masks
+        deadline:int = 0 if max_ns is None else perf_counter_ns() + max_ns
+        limit:int = -1 if max_expansions is None else max(max_expansions, 1)
+
+        col:int = self.col
+        masks:Sequence[int] = self._masks
+        costs:Sequence[int]|None = self._costs
+        recorder:Callable[[int, int, int], None]|None = self._recorder
+        pruning:Callable[[int, int], int]|None = self._pruning
+        delta_table = self._delta_table
+        heuristic:Callable[[int, int], int] = self._heuristic
+        h_scale:int = self._h_scale
+        end_i:int = self._end_i
+        g_costs:dict[int, int] = self._g_costs
+        parents:dict[int, int] = self._parents
+        closed:set[int] = self._closed
+        open_heap:list[tuple[int, int, int, int]] = self._open_heap
+        counter:int = self._counter
+        expanded:int = 0
+
+        self.steps += 1
+        try:
+            while len(open_heap) > 0:
+                if expanded == limit or (max_ns is not None and expanded > 0 and expanded % _CLOCK_STRIDE == 0 and perf_counter_ns() >= deadline):
+                    return SEARCHING
+
+                _, _, g, curr = heapq.heappop(open_heap)
+                if curr in closed or g > g_costs[curr]:
+                    continue
+
+                if recorder is not None:
+                    recorder(QUEUE_POP, curr, 0)
+
+                if curr == end_i:
+                    self.path = _get_return_path_grid(col, parents, end_i)
+                    self.status = FOUND
+                    self._release()
+                    return FOUND
+
+                closed.add(curr)
+                expanded += 1
+
+                mask:int = masks[curr]
+                if pruning is not None:
+                    mask &= pruning(curr, end_i)
+
+                for delta, cost in delta_table[mask]:
+                    child:int = curr + delta
+                    if child in closed:
+                        continue
+
+                    new_g:int = g + cost if costs is None else g + cost * costs[child]
+                    old_g:int|None = g_costs.get(child)
+                    if old_g is not None and old_g <= new_g:
+                        continue
+
+                    g_costs[child] = new_g
+                    parents[child] = curr
+                    counter += 1
+                    f:int = new_g + heuristic(child, end_i) * h_scale
+                    heapq.heappush(open_heap, (f, counter, new_g, child))
+
+                    if recorder is not None:
+                        recorder(QUEUE_PUSH if old_g is None else QUEUE_DECREASE, child, f)
+
+            self.status = NO_PATH
+            self._release()
+            return NO_PATH
+        finally:
+            self._counter = counter
+            self.expanded += expanded
+
+    def cancel(self) -> None:
+        if self.status == SEARCHING:
+            self.status = NO_PATH
+            self._release()
+
+    def _release(self) -> None:
+        # A finished handle may be kept around for its path, drop the tables
+        self._g_costs = {}
+        self._parents = {}
+        self._closed = set()
+        self._open_heap = []
+
+
+def _search_masks(col:int, row:int, masks:Sequence[int], start:tuple[int, int], end:tuple[int, int], heuristic:Callable[[int, int], int]|None = None, recorder:Callable[[int, int, int], None]|None = None, pruning:Callable[[int, int], int]|None = None, costs:Sequence[int]|None = None) -> tuple[tuple[int, int], ...]|None:
+    # masks holds the allowed-moves byte of every cell, see astar.masks, and
+    # pruning(cell, goal) can narrow it further (e.g. astar.bounds.GoalBounds).
+    # costs is an optional flat terrain layer, entering a cell multiplies the
+    # 10 / 15 step by its cost. pruning and costs don't mix, see _check_pruning.
+    handle:SearchHandle = SearchHandle(col, row, masks, start, end, heuristic, recorder, pruning, costs)
+    handle.step()
+    return handle.path
+
+
+@timeit
+@profiled
+def start_path_finding_grid(col:int, row:int, start:tuple[int, int], end:tuple[int, int], grid:Sequence[int], heuristic:Callable[[int, int], int]|None = None, recorder:Callable[[int, int, int], None]|None = None, pruning:Callable[[int, int], int]|None = None, costs:Sequence[int]|None = None) -> tuple[tuple[int, int], ...]|None:
+    return _search_grid(col, row, grid, start, end, heuristic, recorder, pruning, costs)
+
+
+@timeit
+@profiled
+def start_path_finding_masks(col:int, row:int, start:tuple[int, int], end:tuple[int, int], masks:Sequence[int], heuristic:Callable[[int, int], int]|None = None, recorder:Callable[[int, int, int], None]|None = None, pruning:Callable[[int, int], int]|None = None, costs:Sequence[int]|None = None) -> tuple[tuple[int, int], ...]|None:
+    return _search_masks(col, row, masks, start, end, heuristic, recorder, pruning, costs)
+
+
+def make_grid(col:int, row:int, blockers:Iterable[tuple[int, int]]) -> bytearray:
+    grid:bytearray = bytearray(col * row)
+    for x, y in blockers:
+        grid[y * col + x] = 1
+
+    return grid
+
+
 @timeit
-def start_path_finding(col:int, row:int, start:tuple[int, int], end:tuple[int, int], blockers:tuple[tuple[int, int], ...]) -> tuple[tuple[int, int], ...]|None:
+@profiled
+def start_path_finding(col:int, row:int, start:tuple[int, int], end:tuple[int, int], blockers:tuple[tuple[int, int], ...], heuristic:Callable[[Point, Point], int] = _square, recorder:Callable[[int, int, int], None]|None = None, masks:Sequence[int]|None = None, pruning:Callable[[int, int], int]|None = None, costs:Sequence[int]|None = None) -> tuple[tuple[int, int], ...]|None:
+    _check_pruning(pruning, costs)
     start_node:PfNode = PfNode(Point(start[0], start[1]))
     end_node:PfNode = PfNode(Point(end[0], end[1]))
-    blocker_pts:tuple[Point, ...] = tuple(Point(b[0], b[1]) for b in blockers)
-
-    steps:dict[str, Point] = {}
-    steps["t"] = Point(0, -1)
-    steps["r"] = Point(1, 0)
-    steps["b"] = Point(0, 1)
-    steps["l"] = Point(-1, 0)
-    steps["tr"] = Point(1,  -1)
-    steps["br"] = Point(1, 1)
-    steps["bl"] = Point(-1, 1)
-    steps["tl"] = Point(-1, -1)
+    if masks is None:
+        masks = build_masks(col, row, make_grid(col, row, blockers))
+    h_scale:int = 1 if costs is None else get_min_cost(costs)
 
     open_heap:GenericHeap = GenericHeap[PfNode]([start_node], _cmp_func)
     close_list:list[Point] = []
+    if recorder is not None:
+        recorder(QUEUE_PUSH, start[1] * col + start[0], start_node.f)
 
     while open_heap.len() > 0:
         curr_node:PfNode = open_heap.pop()
+        if recorder is not None:
+            recorder(QUEUE_POP, curr_node.pt.y * col + curr_node.pt.x, 0)
+
         if curr_node.pt == end_node.pt:
             return _get_return_path(curr_node)
 
         close_list.append(curr_node.pt)
 
-        valid_pts:dict[str, Point] = _get_valid_adj_pts(curr_node, steps, blocker_pts, col, row)
-        for key in valid_pts:
-            child_pt:Point = valid_pts[key]
+        curr_i:int = curr_node.pt.y * col + curr_node.pt.x
+        mask:int = masks[curr_i]
+        if pruning is not None:
+            mask &= pruning(curr_i, end[1] * col + end[0])
+
+        for key, dx, dy, _ in MOVE_TABLE[mask]:
+            child_pt:Point = Point(curr_node.pt.x + dx, curr_node.pt.y + dy)
 
             if child_pt in close_list:
                 continue
 
+            terrain:int = 1 if costs is None else costs[child_pt.y * col + child_pt.x]
             g:int = 0
             if len(key) == 2:
-                g = curr_node.g + 15
+                g = curr_node.g + 15 * terrain
             else:
-                g = curr_node.g + 10
+                g = curr_node.g + 10 * terrain
 
-            h:int = _square(child_pt, end_node.pt)
+            h:int = heuristic(child_pt, end_node.pt) * h_scale
             f:int = g + h
 
             existing_index:int = _get_index_in_heap(child_pt, open_heap)
@@ -153,54 +371,62 @@ def start_path_finding(col:int, row:int, start:tuple[int, int], end:tuple[int, i
                     node.f = f
                     node.parent = curr_node
                     open_heap.fix()
+                    if recorder is not None:
+                        recorder(QUEUE_DECREASE, child_pt.y * col + child_pt.x, f)
                 continue
 
             open_heap.push(PfNode(child_pt, curr_node, f, g, h))
+            if recorder is not None:
+                recorder(QUEUE_PUSH, child_pt.y * col + child_pt.x, f)
 
     return None
 
 
 @timeit
-def start_path_finding_heapq(col:int, row:int, start:tuple[int, int], end:tuple[int, int], blockers:tuple[tuple[int, int], ...]) -> tuple[tuple[int, int], ...]|None:
+@profiled
+def start_path_finding_heapq(col:int, row:int, start:tuple[int, int], end:tuple[int, int], blockers:tuple[tuple[int, int], ...], heuristic:Callable[[Point, Point], int] = _square, recorder:Callable[[int, int, int], None]|None = None, masks:Sequence[int]|None = None, pruning:Callable[[int, int], int]|None = None, costs:Sequence[int]|None = None) -> tuple[tuple[int, int], ...]|None:
+    _check_pruning(pruning, costs)
     start_node:PfNode = PfNode(Point(start[0], start[1]))
     end_node:PfNode = PfNode(Point(end[0], end[1]))
-    blocker_pts:tuple[Point, ...] = tuple(Point(b[0], b[1]) for b in blockers)
-
-    steps:dict[str, Point] = {}
-    steps["t"] = Point(0, -1)
-    steps["r"] = Point(1, 0)
-    steps["b"] = Point(0, 1)
-    steps["l"] = Point(-1, 0)
-    steps["tr"] = Point(1,  -1)
-    steps["br"] = Point(1, 1)
-    steps["bl"] = Point(-1, 1)
-    steps["tl"] = Point(-1, -1)
+    if masks is None:
+        masks = build_masks(col, row, make_grid(col, row, blockers))
+    h_scale:int = 1 if costs is None else get_min_cost(costs)
 
     open_heap:list[PfNode] = [start_node]
     heapq.heapify(open_heap)
     close_list:list[Point] = []
+    if recorder is not None:
+        recorder(QUEUE_PUSH, start[1] * col + start[0], start_node.f)
 
     while len(open_heap) > 0:
         curr_node:PfNode = heapq.heappop(open_heap)
+        if recorder is not None:
+            recorder(QUEUE_POP, curr_node.pt.y * col + curr_node.pt.x, 0)
+
         if curr_node.pt == end_node.pt:
             return _get_return_path(curr_node)
 
         close_list.append(curr_node.pt)
 
-        valid_pts:dict[str, Point] = _get_valid_adj_pts(curr_node, steps, blocker_pts, col, row)
-        for key in valid_pts:
-            child_pt:Point = valid_pts[key]
+        curr_i:int = curr_node.pt.y * col + curr_node.pt.x
+        mask:int = masks[curr_i]
+        if pruning is not None:
+            mask &= pruning(curr_i, end[1] * col + end[0])
+
+        for key, dx, dy, _ in MOVE_TABLE[mask]:
+            child_pt:Point = Point(curr_node.pt.x + dx, curr_node.pt.y + dy)
 
             if child_pt in close_list:
                 continue
 
+            terrain:int = 1 if costs is None else costs[child_pt.y * col + child_pt.x]
             g:int = 0
             if len(key) == 2:
-                g = curr_node.g + 15
+                g = curr_node.g + 15 * terrain
             else:
-                g = curr_node.g + 10
+                g = curr_node.g + 10 * terrain
 
-            h:int = _square(child_pt, end_node.pt)
+            h:int = heuristic(child_pt, end_node.pt) * h_scale
             f:int = g + h
 
             existing_node:PfNode|None = _get_node_from_open_heap(open_heap, child_pt)
@@ -211,8 +437,12 @@ def start_path_finding_heapq(col:int, row:int, start:tuple[int, int], end:tuple[
                     existing_node.f = f
                     existing_node.parent = curr_node
                     heapq.heapify(open_heap)
+                    if recorder is not None:
+                        recorder(QUEUE_DECREASE, child_pt.y * col + child_pt.x, f)
                 continue
 
             heapq.heappush(open_heap, PfNode(child_pt, curr_node, f, g, h))
+            if recorder is not None:
+                recorder(QUEUE_PUSH, child_pt.y * col + child_pt.x, f)
 
     return None
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+
+from __future__ import annotations
+from array import array
+from collections.abc import Iterable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+import os
+
+from timing.timing import timeit
+from .astar import _search_masks, make_grid
+from .bounded import _search_bounded
+from .masks import build_masks
+from .workers import attach_masks, get_worker_masks, share_masks
+
+# Per-worker node cap, set up once by _init_worker
+_worker_max_nodes:int|None = None
+
+
+@dataclass
+class BatchResult:
+    # Path i is coords[offsets[i] * 2 : offsets[i + 1] * 2] as flat x, y pairs,
+    # reversed like start_path_finding. An empty slice means there is no path.
+    # pruned[i] is 1 when a max_nodes cap dropped nodes during query i.
+    offsets:array = field(default_factory=lambda: array("I", [0]))
+    coords:array = field(default_factory=lambda: array("i"))
+    pruned:array = field(default_factory=lambda: array("B"))
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def get_path(self, index:int) -> tuple[tuple[int, int], ...]|None:
+        if index < 0 or index >= len(self):
+            raise IndexError(f"Index [{index}] out of bounds. Length: {len(self)}")
+
+        begin:int = self.offsets[index] * 2
+        end:int = self.offsets[index + 1] * 2
+        if begin == end:
+            return None
+
+        flat = self.coords[begin:end]
+        return tuple((flat[i], flat[i + 1]) for i in range(0, len(flat), 2))
+
+    def extend(self, offsets:array, coords:array, pruned:array) -> None:
+        base:int = self.offsets[-1]
+        self.offsets.extend(base + o for o in offsets[1:])
+        self.coords.extend(coords)
+        self.pruned.extend(pruned)
+
+
+def _init_worker(shm_name:str, col:int, row:int, max_nodes:int|None = None) -> None:
+    global _worker_max_nodes
+
+    attach_masks(shm_name, col, row)
+    _worker_max_nodes = max_nodes
+
+
+def _run_chunk(queries:Sequence[tuple[int, int, int, int]]) -> tuple[bytes, bytes, bytes]:
+    masks, col, row = get_worker_masks()
+    offsets:array = array("I", [0])
+    coords:array = array("i")
+    pruned:array = array("B")
+
+    for sx, sy, ex, ey in queries:
+        if _worker_max_nodes is None:
+            path = _search_masks(col, row, masks, (sx, sy), (ex, ey))
+            pruned.append(0)
+        else:
+            result = _search_bounded(col, row, masks, (sx, sy), (ex, ey), _worker_max_nodes)
+            path = result.path
+            pruned.append(1 if result.pruned else 0)
+
+        if path is not None:
+            for x, y in path:
+                coords.append(x)
+                coords.append(y)
+        offsets.append(len(coords) // 2)
+
+    return offsets.tobytes(), coords.tobytes(), pruned.tobytes()
+
+
+def _chunk_queries(queries:Sequence[tuple[int, int, int, int]], chunk_size:int) -> list[Sequence[tuple[int, int, int, int]]]:
+    return [queries[i:i + chunk_size] for i in range(0, len(queries), chunk_size)]
+
+
+@timeit
+def start_path_finding_batch(col:int, row:int, queries:Iterable[tuple[tuple[int, int], tuple[int, int]]], blockers:tuple[tuple[int, int], ...], workers:int|None = None, chunk_size:int = 256, max_nodes:int|None = None) -> BatchResult:
+    # max_nodes caps the nodes each query may store, see astar.bounded
+    flat_queries:list[tuple[int, int, int, int]] = [(s[0], s[1], e[0], e[1]) for s, e in queries]
+    result:BatchResult = BatchResult()
+    if len(flat_queries) == 0:
+        return result
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    masks:bytearray = build_masks(col, row, make_grid(col, row, blockers))
+    with share_masks(masks) as shm_name:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(shm_name, col, row, max_nodes)) as executor:
+            for offsets_bytes, coords_bytes, pruned_bytes in executor.map(_run_chunk, _chunk_queries(flat_queries, chunk_size)):
+                offsets:array = array("I")
+                offsets.frombytes(offsets_bytes)
+                coords:array = array("i")
+                coords.frombytes(coords_bytes)
+                pruned:array = array("B")
+                pruned.frombytes(pruned_bytes)
+                result.extend(offsets, coords, pruned)
+
+    return result
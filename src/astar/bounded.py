@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+
+from __future__ import annotations
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+import heapq
+
+from timing.profiling import profiled
+from timing.timing import timeit
+from .astar import QUEUE_DECREASE, QUEUE_POP, QUEUE_PUSH, _get_return_path_grid, _make_square_heuristic, make_grid
+from .masks import build_masks, get_delta_table
+
+# Share of the cap kept after an eviction pass, the slack amortises passes
+_KEEP_RATIO:float = 0.75
+
+
+@dataclass
+class BoundedResult:
+    # pruned means the cap dropped open nodes, the path may then be longer than
+    # the best one and a None path does not prove the goal is unreachable
+    path:tuple[tuple[int, int], ...]|None
+    pruned:bool
+    peak_nodes:int
+    max_nodes:int
+
+
+def _search_bounded(col:int, row:int, masks:Sequence[int], start:tuple[int, int], end:tuple[int, int], max_nodes:int, heuristic:Callable[[int, int], int]|None = None, recorder:Callable[[int, int, int], None]|None = None) -> BoundedResult:
+    # Same search as _search_masks, but once the stored nodes (open entries
+    # plus closed cells) pass max_nodes the worst open nodes by f are dropped.
+    # Closed cells hold the parent chains and are never dropped, the search
+    # gives up when they alone fill the cap.
+    delta_table = get_delta_table(col)
+    if heuristic is None:
+        heuristic = _make_square_heuristic(col)
+
+    max_nodes = max(max_nodes, 2)
+    start_i:int = start[1] * col + start[0]
+    end_i:int = end[1] * col + end[0]
+
+    g_costs:dict[int, int] = {start_i: 0}
+    parents:dict[int, int] = {start_i: -1}
+    closed:set[int] = set()
+    pruned:bool = False
+    peak_nodes:int = 1
+
+    counter:int = 0
+    open_heap:list[tuple[int, int, int, int]] = [(heuristic(start_i, end_i), counter, 0, start_i)]
+    if recorder is not None:
+        recorder(QUEUE_PUSH, start_i, open_heap[0][0])
+
+    while len(open_heap) > 0:
+        _, _, g, curr = heapq.heappop(open_heap)
+        if curr in closed or g > g_costs[curr]:
+            continue
+
+        if recorder is not None:
+            recorder(QUEUE_POP, curr, 0)
+
+        if curr == end_i:
+            return BoundedResult(_get_return_path_grid(col, parents, end_i), pruned, peak_nodes, max_nodes)
+
+        closed.add(curr)
+
+        for delta, cost in delta_table[masks[curr]]:
+            child:int = curr + delta
+            if child in closed:
+                continue
+
+            new_g:int = g + cost
+            old_g:int|None = g_costs.get(child)
+            if old_g is not None and old_g <= new_g:
+                continue
+
+            g_costs[child] = new_g
+            parents[child] = curr
+            counter += 1
+            f:int = new_g + heuristic(child, end_i)
+            heapq.heappush(open_heap, (f, counter, new_g, child))
+
+            if recorder is not None:
+                recorder(QUEUE_PUSH if old_g is None else QUEUE_DECREASE, child, f)
+
+        stored:int = len(closed) + len(open_heap)
+        if stored > peak_nodes:
+            peak_nodes = stored
+
+        if stored <= max_nodes:
+            continue
+
+        # Eviction pass: keep the best live open entries, stale ones go too
+        pruned = True
+        keep:int = int(max_nodes * _KEEP_RATIO) - len(closed)
+        if keep <= 0:
+            return BoundedResult(None, pruned, peak_nodes, max_nodes)
+
+        live:list[tuple[int, int, int, int]] = [e for e in open_heap if e[3] not in closed and e[2] == g_costs[e[3]]]
+        if len(live) > keep:
+            live.sort()
+            for _, _, _, cell in live[keep:]:
+                del g_costs[cell]
+                del parents[cell]
+            del live[keep:]
+
+        heapq.heapify(live)
+        open_heap = live
+
+    return BoundedResult(None, pruned, peak_nodes, max_nodes)
+
+
+@timeit
+@profiled
+def start_path_finding_bounded(col:int, row:int, start:tuple[int, int], end:tuple[int, int], blockers:tuple[tuple[int, int], ...], max_nodes:int = 1 << 16, heuristic:Callable[[int, int], int]|None = None, recorder:Callable[[int, int, int], None]|None = None, masks:Sequence[int]|None = None, fallback_nodes:int|None = None) -> BoundedResult:
+    # With fallback_nodes a pruned search is retried with a doubled cap, up to
+    # fallback_nodes, until one finishes without pruning (an exact A* result)
+    if masks is None:
+        masks = build_masks(col, row, make_grid(col, row, blockers))
+
+    result:BoundedResult = _search_bounded(col, row, masks, start, end, max_nodes, heuristic, recorder)
+    while result.pruned and fallback_nodes is not None and result.max_nodes < fallback_nodes:
+        result = _search_bounded(col, row, masks, start, end, min(result.max_nodes * 2, fallback_nodes), heuristic, recorder)
+
+    return result
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+
+from __future__ import annotations
+from array import array
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+import heapq
+import os
+import struct
+
+from .masks import GRID_STEPS, MOVE_TABLE
+from .workers import attach_masks, get_worker_masks, share_masks
+
+_MAGIC:bytes = b"GBT1"
+_HEADER:struct.Struct = struct.Struct("<4sII1s")
+
+_STEP_INDEX:dict[str, int] = {key: k for k, (key, _, _, _) in enumerate(GRID_STEPS)}
+
+
+def _get_cell_boxes(col:int, masks:Sequence[int], source:int) -> list[int]:
+    # Dijkstra from source, every reached cell remembers the first move of
+    # its shortest path and grows that move's box (min_x, min_y, max_x, max_y)
+    boxes:list[int] = [0x7FFFFFFF, 0x7FFFFFFF, -1, -1] * len(GRID_STEPS)
+    dist:dict[int, int] = {source: 0}
+    first:dict[int, int] = {source: -1}
+    open_heap:list[tuple[int, int]] = [(0, source)]
+
+    while len(open_heap) > 0:
+        d, curr = heapq.heappop(open_heap)
+        if d > dist[curr]:
+            continue
+
+        move:int = first[curr]
+        if move >= 0:
+            x:int = curr % col
+            y:int = curr // col
+            b:int = move * 4
+            if x < boxes[b]:
+                boxes[b] = x
+            if y < boxes[b + 1]:
+                boxes[b + 1] = y
+            if x > boxes[b + 2]:
+                boxes[b + 2] = x
+            if y > boxes[b + 3]:
+                boxes[b + 3] = y
+
+        for key, dx, dy, cost in MOVE_TABLE[masks[curr]]:
+            child:int = curr + dy * col + dx
+            new_d:int = d + cost
+            old_d:int|None = dist.get(child)
+            if old_d is not None and old_d <= new_d:
+                continue
+
+            dist[child] = new_d
+            first[child] = _STEP_INDEX[key] if curr == source else move
+            heapq.heappush(open_heap, (new_d, child))
+
+    return boxes
+
+
+def _run_chunk(cells:range) -> bytes:
+    masks, col, row = get_worker_masks()
+
+    # Compacted here, the parent only ever holds the final table
+    out:array = array("i")
+    for cell in cells:
+        out.extend(_get_cell_boxes(col, masks, cell))
+
+    return _compact(col, row, out).tobytes()
+
+
+class GoalBounds:
+    def __init__(self, col:int, row:int, boxes:array) -> None:
+        self.col:int = col
+        self.row:int = row
+        # 8 boxes per cell, 4 values per box, an empty box has min > max
+        self.boxes:array = boxes
+
+    @classmethod
+    def build(cls, col:int, row:int, masks:Sequence[int], workers:int|None = None, chunk_size:int = 64) -> GoalBounds:
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+        boxes:array = array(_get_box_type(col, row)[0])
+        chunks:list[range] = [range(i, min(i + chunk_size, col * row)) for i in range(0, col * row, chunk_size)]
+        with share_masks(masks) as shm_name:
+            with ProcessPoolExecutor(max_workers=workers, initializer=attach_masks, initargs=(shm_name, col, row)) as executor:
+                for data in executor.map(_run_chunk, chunks):
+                    boxes.frombytes(data)
+
+        return cls(col, row, boxes)
+
+    def save(self, path:str) -> None:
+        with open(path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, self.col, self.row, self.boxes.typecode.encode()))
+            self.boxes.tofile(f)
+
+    @classmethod
+    def load(cls, path:str) -> GoalBounds:
+        with open(path, "rb") as f:
+            magic, col, row, typecode = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != _MAGIC:
+                raise ValueError(f"[{path}] is not a goal bounds file")
+
+            boxes:array = array(typecode.decode())
+            boxes.fromfile(f, col * row * len(GRID_STEPS) * 4)
+
+        return cls(col, row, boxes)
+
+    def __call__(self, cell:int, goal:int) -> int:
+        # Mask of the moves from cell whose box holds the goal
+        col:int = self.col
+        gx:int = goal % col
+        gy:int = goal // col
+        boxes:array = self.boxes
+        b:int = cell * 32
+        mask:int = 0
+        for k in range(8):
+            if boxes[b] <= gx <= boxes[b + 2] and boxes[b + 1] <= gy <= boxes[b + 3]:
+                mask |= 1 << k
+            b += 4
+
+        return mask
+
+
+def _get_box_type(col:int, row:int) -> tuple[str, int]:
+    # uint16 when every coordinate fits, with the value empty boxes start at
+    if col >= 0xFFFF or row >= 0xFFFF:
+        return "I", 0xFFFFFFFF
+
+    return "H", 0xFFFF
+
+
+def _compact(col:int, row:int, boxes:array) -> array:
+    # Empty boxes become (max, max, 0, 0)
+    typecode, empty = _get_box_type(col, row)
+    compact:array = array(typecode, bytes(len(boxes) * array(typecode).itemsize))
+    for i in range(0, len(boxes), 4):
+        if boxes[i + 2] < 0:
+            compact[i] = empty
+            compact[i + 1] = empty
+        else:
+            compact[i] = boxes[i]
+            compact[i + 1] = boxes[i + 1]
+            compact[i + 2] = boxes[i + 2]
+            compact[i + 3] = boxes[i + 3]
+
+    return compact
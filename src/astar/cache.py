@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+
+from __future__ import annotations
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Iterable, Sequence
+
+from .astar import _octile_xy, get_min_cost
+
+# A removed blocker c also unblocks diagonal moves whose corner it was, and
+# both ends of such a move are orthogonal neighbours of c. So any new path
+# passes through c or a cell n one straight step (10) from it. By the
+# triangle inequality octile(s, n) + octile(n, e) is at least
+# octile(s, c) + octile(c, e) - 2 * 10. Every step costs at least its octile
+# length times the cheapest terrain cost, so the slack is in plain units and
+# the whole bound gets scaled.
+_REMOVAL_SLACK:int = 2 * 10
+
+# Heuristic keys whose engines return optimal paths. The removal bound only
+# says no cheaper path appeared, the result of any other engine can still
+# change, so their entries go on every removal.
+EXACT_HEURISTICS:frozenset[Hashable] = frozenset({"octile"})
+
+
+def _get_path_cost(path:tuple[tuple[int, int], ...], col:int = 0, costs:Sequence[int]|None = None) -> int:
+    # Same cost model as the engines, every step is scaled by the terrain
+    # cost of the cell it enters. Paths come end first, so in each pair a is
+    # the cell being entered.
+    cost:int = 0
+    for a, b in zip(path, path[1:]):
+        step:int = 15 if a[0] != b[0] and a[1] != b[1] else 10
+        cost += step if costs is None else step * costs[a[1] * col + a[0]]
+
+    return cost
+
+
+class CacheStats:
+    def __init__(self) -> None:
+        self.hits:int = 0
+        self.misses:int = 0
+        self.evictions:int = 0
+        self.invalidations:int = 0
+
+    def __repr__(self) -> str:
+        return f"CacheStats(hits:{self.hits}, misses:{self.misses}, evictions:{self.evictions}, invalidations:{self.invalidations})"
+
+
+class _CacheEntry:
+    def __init__(self, start:tuple[int, int], end:tuple[int, int], path:tuple[tuple[int, int], ...]|None, col:int = 0, costs:Sequence[int]|None = None, exact:bool = True) -> None:
+        self.start:tuple[int, int] = start
+        self.end:tuple[int, int] = end
+        self.path:tuple[tuple[int, int], ...]|None = path
+        self.exact:bool = exact
+        self.cost:int = 0
+        # Lower bounds are in plain octile steps, times this to compare with cost
+        self.scale:int = 1 if costs is None else get_min_cost(costs)
+        self.cells:frozenset[tuple[int, int]] = frozenset()
+        # Bounding box of the path, grown by one cell for the corner rules
+        self.box:tuple[int, int, int, int] = (0, 0, -1, -1)
+
+        if path is not None:
+            xs:list[int] = [x for x, _ in path]
+            ys:list[int] = [y for _, y in path]
+            self.cost = _get_path_cost(path, col, costs)
+            self.cells = frozenset(path)
+            self.box = (min(xs) - 1, min(ys) - 1, max(xs) + 1, max(ys) + 1)
+
+    def is_touched_by_blocker(self, x:int, y:int) -> bool:
+        # A new blocker breaks the path if it lands on it or next to a
+        # diagonal step it may now close
+        if self.path is None:
+            return False
+
+        min_x, min_y, max_x, max_y = self.box
+        if x < min_x or x > max_x or y < min_y or y > max_y:
+            return False
+
+        cells:frozenset[tuple[int, int]] = self.cells
+        for dy in (-1, 0, 1):
+            for dx in (-1, 0, 1):
+                if (x + dx, y + dy) in cells:
+                    return True
+
+        return False
+
+    def is_touched_by_removal(self, x:int, y:int) -> bool:
+        # A freed cell can only matter if going through it could be cheaper
+        if self.path is None or not self.exact:
+            return True
+
+        sx, sy = self.start
+        ex, ey = self.end
+        return (_octile_xy(x - sx, y - sy) + _octile_xy(ex - x, ey - y) - _REMOVAL_SLACK) * self.scale < self.cost
+
+
+class PathCache:
+    # Bounded LRU of search results keyed on (map version, start, end, engine,
+    # heuristic). A lookup with a version the cache has not been told about
+    # drops everything, invalidate() carries the unaffected entries over to
+    # the version after an edit. Searches over a terrain layer pass col and
+    # costs to put() so removals are checked against the weighted path cost.
+    # Only heuristics in EXACT_HEURISTICS keep entries across removals.
+    def __init__(self, capacity:int = 1024) -> None:
+        self.capacity:int = max(capacity, 1)
+        self.version:int|None = None
+        self.stats:CacheStats = CacheStats()
+
+        self._entries:OrderedDict[tuple[tuple[int, int], tuple[int, int], Hashable, Hashable], _CacheEntry] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def find_path(self, version:int, start:tuple[int, int], end:tuple[int, int], engine:Hashable, heuristic:Hashable, search:Callable[[], tuple[tuple[int, int], ...]|None], col:int = 0, costs:Sequence[int]|None = None) -> tuple[tuple[int, int], ...]|None:
+        # heuristic should be a stable name, a fresh closure never hits
+        path, found = self.get(version, start, end, engine, heuristic)
+        if found:
+            return path
+
+        path = search()
+        self.put(version, start, end, engine, heuristic, path, col, costs)
+        return path
+
+    def get(self, version:int, start:tuple[int, int], end:tuple[int, int], engine:Hashable, heuristic:Hashable) -> tuple[tuple[tuple[int, int], ...]|None, bool]:
+        self._set_version(version)
+
+        key = (start, end, engine, heuristic)
+        entry:_CacheEntry|None = self._entries.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            return None, False
+
+        self.stats.hits += 1
+        self._entries.move_to_end(key)
+        return entry.path, True
+
+    def put(self, version:int, start:tuple[int, int], end:tuple[int, int], engine:Hashable, heuristic:Hashable, path:tuple[tuple[int, int], ...]|None, col:int = 0, costs:Sequence[int]|None = None) -> None:
+        self._set_version(version)
+
+        key = (start, end, engine, heuristic)
+        self._entries[key] = _CacheEntry(start, end, path, col, costs, heuristic in EXACT_HEURISTICS)
+        self._entries.move_to_end(key)
+
+        if len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def invalidate(self, cells:Iterable[tuple[int, int]], blocked:bool, version:int) -> None:
+        # cells just became blockers (blocked) or free, version is the map
+        # version after the edit
+        cells = list(cells)
+        stale:list[tuple[tuple[int, int], tuple[int, int], Hashable, Hashable]] = []
+        for key, entry in self._entries.items():
+            for x, y in cells:
+                if entry.is_touched_by_blocker(x, y) if blocked else entry.is_touched_by_removal(x, y):
+                    stale.append(key)
+                    break
+
+        for key in stale:
+            del self._entries[key]
+
+        self.stats.invalidations += len(stale)
+        self.version = version
+
+    def clear(self) -> None:
+        self.stats.invalidations += len(self._entries)
+        self._entries.clear()
+
+    def _set_version(self, version:int) -> None:
+        if version != self.version:
+            self.clear()
+            self.version = version
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+
+from __future__ import annotations
+from array import array
+from bisect import bisect_right
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import heapq
+import mmap
+import os
+import struct
+
+from .masks import GRID_STEPS, MOVE_TABLE, build_masks
+from .workers import attach_masks, get_worker_masks, share_masks
+
+_MAGIC:bytes = b"CPD1"
+_HEADER:struct.Struct = struct.Struct("<4sIII")
+
+# First move code of a target that is the source itself or unreachable
+NO_MOVE:int = 0xFF
+
+_STEP_INDEX:dict[str, int] = {key: k for k, (key, _, _, _) in enumerate(GRID_STEPS)}
+
+
+def _get_first_moves(col:int, masks:Sequence[int], source:int) -> bytearray:
+    # Dijkstra from source, every reached cell keeps the GRID_STEPS index of
+    # the first move of its shortest path. Moves are symmetric, so following
+    # first moves cell by cell always stays on a shortest path.
+    moves:bytearray = bytearray([NO_MOVE]) * len(masks)
+    dist:dict[int, int] = {source: 0}
+    open_heap:list[tuple[int, int]] = [(0, source)]
+
+    while len(open_heap) > 0:
+        d, curr = heapq.heappop(open_heap)
+        if d > dist[curr]:
+            continue
+
+        move:int = moves[curr]
+        for key, dx, dy, cost in MOVE_TABLE[masks[curr]]:
+            child:int = curr + dy * col + dx
+            new_d:int = d + cost
+            old_d:int|None = dist.get(child)
+            if old_d is not None and old_d <= new_d:
+                continue
+
+            dist[child] = new_d
+            moves[child] = _STEP_INDEX[key] if curr == source else move
+            heapq.heappush(open_heap, (new_d, child))
+
+    moves[source] = NO_MOVE
+    return moves
+
+
+def _compress(moves:bytes) -> tuple[array, bytearray]:
+    # Runs as (first target index, move), targets in row-major order
+    starts:array = array("I")
+    codes:bytearray = bytearray()
+    last:int = -1
+    for target, move in enumerate(moves):
+        if move != last:
+            starts.append(target)
+            codes.append(move)
+            last = move
+
+    return starts, codes
+
+
+def _run_chunk(sources:range) -> tuple[bytes, bytes, bytes]:
+    shared, col, row = get_worker_masks()
+    masks = shared[:col * row]
+    counts:array = array("I")
+    starts:array = array("I")
+    codes:bytearray = bytearray()
+    try:
+        for source in sources:
+            source_starts, source_codes = _compress(_get_first_moves(col, masks, source))
+            counts.append(len(source_starts))
+            starts.extend(source_starts)
+            codes.extend(source_codes)
+    finally:
+        masks.release()
+
+    return counts.tobytes(), starts.tobytes(), bytes(codes)
+
+
+class PathDatabase:
+    # Compressed first-move table of every (source, target) pair: source s
+    # owns runs offsets[s] to offsets[s + 1], each run covers targets from its
+    # start up to the next run's start
+    def __init__(self, col:int, row:int, offsets:Sequence[int], starts:Sequence[int], codes:Sequence[int], mapped:mmap.mmap|None = None) -> None:
+        self.col:int = col
+        self.row:int = row
+        self.offsets:Sequence[int] = offsets
+        self.starts:Sequence[int] = starts
+        self.codes:Sequence[int] = codes
+        self._mapped:mmap.mmap|None = mapped
+
+    @classmethod
+    def build(cls, col:int, row:int, masks:Sequence[int], workers:int|None = None, chunk_size:int = 64) -> PathDatabase:
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+        offsets:array = array("I", [0])
+        starts:array = array("I")
+        codes:bytearray = bytearray()
+        chunks:list[range] = [range(i, min(i + chunk_size, col * row)) for i in range(0, col * row, chunk_size)]
+        with share_masks(masks) as shm_name:
+            with ProcessPoolExecutor(max_workers=workers, initializer=attach_masks, initargs=(shm_name, col, row)) as executor:
+                for counts_bytes, starts_bytes, codes_bytes in executor.map(_run_chunk, chunks):
+                    counts:array = array("I")
+                    counts.frombytes(counts_bytes)
+                    for count in counts:
+                        offsets.append(offsets[-1] + count)
+                    starts.frombytes(starts_bytes)
+                    codes.extend(codes_bytes)
+
+        return cls(col, row, offsets, starts, codes)
+
+    def save(self, path:str) -> None:
+        with open(path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, self.col, self.row, len(self.starts)))
+            array("I", self.offsets).tofile(f)
+            array("I", self.starts).tofile(f)
+            f.write(bytes(self.codes))
+
+    @classmethod
+    def load(cls, path:str) -> PathDatabase:
+        # The file is memory-mapped, only the pages queries touch are read
+        with open(path, "rb") as f:
+            mapped:mmap.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, col, row, runs = _HEADER.unpack_from(mapped, 0)
+        if magic != _MAGIC:
+            mapped.close()
+            raise ValueError(f"[{path}] is not a path database file")
+
+        view:memoryview = memoryview(mapped)
+        pos:int = _HEADER.size
+        offsets:memoryview = view[pos:pos + (col * row + 1) * 4].cast("I")
+        pos += (col * row + 1) * 4
+        starts:memoryview = view[pos:pos + runs * 4].cast("I")
+        pos += runs * 4
+        codes:memoryview = view[pos:pos + runs]
+
+        return cls(col, row, offsets, starts, codes, mapped)
+
+    def close(self) -> None:
+        if self._mapped is None:
+            return
+
+        for view in (self.offsets, self.starts, self.codes):
+            if isinstance(view, memoryview):
+                view.release()
+        self._mapped.close()
+        self._mapped = None
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def get_first_move(self, source:int, target:int) -> int:
+        lo:int = self.offsets[source]
+        hi:int = self.offsets[source + 1]
+        return self.codes[bisect_right(self.starts, target, lo, hi) - 1]
+
+    def get_path(self, start:tuple[int, int], end:tuple[int, int]) -> tuple[tuple[int, int], ...]|None:
+        # Reversed like start_path_finding, no search: one lookup per step
+        col:int = self.col
+        current:int = start[1] * col + start[0]
+        target:int = end[1] * col + end[0]
+        path:list[tuple[int, int]] = [start]
+
+        while current != target:
+            move:int = self.get_first_move(current, target)
+            if move == NO_MOVE:
+                return None
+
+            _, dx, dy, _ = GRID_STEPS[move]
+            current += dy * col + dx
+            path.append((current % col, current // col))
+
+        path.reverse()
+        return tuple(path)
+
+
+def main() -> None:
+    # Build a path database for a chunked grid map file
+    from gridmap.chunked import ChunkedGrid
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("map", help="Chunked grid file", type=str)
+    parser.add_argument("output", help="Path database file to write", type=str)
+    parser.add_argument("-w", "--workers", help="Worker processes, defaults to the cpu count", type=int, default=None)
+
+    args = parser.parse_args()
+
+    grid:ChunkedGrid = ChunkedGrid(args.map)
+    try:
+        cells:bytes = grid.read_rect(0, 0, grid.col, grid.row)
+    finally:
+        grid.close()
+
+    database:PathDatabase = PathDatabase.build(grid.col, grid.row, build_masks(grid.col, grid.row, cells), args.workers)
+    database.save(args.output)
+    print(f"{grid.col} x {grid.row}: [{len(database)}] runs, [{os.path.getsize(args.output)}] bytes")
+
+
+if __name__ == "__main__":
+    main()
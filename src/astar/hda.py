@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+
+from __future__ import annotations
+from array import array
+from collections.abc import Sequence
+from multiprocessing import shared_memory
+import heapq
+import multiprocessing
+import os
+import queue
+import time
+
+from timing.timing import timeit
+from .astar import _make_octile_heuristic, make_grid
+from .masks import build_masks, get_delta_table
+
+_INF:int = (1 << 62)
+
+# Control block, int64 slots: stop flag, incumbent cost, then per worker
+# (idle, sent, received, expanded). Every slot has a single writer.
+_CTRL_STOP:int = 0
+_CTRL_BEST:int = 1
+_CTRL_WORKERS:int = 2
+_CTRL_SLOTS:int = 4
+
+# Nodes a worker expands between two looks at its inboxes
+_EXPAND_BATCH:int = 64
+
+# Seconds the workers get to exit before they are terminated
+_JOIN_TIMEOUT:float = 5.0
+
+
+def _get_owner(cell:int, workers:int) -> int:
+    # Multiplicative hash, neighbouring cells land on different workers
+    return (((cell * 0x9E3779B1) & 0xFFFFFFFF) >> 16) % workers
+
+
+class _Ring:
+    # Single producer, single consumer ring of (cell, g, parent) int64 triples
+    # inside a shared block: [head, tail, data...]. The consumer only writes
+    # head and the producer only writes tail, the data is written before tail.
+    def __init__(self, buf:memoryview, offset:int, capacity:int) -> None:
+        self._buf:memoryview = buf
+        self._head:int = offset
+        self._tail:int = offset + 1
+        self._data:int = offset + 2
+        self._capacity:int = capacity
+
+    def push(self, cell:int, g:int, parent:int) -> bool:
+        buf:memoryview = self._buf
+        tail:int = buf[self._tail]
+        if tail - buf[self._head] >= self._capacity:
+            return False
+
+        at:int = self._data + (tail % self._capacity) * 3
+        buf[at] = cell
+        buf[at + 1] = g
+        buf[at + 2] = parent
+        buf[self._tail] = tail + 1
+        return True
+
+    def pop_all(self) -> list[tuple[int, int, int]]:
+        buf:memoryview = self._buf
+        head:int = buf[self._head]
+        tail:int = buf[self._tail]
+        items:list[tuple[int, int, int]] = []
+        while head < tail:
+            at:int = self._data + (head % self._capacity) * 3
+            items.append((buf[at], buf[at + 1], buf[at + 2]))
+            head += 1
+
+        buf[self._head] = head
+        return items
+
+
+def _get_ring_offset(src:int, dst:int, workers:int, capacity:int) -> int:
+    return (src * workers + dst) * (2 + capacity * 3)
+
+
+def _hda_worker(index:int, workers:int, col:int, masks_name:str, ctrl_name:str, rings_name:str, capacity:int, start:int, end:int, requests, results) -> None:
+    masks_shm = shared_memory.SharedMemory(name=masks_name)
+    ctrl_shm = shared_memory.SharedMemory(name=ctrl_name)
+    rings_shm = shared_memory.SharedMemory(name=rings_name)
+    ctrl:memoryview = ctrl_shm.buf.cast("q")
+    rings_buf:memoryview = rings_shm.buf.cast("q")
+
+    try:
+        masks = masks_shm.buf
+        delta_table = get_delta_table(col)
+        heuristic = _make_octile_heuristic(col)
+        inboxes:list[_Ring] = [_Ring(rings_buf, _get_ring_offset(src, index, workers, capacity), capacity) for src in range(workers)]
+        outboxes:list[_Ring] = [_Ring(rings_buf, _get_ring_offset(index, dst, workers, capacity), capacity) for dst in range(workers)]
+        pending:list[list[tuple[int, int, int]]] = [[] for _ in range(workers)]
+
+        slot:int = _CTRL_WORKERS + index * _CTRL_SLOTS
+        sent:int = 0
+        received:int = 0
+        expanded:int = 0
+
+        # g and parent of the cells this worker owns, nodes may be reopened
+        # when a cheaper copy arrives late, so there is no closed set
+        g_costs:dict[int, int] = {}
+        parents:dict[int, int] = {}
+        open_heap:list[tuple[int, int, int]] = []
+
+        if _get_owner(start, workers) == index:
+            g_costs[start] = 0
+            parents[start] = -1
+            open_heap.append((heuristic(start, end), 0, start))
+
+        while ctrl[_CTRL_STOP] == 0:
+            for ring in inboxes:
+                items = ring.pop_all()
+                if len(items) == 0:
+                    continue
+
+                ctrl[slot] = 0
+                received += len(items)
+                ctrl[slot + 2] = received
+                for cell, g, parent in items:
+                    old_g:int|None = g_costs.get(cell)
+                    if old_g is None or g < old_g:
+                        g_costs[cell] = g
+                        parents[cell] = parent
+                        heapq.heappush(open_heap, (g + heuristic(cell, end), g, cell))
+
+            best:int = ctrl[_CTRL_BEST]
+            for _ in range(_EXPAND_BATCH):
+                if len(open_heap) == 0:
+                    break
+
+                f, g, curr = open_heap[0]
+                if f >= best:
+                    # Everything left is pruned by the incumbent
+                    open_heap.clear()
+                    break
+
+                heapq.heappop(open_heap)
+                if g > g_costs[curr]:
+                    continue
+
+                expanded += 1
+                if curr == end:
+                    # Only the goal's owner writes the incumbent
+                    ctrl[_CTRL_BEST] = g
+                    best = g
+                    continue
+
+                for delta, cost in delta_table[masks[curr]]:
+                    child:int = curr + delta
+                    new_g:int = g + cost
+                    owner:int = _get_owner(child, workers)
+                    if owner != index:
+                        pending[owner].append((child, new_g, curr))
+                        continue
+
+                    old_g = g_costs.get(child)
+                    if old_g is None or new_g < old_g:
+                        g_costs[child] = new_g
+                        parents[child] = curr
+                        heapq.heappush(open_heap, (new_g + heuristic(child, end), new_g, child))
+
+            has_pending:bool = False
+            for dst in range(workers):
+                outbox:list[tuple[int, int, int]] = pending[dst]
+                pushed:int = 0
+                for cell, g, parent in outbox:
+                    if not outboxes[dst].push(cell, g, parent):
+                        break
+                    pushed += 1
+
+                if pushed > 0:
+                    del outbox[:pushed]
+                    sent += pushed
+                    ctrl[slot] = 0
+                    ctrl[slot + 1] = sent
+                if len(outbox) > 0:
+                    has_pending = True
+
+            ctrl[slot + 3] = expanded
+            if not has_pending and (len(open_heap) == 0 or open_heap[0][0] >= ctrl[_CTRL_BEST]):
+                ctrl[slot] = 1
+                time.sleep(0.0001)
+
+        # Path walk: a request is a cell this worker owns, the answer is the
+        # run of owned cells along its parent chain and the first cell past
+        # it (another worker's, or -1 past start). None ends the worker.
+        while True:
+            cell:int|None = requests.get()
+            if cell is None:
+                break
+
+            chain:array = array("q")
+            while cell >= 0 and _get_owner(cell, workers) == index:
+                chain.append(cell)
+                cell = parents[cell]
+            results.put((chain.tobytes(), cell))
+    finally:
+        ctrl.release()
+        rings_buf.release()
+        masks_shm.close()
+        ctrl_shm.close()
+        rings_shm.close()
+
+
+def _get_counters(ctrl:memoryview, workers:int) -> tuple[bool, tuple[int, ...]]:
+    idle:bool = True
+    counters:list[int] = []
+    for i in range(workers):
+        slot:int = _CTRL_WORKERS + i * _CTRL_SLOTS
+        idle = idle and ctrl[slot] == 1
+        counters.append(ctrl[slot + 1])
+        counters.append(ctrl[slot + 2])
+
+    return idle, tuple(counters)
+
+
+def _wait_for_termination(ctrl:memoryview, workers:int, processes:list) -> None:
+    # Done once two consecutive sweeps see every worker idle with the same
+    # counters and as many nodes received as sent: nothing is in flight and
+    # no open node can beat the incumbent
+    last:tuple[int, ...]|None = None
+    while True:
+        idle, counters = _get_counters(ctrl, workers)
+        if idle and sum(counters[0::2]) == sum(counters[1::2]):
+            if counters == last:
+                return
+            last = counters
+        else:
+            last = None
+
+        if any(p.exitcode not in (None, 0) for p in processes):
+            raise RuntimeError("HDA* worker exited early")
+
+        time.sleep(0.0005)
+
+
+def _get_chain(results, process) -> tuple[bytes, int]:
+    # Waits for the answer of a path walk request, a dead worker raises
+    # instead of blocking forever
+    while True:
+        try:
+            return results.get(timeout=0.05)
+        except queue.Empty:
+            if process.exitcode is not None:
+                raise RuntimeError("HDA* worker exited early")
+
+
+def _stop_workers(processes:list, requests:list) -> None:
+    # Workers wait on their request queue once the search is over. One that
+    # does not leave within _JOIN_TIMEOUT (stuck, or with answers nobody
+    # read still in its queue feeder) is terminated.
+    for q in requests:
+        q.put(None)
+
+    deadline:float = time.monotonic() + _JOIN_TIMEOUT
+    for p in processes:
+        p.join(max(deadline - time.monotonic(), 0))
+    for p in processes:
+        if p.is_alive():
+            p.terminate()
+            p.join(_JOIN_TIMEOUT)
+
+
+@timeit
+def start_path_finding_hda(col:int, row:int, start:tuple[int, int], end:tuple[int, int], blockers:tuple[tuple[int, int], ...], workers:int|None = None, masks:Sequence[int]|None = None, ring_capacity:int = 1 << 14) -> tuple[tuple[int, int], ...]|None:
+    # Hash distributed A*: each cell belongs to one worker process, generated
+    # nodes travel to their owner through shared memory rings. Same moves and
+    # 10 / 15 costs as start_path_finding, with the octile heuristic, so the
+    # path cost is optimal.
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(workers, 1)
+
+    if masks is None:
+        masks = build_masks(col, row, make_grid(col, row, blockers))
+
+    start_i:int = start[1] * col + start[0]
+    end_i:int = end[1] * col + end[0]
+    ring_size:int = 2 + ring_capacity * 3
+
+    masks_shm = shared_memory.SharedMemory(create=True, size=max(col * row, 1))
+    ctrl_shm = shared_memory.SharedMemory(create=True, size=(_CTRL_WORKERS + workers * _CTRL_SLOTS) * 8)
+    rings_shm = shared_memory.SharedMemory(create=True, size=workers * workers * ring_size * 8)
+    ctrl:memoryview = ctrl_shm.buf.cast("q")
+    processes:list = []
+    requests:list = []
+    try:
+        masks_shm.buf[:col * row] = bytes(masks)
+        ctrl_shm.buf[:] = bytes(len(ctrl_shm.buf))
+        rings_shm.buf[:] = bytes(len(rings_shm.buf))
+        ctrl[_CTRL_BEST] = _INF
+
+        requests.extend(multiprocessing.Queue() for _ in range(workers))
+        results = multiprocessing.Queue()
+        for i in range(workers):
+            p = multiprocessing.Process(target=_hda_worker, args=(i, workers, col, masks_shm.name, ctrl_shm.name, rings_shm.name, ring_capacity, start_i, end_i, requests[i], results))
+            p.start()
+            processes.append(p)
+
+        try:
+            _wait_for_termination(ctrl, workers, processes)
+        finally:
+            ctrl[_CTRL_STOP] = 1
+
+        best:int = ctrl[_CTRL_BEST]
+        if best >= _INF:
+            return None
+
+        # Parent links always point to a strictly cheaper cell, so the walk
+        # ends at start. Only the chain crosses between processes.
+        path:list[tuple[int, int]] = []
+        current:int = end_i
+        while current >= 0:
+            owner:int = _get_owner(current, workers)
+            requests[owner].put(current)
+            data, current = _get_chain(results, processes[owner])
+            chain:array = array("q")
+            chain.frombytes(data)
+            path.extend((cell % col, cell // col) for cell in chain)
+    finally:
+        _stop_workers(processes, requests)
+        ctrl.release()
+        for shm in (masks_shm, ctrl_shm, rings_shm):
+            shm.close()
+            shm.unlink()
+
+    return tuple(path)
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+
+from __future__ import annotations
+from array import array
+from collections.abc import Sequence
+import heapq
+import struct
+
+from .astar import Point
+from .masks import build_masks, get_delta_table
+
+UNREACHABLE:int = 0xFFFFFFFF
+
+_MAGIC:bytes = b"ALT1"
+_HEADER:struct.Struct = struct.Struct("<4sIII")
+
+
+def _get_distance_table(col:int, row:int, masks:Sequence[int], source:int) -> array:
+    delta_table = get_delta_table(col)
+    dist:array = array("I", [UNREACHABLE]) * (col * row)
+    dist[source] = 0
+    open_heap:list[tuple[int, int]] = [(0, source)]
+
+    while len(open_heap) > 0:
+        d, curr = heapq.heappop(open_heap)
+        if d > dist[curr]:
+            continue
+
+        for delta, cost in delta_table[masks[curr]]:
+            child:int = curr + delta
+            new_d:int = d + cost
+            if new_d < dist[child]:
+                dist[child] = new_d
+                heapq.heappush(open_heap, (new_d, child))
+
+    return dist
+
+
+def _select_seed(col:int, row:int, grid:Sequence[int]) -> int:
+    # Free cell closest to the centre, it is most likely to sit in the main region
+    best:int = -1
+    best_dist:int = -1
+    for i in range(col * row):
+        if grid[i]:
+            continue
+
+        dx:int = i % col - col // 2
+        dy:int = i // col - row // 2
+        d:int = dx * dx + dy * dy
+        if best == -1 or d < best_dist:
+            best = i
+            best_dist = d
+
+    return best
+
+
+class Landmarks:
+    def __init__(self, col:int, row:int, landmarks:list[int], tables:list[array]) -> None:
+        self.col:int = col
+        self.row:int = row
+        self.landmarks:list[int] = landmarks
+        self.tables:list[array] = tables
+
+    @classmethod
+    def build(cls, col:int, row:int, grid:Sequence[int], count:int, seed:tuple[int, int]|None = None) -> Landmarks:
+        landmarks:list[int] = []
+        tables:list[array] = []
+
+        seed_i:int = _select_seed(col, row, grid) if seed is None else seed[1] * col + seed[0]
+        if seed_i == -1 or count <= 0:
+            return cls(col, row, landmarks, tables)
+
+        # Farthest-point selection: the first landmark is the farthest cell from
+        # the seed, each next one maximises the distance to the closest
+        # landmark picked so far
+        masks:bytearray = build_masks(col, row, grid)
+        min_dist:array = _get_distance_table(col, row, masks, seed_i)
+
+        for _ in range(count):
+            best:int = -1
+            best_dist:int = -1
+            for i in range(col * row):
+                d:int = min_dist[i]
+                if d != UNREACHABLE and d > best_dist and i not in landmarks:
+                    best = i
+                    best_dist = d
+
+            if best == -1:
+                break
+
+            table:array = _get_distance_table(col, row, masks, best)
+            landmarks.append(best)
+            tables.append(table)
+
+            if len(landmarks) == 1:
+                min_dist = array("I", table)
+            else:
+                for i in range(col * row):
+                    if table[i] < min_dist[i]:
+                        min_dist[i] = table[i]
+
+        return cls(col, row, landmarks, tables)
+
+    def save(self, path:str) -> None:
+        with open(path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, self.col, self.row, len(self.landmarks)))
+            array("I", self.landmarks).tofile(f)
+            for table in self.tables:
+                table.tofile(f)
+
+    @classmethod
+    def load(cls, path:str, col:int, row:int) -> Landmarks:
+        # col and row are the map the tables will be used with, a file built
+        # for another size would index past or into the wrong cells
+        with open(path, "rb") as f:
+            magic, file_col, file_row, count = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != _MAGIC:
+                raise ValueError(f"[{path}] is not a landmark file")
+            if (file_col, file_row) != (col, row):
+                raise ValueError(f"[{path}] is for a [{file_col} x {file_row}] map, not [{col} x {row}]")
+
+            landmarks:array = array("I")
+            landmarks.fromfile(f, count)
+
+            tables:list[array] = []
+            for _ in range(count):
+                table:array = array("I")
+                table.fromfile(f, col * row)
+                tables.append(table)
+
+        return cls(col, row, list(landmarks), tables)
+
+    def cell_heuristic(self, a:int, b:int) -> int:
+        # Triangle inequality lower bound, max over every landmark
+        h:int = 0
+        for table in self.tables:
+            da:int = table[a]
+            db:int = table[b]
+            if da == UNREACHABLE or db == UNREACHABLE:
+                continue
+
+            d:int = da - db if da > db else db - da
+            if d > h:
+                h = d
+
+        return h
+
+    def __call__(self, a:Point, b:Point) -> int:
+        return self.cell_heuristic(a.y * self.col + a.x, b.y * self.col + b.x)
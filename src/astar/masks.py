@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+
+from __future__ import annotations
+from collections.abc import Sequence
+from functools import lru_cache
+
+# Same order and cost model as the steps table built in start_path_finding,
+# bit k of a move mask allows GRID_STEPS[k]
+GRID_STEPS:tuple[tuple[str, int, int, int], ...] = (
+    ("t", 0, -1, 10),
+    ("r", 1, 0, 10),
+    ("b", 0, 1, 10),
+    ("l", -1, 0, 10),
+    ("tr", 1, -1, 15),
+    ("br", 1, 1, 15),
+    ("bl", -1, 1, 15),
+    ("tl", -1, -1, 15),
+)
+
+# Steps allowed by each of the 256 masks, in GRID_STEPS order
+MOVE_TABLE:tuple[tuple[tuple[str, int, int, int], ...], ...] = tuple(
+    tuple(GRID_STEPS[k] for k in range(len(GRID_STEPS)) if mask & (1 << k)) for mask in range(256)
+)
+
+_FREE_TABLE:bytes = b"\x01" + bytes(255)
+
+
+@lru_cache(maxsize=16)
+def get_delta_table(col:int) -> tuple[tuple[tuple[int, int], ...], ...]:
+    # (cell offset, cost) for each allowed step of each mask
+    return tuple(tuple((dy * col + dx, cost) for _, dx, dy, cost in moves) for moves in MOVE_TABLE)
+
+
+def _get_cell_mask(col:int, row:int, grid:Sequence[int], cell:int) -> int:
+    x:int = cell % col
+    y:int = cell // col
+    blocked:dict[str, bool] = {"t": False, "r": False, "b": False, "l": False}
+    mask:int = 0
+
+    for k, (key, dx, dy, _) in enumerate(GRID_STEPS):
+        new_x:int = x + dx
+        new_y:int = y + dy
+
+        if new_x < 0 or new_x >= col or new_y < 0 or new_y >= row:
+            continue
+
+        if grid[new_y * col + new_x]:
+            blocked[key] = True
+            continue
+
+        if len(key) == 2 and blocked[key[0]] and blocked[key[1]]:
+            continue
+
+        mask |= 1 << k
+
+    return mask
+
+
+def build_masks(col:int, row:int, grid:Sequence[int]) -> bytearray:
+    # Whole map at once: free cells become 0x01 bytes of one big integer
+    # (padded with a blocked ring), every direction is a byte shift of it and
+    # the eight planes are or-ed into their bit of the mask byte
+    stride:int = col + 2
+    free:bytes = bytes(grid).translate(_FREE_TABLE)
+    padded:bytearray = bytearray(stride * (row + 2))
+    for y in range(row):
+        begin:int = (y + 1) * stride + 1
+        padded[begin:begin + col] = free[y * col:(y + 1) * col]
+
+    size:int = len(padded)
+    full:int = (1 << (8 * size)) - 1
+    board:int = int.from_bytes(padded, "little")
+
+    planes:dict[str, int] = {}
+    for key, dx, dy, _ in GRID_STEPS:
+        offset:int = dy * stride + dx
+        planes[key] = board >> (8 * offset) if offset > 0 else (board << (-8 * offset)) & full
+
+    combined:int = 0
+    for k, (key, _, _, _) in enumerate(GRID_STEPS):
+        plane:int = planes[key]
+        if len(key) == 2:
+            plane &= planes[key[0]] | planes[key[1]]
+        combined |= plane << k
+
+    data:bytes = combined.to_bytes(size, "little")
+    masks:bytearray = bytearray(col * row)
+    for y in range(row):
+        begin = (y + 1) * stride + 1
+        masks[y * col:(y + 1) * col] = data[begin:begin + col]
+
+    return masks
+
+
+class MoveMasks:
+    def __init__(self, col:int, row:int, grid:Sequence[int]) -> None:
+        self.col:int = col
+        self.row:int = row
+        self.grid:Sequence[int] = grid
+        self.masks:bytearray = build_masks(col, row, grid)
+
+    def rebuild(self) -> None:
+        self.masks = build_masks(self.col, self.row, self.grid)
+
+    def update_cell(self, x:int, y:int) -> None:
+        # A blocker only changes the masks of the 3x3 block around it
+        for ny in range(max(y - 1, 0), min(y + 2, self.row)):
+            for nx in range(max(x - 1, 0), min(x + 2, self.col)):
+                cell:int = ny * self.col + nx
+                self.masks[cell] = _get_cell_mask(self.col, self.row, self.grid, cell)
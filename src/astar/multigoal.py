@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+
+from __future__ import annotations
+from collections.abc import Callable, Iterable, Sequence
+import heapq
+
+from timing.profiling import profiled
+from timing.timing import timeit
+from .astar import QUEUE_DECREASE, QUEUE_POP, QUEUE_PUSH, _get_return_path_grid, _octile_xy, get_min_cost, make_grid
+from .masks import build_masks, get_delta_table
+
+# Above this many targets the min heuristic goes through a KD-tree instead of
+# scanning every target for every pushed cell
+KD_TREE_MIN_TARGETS:int = 16
+
+
+class _KDTree:
+    # Static 2d tree stored in place: the median of every range is its node,
+    # the split axis alternates x, y with depth
+    def __init__(self, points:Iterable[tuple[int, int]]) -> None:
+        self._points:list[tuple[int, int]] = list(points)
+        self._build(0, len(self._points), 0)
+
+    def _build(self, lo:int, hi:int, axis:int) -> None:
+        if hi - lo <= 1:
+            return
+
+        self._points[lo:hi] = sorted(self._points[lo:hi], key=lambda p: p[axis])
+        mid:int = (lo + hi) // 2
+        self._build(lo, mid, axis ^ 1)
+        self._build(mid + 1, hi, axis ^ 1)
+
+    def nearest(self, x:int, y:int) -> int:
+        # Octile distance to the closest point, a subtree is skipped when the
+        # gap to its splitting line alone (10 per cell) already exceeds the best
+        points:list[tuple[int, int]] = self._points
+        best:int = 0x7FFFFFFF
+        stack:list[tuple[int, int, int]] = [(0, len(points), 0)]
+
+        while len(stack) > 0:
+            lo, hi, axis = stack.pop()
+            if lo >= hi:
+                continue
+
+            mid:int = (lo + hi) // 2
+            px, py = points[mid]
+            d:int = _octile_xy(x - px, y - py)
+            if d < best:
+                best = d
+                if best == 0:
+                    return 0
+
+            diff:int = (x - px) if axis == 0 else (y - py)
+            near:tuple[int, int, int] = (lo, mid, axis ^ 1) if diff < 0 else (mid + 1, hi, axis ^ 1)
+            far:tuple[int, int, int] = (mid + 1, hi, axis ^ 1) if diff < 0 else (lo, mid, axis ^ 1)
+            if 10 * abs(diff) < best:
+                stack.append(far)
+            stack.append(near)
+
+        return best
+
+
+def _make_min_heuristic(col:int, targets:Sequence[int]) -> Callable[[int], int]:
+    points:list[tuple[int, int]] = [(t % col, t // col) for t in targets]
+
+    def _min_octile(cell:int) -> int:
+        x:int = cell % col
+        y:int = cell // col
+        return min(_octile_xy(x - px, y - py) for px, py in points)
+
+    return _min_octile
+
+
+def _make_kd_heuristic(col:int, targets:Sequence[int]) -> Callable[[int], int]:
+    tree:_KDTree = _KDTree((t % col, t // col) for t in targets)
+
+    def _kd_octile(cell:int) -> int:
+        return tree.nearest(cell % col, cell // col)
+
+    return _kd_octile
+
+
+def _search_nearest(col:int, row:int, masks:Sequence[int], start:tuple[int, int], targets:Iterable[tuple[int, int]], use_kd_tree:bool|None = None, recorder:Callable[[int, int, int], None]|None = None, costs:Sequence[int]|None = None) -> tuple[tuple[int, int], tuple[tuple[int, int], ...]]|None:
+    # Single search towards every target at once, h is the octile distance to
+    # the closest target so the first target popped is the nearest by path cost
+    target_cells:list[int] = sorted({y * col + x for x, y in targets})
+    if len(target_cells) == 0:
+        return None
+
+    if use_kd_tree is None:
+        use_kd_tree = len(target_cells) >= KD_TREE_MIN_TARGETS
+    heuristic:Callable[[int], int] = _make_kd_heuristic(col, target_cells) if use_kd_tree else _make_min_heuristic(col, target_cells)
+
+    delta_table = get_delta_table(col)
+    h_scale:int = 1 if costs is None else get_min_cost(costs)
+    goals:set[int] = set(target_cells)
+    start_i:int = start[1] * col + start[0]
+
+    g_costs:dict[int, int] = {start_i: 0}
+    parents:dict[int, int] = {start_i: -1}
+    closed:set[int] = set()
+
+    counter:int = 0
+    open_heap:list[tuple[int, int, int, int]] = [(heuristic(start_i) * h_scale, counter, 0, start_i)]
+    if recorder is not None:
+        recorder(QUEUE_PUSH, start_i, open_heap[0][0])
+
+    while len(open_heap) > 0:
+        _, _, g, curr = heapq.heappop(open_heap)
+        if curr in closed or g > g_costs[curr]:
+            continue
+
+        if recorder is not None:
+            recorder(QUEUE_POP, curr, 0)
+
+        if curr in goals:
+            return (curr % col, curr // col), _get_return_path_grid(col, parents, curr)
+
+        closed.add(curr)
+
+        for delta, cost in delta_table[masks[curr]]:
+            child:int = curr + delta
+            if child in closed:
+                continue
+
+            new_g:int = g + cost if costs is None else g + cost * costs[child]
+            old_g:int|None = g_costs.get(child)
+            if old_g is not None and old_g <= new_g:
+                continue
+
+            g_costs[child] = new_g
+            parents[child] = curr
+            counter += 1
+            f:int = new_g + heuristic(child) * h_scale
+            heapq.heappush(open_heap, (f, counter, new_g, child))
+
+            if recorder is not None:
+                recorder(QUEUE_PUSH if old_g is None else QUEUE_DECREASE, child, f)
+
+    return None
+
+
+@timeit
+@profiled
+def start_path_finding_nearest(col:int, row:int, start:tuple[int, int], targets:Iterable[tuple[int, int]], blockers:tuple[tuple[int, int], ...], recorder:Callable[[int, int, int], None]|None = None, masks:Sequence[int]|None = None, use_kd_tree:bool|None = None, costs:Sequence[int]|None = None) -> tuple[tuple[int, int], tuple[tuple[int, int], ...]]|None:
+    # Returns (reached target, path), the path reversed like start_path_finding
+    if masks is None:
+        masks = build_masks(col, row, make_grid(col, row, blockers))
+
+    return _search_nearest(col, row, masks, start, targets, use_kd_tree, recorder, costs)
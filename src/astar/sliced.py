@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+
+from __future__ import annotations
+from collections.abc import Callable, Sequence
+from random import Random
+from time import perf_counter_ns
+import argparse
+import heapq
+
+from .astar import FOUND, SEARCHING, SearchHandle
+from .masks import build_masks
+
+# Pass increment of a priority 1 handle, see SliceScheduler
+_STRIDE:int = 1 << 20
+
+
+def begin(col:int, row:int, masks:Sequence[int], start:tuple[int, int], end:tuple[int, int], heuristic:Callable[[int, int], int]|None = None, recorder:Callable[[int, int, int], None]|None = None, pruning:Callable[[int, int], int]|None = None, costs:Sequence[int]|None = None) -> SearchHandle:
+    return SearchHandle(col, row, masks, start, end, heuristic, recorder, pruning, costs)
+
+
+class SliceScheduler:
+    # Shares a per-frame time budget between pending handles by stride
+    # scheduling: every handle has a pass value, the lowest pass runs next for
+    # slice_expansions cells, then its pass grows by _STRIDE / priority. A
+    # priority 4 handle gets four times the expansions of a priority 1 one and
+    # nothing starves. New handles join at the current lowest pass.
+    def __init__(self, slice_expansions:int = 32) -> None:
+        self.slice_expansions:int = max(slice_expansions, 1)
+        self.finished:int = 0
+
+        self._queue:list[tuple[int, int, SearchHandle]] = []
+        self._priorities:dict[int, int] = {}
+        self._callbacks:dict[int, Callable[[SearchHandle], None]] = {}
+        self._counter:int = 0
+        self._pass:int = 0
+
+    def __len__(self) -> int:
+        return len(self._priorities)
+
+    def submit(self, handle:SearchHandle, priority:int = 1, callback:Callable[[SearchHandle], None]|None = None) -> SearchHandle:
+        # callback(handle) runs from run_frame once the handle is done
+        self._priorities[id(handle)] = max(priority, 1)
+        if callback is not None:
+            self._callbacks[id(handle)] = callback
+
+        self._counter += 1
+        heapq.heappush(self._queue, (self._pass, self._counter, handle))
+        return handle
+
+    def cancel(self, handle:SearchHandle) -> None:
+        # The queue entry is skipped when it comes up
+        handle.cancel()
+        self._priorities.pop(id(handle), None)
+        self._callbacks.pop(id(handle), None)
+
+    def run_frame(self, max_ns:int) -> int:
+        # Steps handles until max_ns is spent or none are left, returns how
+        # many finished this frame
+        deadline:int = perf_counter_ns() + max_ns
+        finished:int = 0
+        queue:list[tuple[int, int, SearchHandle]] = self._queue
+
+        while len(queue) > 0:
+            remaining:int = deadline - perf_counter_ns()
+            if remaining <= 0:
+                break
+
+            handle_pass, order, handle = heapq.heappop(queue)
+            priority:int|None = self._priorities.get(id(handle))
+            if priority is None:
+                continue
+
+            self._pass = handle_pass
+            if handle.step(self.slice_expansions, remaining) == SEARCHING:
+                heapq.heappush(queue, (handle_pass + _STRIDE // priority, order, handle))
+                continue
+
+            del self._priorities[id(handle)]
+            callback:Callable[[SearchHandle], None]|None = self._callbacks.pop(id(handle), None)
+            finished += 1
+            if callback is not None:
+                callback(handle)
+
+        self.finished += finished
+        return finished
+
+
+def main() -> None:
+    # Simulate agents asking for paths on a random map, spread over frames
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-c", "--col", help="Column size of the generated map", type=int, default=200)
+    parser.add_argument("-r", "--row", help="Row size of the generated map", type=int, default=200)
+    parser.add_argument("-d", "--density", help="Blocker density, 0 to 1", type=float, default=0.25)
+    parser.add_argument("-a", "--agents", help="Path requests submitted up front", type=int, default=50)
+    parser.add_argument("-b", "--budget", help="Pathfinding budget per frame in microseconds", type=int, default=1000)
+    parser.add_argument("-s", "--seed", type=int, default=0)
+
+    args = parser.parse_args()
+
+    rng:Random = Random(args.seed)
+    grid:bytearray = bytearray(1 if rng.random() < args.density else 0 for _ in range(args.col * args.row))
+    free:list[int] = [i for i in range(args.col * args.row) if not grid[i]]
+    masks:bytearray = build_masks(args.col, args.row, grid)
+
+    scheduler:SliceScheduler = SliceScheduler()
+    handles:list[SearchHandle] = []
+    for i in range(args.agents):
+        start:int = rng.choice(free)
+        end:int = rng.choice(free)
+        handle:SearchHandle = begin(args.col, args.row, masks, (start % args.col, start // args.col), (end % args.col, end // args.col))
+        handles.append(scheduler.submit(handle, 2 if i % 5 == 0 else 1))
+
+    frame_ns:list[int] = []
+    while len(scheduler) > 0:
+        time_start:int = perf_counter_ns()
+        scheduler.run_frame(args.budget * 1000)
+        frame_ns.append(perf_counter_ns() - time_start)
+
+    if len(frame_ns) == 0:
+        return
+
+    found:int = sum(1 for h in handles if h.status == FOUND)
+    frame_ns.sort()
+    print(f"{args.col} x {args.row} agents: [{args.agents}] found: [{found}] frames: [{len(frame_ns)}] budget: [{args.budget} us]")
+    print(f"frame ms p50: [{frame_ns[len(frame_ns) // 2] / 1e6:.03f}] max: [{frame_ns[-1] / 1e6:.03f}]")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+
+from __future__ import annotations
+from array import array
+from collections.abc import Sequence
+import heapq
+import struct
+
+from .astar import _octile
+from .masks import GRID_STEPS, build_masks
+
+# Version 2: edges are diagonal-first walks, see _get_direct_h_reachable
+_MAGIC:bytes = b"SGR2"
+_HEADER:struct.Struct = struct.Struct("<4sIIII")
+
+
+def _get_subgoal_cells(col:int, row:int, grid:Sequence[int]) -> list[int]:
+    # Diagonal moves may clip a single blocker, so shortest paths bend either
+    # at a convex corner (blocked diagonal, both cells next to it free) or
+    # right beside the end of a wall (blocked side, free diagonal past it)
+    cells:list[int] = []
+    for y in range(row):
+        for x in range(col):
+            if grid[y * col + x]:
+                continue
+
+            for key, dx, dy, _ in GRID_STEPS:
+                if len(key) != 2:
+                    continue
+
+                nx:int = x + dx
+                ny:int = y + dy
+                if nx < 0 or nx >= col or ny < 0 or ny >= row:
+                    continue
+
+                free_x:bool = not grid[y * col + nx]
+                free_y:bool = not grid[ny * col + x]
+                if grid[ny * col + nx]:
+                    is_subgoal:bool = free_x and free_y
+                else:
+                    is_subgoal = free_x != free_y
+
+                if is_subgoal:
+                    cells.append(y * col + x)
+                    break
+
+    return cells
+
+
+# (diagonal, first cardinal, second cardinal) bits of each octant in GRID_STEPS
+_OCTANTS:tuple[tuple[int, int, int], ...] = ((4, 0, 1), (5, 2, 1), (6, 2, 3), (7, 0, 3))
+
+
+def _get_offsets(col:int) -> tuple[int, ...]:
+    return tuple(dy * col + dx for _, dx, dy, _ in GRID_STEPS)
+
+
+def _get_direct_h_reachable(col:int, masks:Sequence[int], source:int, lookup:array, target:int = -1) -> list[tuple[int, int]]:
+    # Subgoals (and target) reached by a diagonal-first octile walk, as
+    # (cell, cost). Every octant is swept row by row along its diagonal, and a
+    # row's cardinal scan never runs further than the row before it, so the
+    # cells behind a subgoal or a wall are left to that subgoal's own scan.
+    offsets:tuple[int, ...] = _get_offsets(col)
+    found:list[tuple[int, int]] = []
+    reach:list[int] = [0, 0, 0, 0]
+
+    for k in range(4):
+        bit:int = 1 << k
+        offset:int = offsets[k]
+        cell:int = source
+        steps:int = 0
+        while masks[cell] & bit:
+            cell += offset
+            if lookup[cell] >= 0 or cell == target:
+                found.append((cell, 10 * (steps + 1)))
+                break
+            steps += 1
+        reach[k] = steps
+
+    for diagonal, first, second in _OCTANTS:
+        diagonal_bit:int = 1 << diagonal
+        diagonal_offset:int = offsets[diagonal]
+        limits:list[int] = [reach[first], reach[second]]
+        cell = source
+        i:int = 0
+
+        while masks[cell] & diagonal_bit:
+            cell += diagonal_offset
+            i += 1
+            if lookup[cell] >= 0 or cell == target:
+                found.append((cell, 15 * i))
+                break
+
+            for side, k in enumerate((first, second)):
+                bit = 1 << k
+                offset = offsets[k]
+                limit:int = limits[side]
+                ray:int = cell
+                steps = 0
+                while steps < limit and masks[ray] & bit:
+                    ray += offset
+                    if lookup[ray] >= 0 or ray == target:
+                        found.append((ray, 15 * i + 10 * (steps + 1)))
+                        break
+                    steps += 1
+                limits[side] = steps
+
+    return found
+
+
+def _walk_direct(col:int, masks:Sequence[int], a:int, b:int) -> list[int]|None:
+    # Cells of the diagonal-first octile walk from a to b, None if a move on
+    # the way is not allowed
+    dx:int = b % col - a % col
+    dy:int = b // col - a // col
+    offsets:tuple[int, ...] = _get_offsets(col)
+
+    diagonal:int = (4 if dx > 0 else 7) if dy < 0 else (5 if dx > 0 else 6)
+    cardinal:int = (1 if dx > 0 else 3) if abs(dx) > abs(dy) else (0 if dy < 0 else 2)
+    moves:list[int] = [diagonal] * min(abs(dx), abs(dy)) + [cardinal] * abs(abs(dx) - abs(dy))
+
+    cells:list[int] = [a]
+    cell:int = a
+    for k in moves:
+        if not masks[cell] & (1 << k):
+            return None
+        cell += offsets[k]
+        cells.append(cell)
+
+    return cells
+
+
+class SubgoalGraph:
+    def __init__(self, col:int, row:int, grid:bytes, subgoals:array, offsets:array, targets:array, costs:array) -> None:
+        self.col:int = col
+        self.row:int = row
+        self.grid:bytes = grid
+        self.subgoals:array = subgoals
+        # CSR adjacency, edges of subgoal i are targets/costs[offsets[i]:offsets[i + 1]]
+        self.offsets:array = offsets
+        self.targets:array = targets
+        self.costs:array = costs
+        self.masks:bytearray = build_masks(col, row, grid)
+
+        self._lookup:array = array("i", [-1]) * (col * row)
+        for i, cell in enumerate(subgoals):
+            self._lookup[cell] = i
+
+    @classmethod
+    def build(cls, col:int, row:int, grid:Sequence[int]) -> SubgoalGraph:
+        subgoals:array = array("I", _get_subgoal_cells(col, row, grid))
+        lookup:array = array("i", [-1]) * (col * row)
+        for i, cell in enumerate(subgoals):
+            lookup[cell] = i
+        masks:bytearray = build_masks(col, row, grid)
+
+        offsets:array = array("I", [0])
+        targets:array = array("I")
+        costs:array = array("I")
+        for cell in subgoals:
+            for other, cost in _get_direct_h_reachable(col, masks, cell, lookup):
+                targets.append(lookup[other])
+                costs.append(cost)
+            offsets.append(len(targets))
+
+        return cls(col, row, bytes(grid), subgoals, offsets, targets, costs)
+
+    def save(self, path:str) -> None:
+        with open(path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, self.col, self.row, len(self.subgoals), len(self.targets)))
+            f.write(self.grid)
+            self.subgoals.tofile(f)
+            self.offsets.tofile(f)
+            self.targets.tofile(f)
+            self.costs.tofile(f)
+
+    @classmethod
+    def load(cls, path:str) -> SubgoalGraph:
+        with open(path, "rb") as f:
+            magic, col, row, subgoal_count, edge_count = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != _MAGIC:
+                raise ValueError(f"[{path}] is not a subgoal graph file")
+
+            grid:bytes = f.read(col * row)
+            subgoals:array = array("I")
+            subgoals.fromfile(f, subgoal_count)
+            offsets:array = array("I")
+            offsets.fromfile(f, subgoal_count + 1)
+            targets:array = array("I")
+            targets.fromfile(f, edge_count)
+            costs:array = array("I")
+            costs.fromfile(f, edge_count)
+
+        return cls(col, row, grid, subgoals, offsets, targets, costs)
+
+    def _search_graph(self, start:int, end:int) -> list[int]|None:
+        # Abstract search over cells; start and end are only linked to the
+        # subgoals they can reach directly, the start scan also looks for end
+        start_edges:list[tuple[int, int]] = _get_direct_h_reachable(self.col, self.masks, start, self._lookup, end)
+        end_edges:dict[int, int] = {cell: cost for cell, cost in _get_direct_h_reachable(self.col, self.masks, end, self._lookup)}
+
+        g_costs:dict[int, int] = {start: 0}
+        parents:dict[int, int] = {start: -1}
+        closed:set[int] = set()
+        open_heap:list[tuple[int, int]] = [(_octile(self.col, start, end), start)]
+
+        while len(open_heap) > 0:
+            _, curr = heapq.heappop(open_heap)
+            if curr in closed:
+                continue
+
+            if curr == end:
+                cells:list[int] = []
+                while curr >= 0:
+                    cells.append(curr)
+                    curr = parents[curr]
+                return cells
+
+            closed.add(curr)
+
+            edges:list[tuple[int, int]] = []
+            index:int = self._lookup[curr]
+            if curr == start:
+                edges.extend(start_edges)
+            elif index >= 0:
+                for e in range(self.offsets[index], self.offsets[index + 1]):
+                    edges.append((self.subgoals[self.targets[e]], self.costs[e]))
+
+            if curr in end_edges:
+                edges.append((end, end_edges[curr]))
+
+            for child, cost in edges:
+                if child in closed:
+                    continue
+
+                new_g:int = g_costs[curr] + cost
+                if child in g_costs and g_costs[child] <= new_g:
+                    continue
+
+                g_costs[child] = new_g
+                parents[child] = curr
+                heapq.heappush(open_heap, (new_g + _octile(self.col, child, end), child))
+
+        return None
+
+    def find_path(self, start:tuple[int, int], end:tuple[int, int]) -> tuple[tuple[int, int], ...]|None:
+        start_i:int = start[1] * self.col + start[0]
+        end_i:int = end[1] * self.col + end[0]
+        if self.grid[start_i] or self.grid[end_i]:
+            return None
+
+        if start_i == end_i:
+            return (start,)
+
+        # A clear straight walk costs the octile lower bound, nothing beats it
+        direct:list[int]|None = _walk_direct(self.col, self.masks, start_i, end_i)
+        if direct is not None:
+            return tuple((cell % self.col, cell // self.col) for cell in reversed(direct))
+
+        # cells come back reversed (end first), same as start_path_finding
+        cells:list[int]|None = self._search_graph(start_i, end_i)
+        if cells is None:
+            return None
+
+        path:list[tuple[int, int]] = [end]
+        for i in range(len(cells) - 1):
+            hop:list[int]|None = self._refine_hop(cells[i + 1], cells[i])
+            if hop is None:
+                return None
+
+            path.extend((cell % self.col, cell // self.col) for cell in reversed(hop[:-1]))
+
+        return tuple(path)
+
+    def _refine_hop(self, a:int, b:int) -> list[int]|None:
+        # Every edge came from a diagonal-first scan, from a for graph and
+        # start edges, from b for the edges into end
+        cells:list[int]|None = _walk_direct(self.col, self.masks, a, b)
+        if cells is None:
+            cells = _walk_direct(self.col, self.masks, b, a)
+            if cells is not None:
+                cells.reverse()
+
+        return cells
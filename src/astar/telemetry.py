@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+
+from __future__ import annotations
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from inspect import unwrap
+from time import perf_counter
+import tracemalloc
+
+from timing.profiling import Profiler, env_profiler
+from .cache import PathCache
+from .astar import QUEUE_POP, QUEUE_PUSH, _make_octile_heuristic, _make_square_heuristic, _search_masks, start_path_finding, start_path_finding_heapq
+from .multigoal import KD_TREE_MIN_TARGETS, _search_nearest
+
+# (col, row, start, end, masks, recorder, costs) -> path, every engine searches
+# the same move masks (and terrain costs) so results are comparable on any map
+SearchEngine = Callable[[int, int, tuple[int, int], tuple[int, int], Sequence[int], Callable[[int, int, int], None]|None, Sequence[int]|None], tuple[tuple[int, int], ...]|None]
+
+
+@dataclass
+class SearchStats:
+    engine:str
+    wall_time:float
+    expanded:int
+    peak_open:int
+    path_length:int
+    memory:int
+
+
+class _QueueCounter:
+    # Recorder that tracks expansions and the logical open-list size
+    def __init__(self) -> None:
+        self.expanded:int = 0
+        self.open_size:int = 0
+        self.peak_open:int = 0
+
+    def __call__(self, op:int, cell:int, key:int) -> None:
+        if op == QUEUE_PUSH:
+            self.open_size += 1
+            if self.open_size > self.peak_open:
+                self.peak_open = self.open_size
+        elif op == QUEUE_POP:
+            self.open_size -= 1
+            self.expanded += 1
+
+
+# Undecorated engines: @timeit would print and @profiled would sample inside
+# the timed runs, _measure does both jobs itself
+_start_path_finding = unwrap(start_path_finding)
+_start_path_finding_heapq = unwrap(start_path_finding_heapq)
+
+
+def _run_pfnode(col:int, row:int, start:tuple[int, int], end:tuple[int, int], masks:Sequence[int], recorder:Callable[[int, int, int], None]|None, costs:Sequence[int]|None = None) -> tuple[tuple[int, int], ...]|None:
+    return _start_path_finding(col, row, start, end, (), recorder=recorder, masks=masks, costs=costs)
+
+
+def _run_pfnode_heapq(col:int, row:int, start:tuple[int, int], end:tuple[int, int], masks:Sequence[int], recorder:Callable[[int, int, int], None]|None, costs:Sequence[int]|None = None) -> tuple[tuple[int, int], ...]|None:
+    return _start_path_finding_heapq(col, row, start, end, (), recorder=recorder, masks=masks, costs=costs)
+
+
+def _run_masks(col:int, row:int, start:tuple[int, int], end:tuple[int, int], masks:Sequence[int], recorder:Callable[[int, int, int], None]|None, costs:Sequence[int]|None = None) -> tuple[tuple[int, int], ...]|None:
+    return _search_masks(col, row, masks, start, end, _make_square_heuristic(col), recorder, costs=costs)
+
+
+def _run_masks_octile(col:int, row:int, start:tuple[int, int], end:tuple[int, int], masks:Sequence[int], recorder:Callable[[int, int, int], None]|None, costs:Sequence[int]|None = None) -> tuple[tuple[int, int], ...]|None:
+    return _search_masks(col, row, masks, start, end, _make_octile_heuristic(col), recorder, costs=costs)
+
+
+ENGINES:dict[str, SearchEngine] = {
+    "PfNode / GenericHeap": _run_pfnode,
+    "PfNode / heapq": _run_pfnode_heapq,
+    "Masks / square": _run_masks,
+    "Masks / octile": _run_masks_octile,
+}
+
+# Heuristic each engine runs with, the second half of a PathCache key
+ENGINE_HEURISTICS:dict[str, str] = {
+    "PfNode / GenericHeap": "square",
+    "PfNode / heapq": "square",
+    "Masks / square": "square",
+    "Masks / octile": "octile",
+}
+
+
+def _measure(engine:str, search:Callable[[Callable[[int, int, int], None]|None], tuple[tuple[int, int], ...]|None], profiler:Profiler|None = None, params:dict|None = None) -> tuple[tuple[tuple[int, int], ...]|None, SearchStats]:
+    # The wall time comes from a bare run, counters and memory from a second
+    # instrumented run so neither skews the other
+    time_start:float = perf_counter()
+    path = search(None)
+    wall_time:float = perf_counter() - time_start
+
+    counter:_QueueCounter = _QueueCounter()
+    was_tracing:bool = tracemalloc.is_tracing()
+    if was_tracing:
+        tracemalloc.reset_peak()
+    else:
+        tracemalloc.start()
+    try:
+        base, _ = tracemalloc.get_traced_memory()
+        search(counter)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+
+    # A sampled query gets a third, profiled run, the only place telemetry
+    # profiles: by the given profiler, else the ASTAR_PROFILE one
+    if profiler is None:
+        profiler = env_profiler
+    if profiler is not None:
+        profiler.run(engine, params or {}, search, None)
+
+    path_length:int = 0 if path is None else len(path)
+    return path, SearchStats(engine, wall_time, counter.expanded, counter.peak_open, path_length, peak - base)
+
+
+def run_search(engine:str, col:int, row:int, start:tuple[int, int], end:tuple[int, int], masks:Sequence[int], cache:PathCache|None = None, version:int = 0, costs:Sequence[int]|None = None, profiler:Profiler|None = None) -> tuple[tuple[tuple[int, int], ...]|None, SearchStats]:
+    # With a cache, version is the map version the masks were built from
+    search:SearchEngine = ENGINES[engine]
+    params:dict = {"col": col, "row": row, "start": start, "end": end}
+    if cache is None:
+        return _measure(engine, lambda recorder: search(col, row, start, end, masks, recorder, costs), profiler, params)
+
+    time_start:float = perf_counter()
+    path, found = cache.get(version, start, end, engine, ENGINE_HEURISTICS[engine])
+    wall_time:float = perf_counter() - time_start
+    if found:
+        path_length:int = 0 if path is None else len(path)
+        return path, SearchStats(f"{engine} (cached)", wall_time, 0, 0, path_length, 0)
+
+    path, stats = _measure(engine, lambda recorder: search(col, row, start, end, masks, recorder, costs), profiler, params)
+    cache.put(version, start, end, engine, ENGINE_HEURISTICS[engine], path, col, costs)
+    return path, stats
+
+
+def run_nearest_search(col:int, row:int, start:tuple[int, int], targets:Sequence[tuple[int, int]], masks:Sequence[int], costs:Sequence[int]|None = None, profiler:Profiler|None = None) -> tuple[tuple[tuple[int, int], ...]|None, SearchStats]:
+    # The reached target is the first cell of the returned path
+    engine:str = "Nearest / kd-tree" if len(targets) >= KD_TREE_MIN_TARGETS else "Nearest / min"
+
+    def _search(recorder:Callable[[int, int, int], None]|None) -> tuple[tuple[int, int], ...]|None:
+        result = _search_nearest(col, row, masks, start, targets, recorder=recorder, costs=costs)
+        return None if result is None else result[1]
+
+    return _measure(engine, _search, profiler, {"col": col, "row": row, "start": start, "targets": len(targets)})
+
+
+def compare_engines(engines:Sequence[str], col:int, row:int, start:tuple[int, int], end:tuple[int, int], masks:Sequence[int], cache:PathCache|None = None, version:int = 0, costs:Sequence[int]|None = None, profiler:Profiler|None = None) -> list[tuple[tuple[tuple[int, int], ...]|None, SearchStats]]:
+    return [run_search(engine, col, row, start, end, masks, cache, version, costs, profiler) for engine in engines]
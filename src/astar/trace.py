@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+
+from __future__ import annotations
+from array import array
+from collections.abc import Callable, Sequence
+import argparse
+import struct
+
+from .astar import QUEUE_DECREASE, QUEUE_POP, QUEUE_PUSH, _make_octile_heuristic, _search_masks
+from .masks import build_masks
+
+# Events are the recorder operations of the engines: a push opens a cell, a
+# decrease updates an open cell and a pop closes (expands) it
+EVENT_OPEN:int = QUEUE_PUSH
+EVENT_CLOSE:int = QUEUE_POP
+EVENT_UPDATE:int = QUEUE_DECREASE
+
+_MAGIC:bytes = b"TRC1"
+_HEADER:struct.Struct = struct.Struct("<4sIIiiiiI")
+
+
+def _encode_cells(cells:array) -> bytes:
+    # Zigzag varints of the difference to the previous cell id
+    out:bytearray = bytearray()
+    prev:int = 0
+    for cell in cells:
+        delta:int = cell - prev
+        prev = cell
+        value:int = (delta << 1) if delta >= 0 else ((-delta << 1) - 1)
+        while value >= 0x80:
+            out.append((value & 0x7F) | 0x80)
+            value >>= 7
+        out.append(value)
+
+    return bytes(out)
+
+
+def _decode_cells(data:bytes, count:int) -> array:
+    cells:array = array("I")
+    prev:int = 0
+    pos:int = 0
+    for _ in range(count):
+        value:int = 0
+        shift:int = 0
+        while True:
+            byte:int = data[pos]
+            pos += 1
+            value |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                break
+            shift += 7
+
+        delta:int = (value >> 1) if not value & 1 else -((value + 1) >> 1)
+        prev += delta
+        cells.append(prev)
+
+    return cells
+
+
+class SearchTrace:
+    def __init__(self, col:int, row:int, start:tuple[int, int] = (-1, -1), end:tuple[int, int] = (-1, -1)) -> None:
+        self.col:int = col
+        self.row:int = row
+        self.start:tuple[int, int] = start
+        self.end:tuple[int, int] = end
+        self.kinds:array = array("B")
+        self.cells:array = array("I")
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def record(self, op:int, cell:int, key:int) -> None:
+        self.kinds.append(op)
+        self.cells.append(cell)
+
+    def get_expansions(self) -> list[tuple[int, int]]:
+        col:int = self.col
+        return [(self.cells[i] % col, self.cells[i] // col) for i in range(len(self.kinds)) if self.kinds[i] == EVENT_CLOSE]
+
+    def save(self, path:str) -> None:
+        encoded:bytes = _encode_cells(self.cells)
+        with open(path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, self.col, self.row, self.start[0], self.start[1], self.end[0], self.end[1], len(self.kinds)))
+            self.kinds.tofile(f)
+            f.write(encoded)
+
+    @classmethod
+    def load(cls, path:str) -> SearchTrace:
+        with open(path, "rb") as f:
+            magic, col, row, sx, sy, ex, ey, count = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != _MAGIC:
+                raise ValueError(f"[{path}] is not a search trace file")
+
+            trace:SearchTrace = cls(col, row, (sx, sy), (ex, ey))
+            trace.kinds.fromfile(f, count)
+            trace.cells = _decode_cells(f.read(), count)
+
+        return trace
+
+
+def record_search(col:int, row:int, masks:Sequence[int], start:tuple[int, int], end:tuple[int, int], heuristic:Callable[[int, int], int]|None = None, costs:Sequence[int]|None = None) -> tuple[tuple[tuple[int, int], ...]|None, SearchTrace]:
+    trace:SearchTrace = SearchTrace(col, row, start, end)
+    path = _search_masks(col, row, masks, start, end, heuristic, trace.record, costs=costs)
+    return path, trace
+
+
+def main() -> None:
+    # Record one search on a chunked grid map file, for replay in the visualizer
+    from gridmap.chunked import ChunkedGrid
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("map", help="Chunked grid file", type=str)
+    parser.add_argument("output", help="Search trace file to write", type=str)
+    parser.add_argument("-s", "--start", help="Start cell", type=int, nargs=2, metavar=("X", "Y"), required=True)
+    parser.add_argument("-e", "--end", help="End cell", type=int, nargs=2, metavar=("X", "Y"), required=True)
+    parser.add_argument("--heuristic", choices=("square", "octile"), default="square")
+
+    args = parser.parse_args()
+
+    grid:ChunkedGrid = ChunkedGrid(args.map)
+    try:
+        cells:bytes = grid.read_rect(0, 0, grid.col, grid.row)
+    finally:
+        grid.close()
+
+    heuristic = _make_octile_heuristic(grid.col) if args.heuristic == "octile" else None
+    path, trace = record_search(grid.col, grid.row, build_masks(grid.col, grid.row, cells), tuple(args.start), tuple(args.end), heuristic)
+    trace.save(args.output)
+    print(f"events: [{len(trace)}] expanded: [{len(trace.get_expansions())}] path: [{0 if path is None else len(path)}]")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+
+from __future__ import annotations
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+
+# Per-worker view of the shared move masks, set up once by attach_masks as a
+# process pool initializer
+_worker_shm:shared_memory.SharedMemory|None = None
+_worker_col:int = 0
+_worker_row:int = 0
+
+
+@contextmanager
+def share_masks(masks:Sequence[int]) -> Iterator[str]:
+    # Copies masks into a new shared block for the pool and yields its name,
+    # the block is freed on exit
+    data:bytes = bytes(masks)
+    shm = shared_memory.SharedMemory(create=True, size=max(len(data), 1))
+    try:
+        shm.buf[:len(data)] = data
+        yield shm.name
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def attach_masks(shm_name:str, col:int, row:int) -> None:
+    global _worker_shm, _worker_col, _worker_row
+
+    _worker_shm = shared_memory.SharedMemory(name=shm_name)
+    _worker_col = col
+    _worker_row = row
+
+
+def get_worker_masks() -> tuple[memoryview, int, int]:
+    # (masks, col, row), the buffer may be longer than col * row
+    if _worker_shm is None:
+        raise RuntimeError("Worker shared memory is not attached")
+
+    return _worker_shm.buf, _worker_col, _worker_row
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+
+from __future__ import annotations
+from collections import OrderedDict
+from collections.abc import Sequence
+import struct
+
+from astar.masks import build_masks
+from .gridmap import BLOCKED, EMPTY
+
+_MAGIC:bytes = b"CHG1"
+_HEADER:struct.Struct = struct.Struct("<4sIII")
+
+
+class ChunkStats:
+    def __init__(self) -> None:
+        self.hits:int = 0
+        self.misses:int = 0
+        self.evictions:int = 0
+
+    def __repr__(self) -> str:
+        return f"ChunkStats(hits:{self.hits}, misses:{self.misses}, evictions:{self.evictions})"
+
+
+class ChunkedGrid:
+    # Blocker grid stored on disk as fixed size square tiles, only up to
+    # cache_tiles of them are held in memory at once (LRU)
+    def __init__(self, path:str, cache_tiles:int = 64) -> None:
+        self.path:str = path
+        self._file = open(path, "r+b")
+
+        magic, col, row, tile = _HEADER.unpack(self._file.read(_HEADER.size))
+        if magic != _MAGIC:
+            self._file.close()
+            raise ValueError(f"[{path}] is not a chunked grid file")
+
+        self.col:int = col
+        self.row:int = row
+        self.tile:int = tile
+        self.tiles_x:int = (col + tile - 1) // tile
+        self.tiles_y:int = (row + tile - 1) // tile
+        self.version:int = 0
+        self.stats:ChunkStats = ChunkStats()
+
+        self._cache_tiles:int = max(cache_tiles, 1)
+        self._cache:OrderedDict[int, bytearray] = OrderedDict()
+        self._dirty:set[int] = set()
+
+    @classmethod
+    def create(cls, path:str, col:int, row:int, tile:int = 256, cache_tiles:int = 64) -> ChunkedGrid:
+        tiles:int = ((col + tile - 1) // tile) * ((row + tile - 1) // tile)
+        with open(path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, col, row, tile))
+            f.truncate(_HEADER.size + tiles * tile * tile)
+
+        return cls(path, cache_tiles)
+
+    @classmethod
+    def from_cells(cls, path:str, col:int, row:int, cells:Sequence[int], tile:int = 256, cache_tiles:int = 64) -> ChunkedGrid:
+        grid:ChunkedGrid = cls.create(path, col, row, tile, cache_tiles)
+        for y in range(row):
+            grid.write_row(0, y, bytes(cells[y * col:(y + 1) * col]))
+        grid.flush()
+
+        return grid
+
+    def __len__(self) -> int:
+        return self.col * self.row
+
+    def __getitem__(self, cell:int) -> int:
+        x:int = cell % self.col
+        y:int = cell // self.col
+        tile:int = self.tile
+        return self._get_tile((y // tile) * self.tiles_x + x // tile)[(y % tile) * tile + x % tile]
+
+    def in_bounds(self, x:int, y:int) -> bool:
+        return 0 <= x < self.col and 0 <= y < self.row
+
+    def is_blocked(self, x:int, y:int) -> bool:
+        return self[y * self.col + x] != EMPTY
+
+    def set_cell(self, x:int, y:int, value:int) -> None:
+        tile:int = self.tile
+        index:int = (y // tile) * self.tiles_x + x // tile
+        self._get_tile(index)[(y % tile) * tile + x % tile] = value
+        self._dirty.add(index)
+        self.version += 1
+
+    def write_row(self, x:int, y:int, data:bytes) -> None:
+        # Clipped to the map like read_rect, past the last column the next
+        # tile index belongs to the following tile row
+        tile:int = self.tile
+        left:int = max(x, 0)
+        right:int = min(x + len(data), self.col)
+        if not 0 <= y < self.row or left >= right:
+            return
+
+        pos:int = left
+        while pos < right:
+            index:int = (y // tile) * self.tiles_x + pos // tile
+            length:int = min(tile - pos % tile, right - pos)
+            begin:int = (y % tile) * tile + pos % tile
+            self._get_tile(index)[begin:begin + length] = data[pos - x:pos - x + length]
+            self._dirty.add(index)
+            pos += length
+
+        self.version += 1
+
+    def read_rect(self, x:int, y:int, w:int, h:int, fill:int = BLOCKED) -> bytes:
+        # Exactly w * h bytes, cells outside the map read as fill
+        out:bytearray = bytearray([fill]) * (w * h)
+        tile:int = self.tile
+        left:int = max(x, 0)
+        right:int = min(x + w, self.col)
+        if left >= right:
+            return bytes(out)
+
+        for ry in range(max(y, 0), min(y + h, self.row)):
+            pos:int = left
+            base:int = (ry - y) * w - x
+            while pos < right:
+                index:int = (ry // tile) * self.tiles_x + pos // tile
+                length:int = min(tile - pos % tile, right - pos)
+                begin:int = (ry % tile) * tile + pos % tile
+                out[base + pos:base + pos + length] = self._get_tile(index)[begin:begin + length]
+                pos += length
+
+        return bytes(out)
+
+    def flush(self) -> None:
+        for index in sorted(self._dirty):
+            tile_data:bytearray|None = self._cache.get(index)
+            if tile_data is not None:
+                self._write_tile(index, tile_data)
+
+        self._dirty.clear()
+        self._file.flush()
+
+    def close(self) -> None:
+        self.flush()
+        self._file.close()
+
+    def _get_tile(self, index:int) -> bytearray:
+        tile_data:bytearray|None = self._cache.get(index)
+        if tile_data is not None:
+            self.stats.hits += 1
+            self._cache.move_to_end(index)
+            return tile_data
+
+        self.stats.misses += 1
+        size:int = self.tile * self.tile
+        self._file.seek(_HEADER.size + index * size)
+        tile_data = bytearray(self._file.read(size))
+        self._cache[index] = tile_data
+
+        if len(self._cache) > self._cache_tiles:
+            old_index, old_data = self._cache.popitem(last=False)
+            self.stats.evictions += 1
+            if old_index in self._dirty:
+                self._write_tile(old_index, old_data)
+                self._dirty.discard(old_index)
+
+        return tile_data
+
+    def _write_tile(self, index:int, tile_data:bytearray) -> None:
+        self._file.seek(_HEADER.size + index * self.tile * self.tile)
+        self._file.write(tile_data)
+
+
+class ChunkedMasks:
+    # Move masks of a ChunkedGrid, computed a tile at a time (with a one cell
+    # halo) on first use and kept in their own LRU cache
+    def __init__(self, grid:ChunkedGrid, cache_tiles:int = 64) -> None:
+        self.grid:ChunkedGrid = grid
+        self.stats:ChunkStats = ChunkStats()
+
+        self._cache_tiles:int = max(cache_tiles, 1)
+        self._cache:OrderedDict[int, bytearray] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.grid)
+
+    def __getitem__(self, cell:int) -> int:
+        grid:ChunkedGrid = self.grid
+        x:int = cell % grid.col
+        y:int = cell // grid.col
+        tile:int = grid.tile
+        return self._get_tile((y // tile) * grid.tiles_x + x // tile)[(y % tile) * tile + x % tile]
+
+    def rebuild(self) -> None:
+        self._cache.clear()
+
+    def update_cell(self, x:int, y:int) -> None:
+        # The edited cell can sit in the halo of the neighbouring tiles
+        tile:int = self.grid.tile
+        for ny in (y - 1, y, y + 1):
+            for nx in (x - 1, x, x + 1):
+                if self.grid.in_bounds(nx, ny):
+                    self._cache.pop((ny // tile) * self.grid.tiles_x + nx // tile, None)
+
+    def _get_tile(self, index:int) -> bytearray:
+        tile_masks:bytearray|None = self._cache.get(index)
+        if tile_masks is not None:
+            self.stats.hits += 1
+            self._cache.move_to_end(index)
+            return tile_masks
+
+        self.stats.misses += 1
+        tile:int = self.grid.tile
+        size:int = tile + 2
+        x:int = (index % self.grid.tiles_x) * tile
+        y:int = (index // self.grid.tiles_x) * tile
+
+        local:bytes = self.grid.read_rect(x - 1, y - 1, size, size)
+        local_masks:bytearray = build_masks(size, size, local)
+        tile_masks = bytearray(tile * tile)
+        for ly in range(tile):
+            begin:int = (ly + 1) * size + 1
+            tile_masks[ly * tile:(ly + 1) * tile] = local_masks[begin:begin + tile]
+
+        self._cache[index] = tile_masks
+        if len(self._cache) > self._cache_tiles:
+            self._cache.popitem(last=False)
+            self.stats.evictions += 1
+
+        return tile_masks
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+
+from __future__ import annotations
+from random import Random
+
+EMPTY:int = 0
+BLOCKED:int = 1
+
+# Terrain cost of plain ground, a cell's cost multiplies the step into it
+PLAIN:int = 1
+
+# bytes.translate tables, they keep every bulk pass inside C loops
+_TO_ASCII:bytes = bytes([0x30, 0x31]) + bytes(254)
+_FROM_ASCII:bytes = bytes(0x31) + b"\x01" + bytes(256 - 0x32)
+
+
+def _density_table(density:float) -> bytes:
+    threshold:int = max(0, min(256, int(density * 256)))
+    return bytes([BLOCKED] * threshold + [EMPTY] * (256 - threshold))
+
+
+class GridMap:
+    def __init__(self, col:int, row:int) -> None:
+        self.col:int = col
+        self.row:int = row
+        self.cells:bytearray = bytearray(col * row)
+        self.costs:bytearray = bytearray([PLAIN]) * (col * row)
+        # Bumped once per edit, caches keyed on the map compare against it
+        self.version:int = 0
+
+    def in_bounds(self, x:int, y:int) -> bool:
+        return 0 <= x < self.col and 0 <= y < self.row
+
+    def is_blocked(self, x:int, y:int) -> bool:
+        return self.cells[y * self.col + x] != EMPTY
+
+    def get_blockers(self) -> tuple[tuple[int, int], ...]:
+        col:int = self.col
+        blockers:list[tuple[int, int]] = []
+        index:int = self.cells.find(BLOCKED)
+        while index != -1:
+            blockers.append((index % col, index // col))
+            index = self.cells.find(BLOCKED, index + 1)
+
+        return tuple(blockers)
+
+    def read_rect(self, x:int, y:int, w:int, h:int, fill:int = BLOCKED) -> bytes:
+        return self._read_layer(self.cells, x, y, w, h, fill)
+
+    def read_cost_rect(self, x:int, y:int, w:int, h:int, fill:int = PLAIN) -> bytes:
+        return self._read_layer(self.costs, x, y, w, h, fill)
+
+    def _read_layer(self, layer:bytearray, x:int, y:int, w:int, h:int, fill:int) -> bytes:
+        # Exactly w * h bytes, cells outside the map read as fill
+        out:bytearray = bytearray([fill]) * (w * h)
+        left:int = max(x, 0)
+        right:int = min(x + w, self.col)
+        if left >= right:
+            return bytes(out)
+
+        for ry in range(max(y, 0), min(y + h, self.row)):
+            base:int = (ry - y) * w - x
+            out[base + left:base + right] = layer[ry * self.col + left:ry * self.col + right]
+
+        return bytes(out)
+
+    def set_cell(self, x:int, y:int, value:int) -> None:
+        self.cells[y * self.col + x] = value
+        self.version += 1
+
+    def clear(self) -> None:
+        self.cells[:] = bytes(len(self.cells))
+        self.version += 1
+
+    def set_cost(self, x:int, y:int, cost:int) -> None:
+        self.costs[y * self.col + x] = cost
+        self.version += 1
+
+    def clear_costs(self) -> None:
+        self.costs[:] = bytes([PLAIN]) * len(self.costs)
+        self.version += 1
+
+    def fill_rect(self, x0:int, y0:int, x1:int, y1:int, value:int = BLOCKED) -> None:
+        self._fill_layer_rect(self.cells, x0, y0, x1, y1, value)
+
+    def fill_cost_rect(self, x0:int, y0:int, x1:int, y1:int, cost:int) -> None:
+        self._fill_layer_rect(self.costs, x0, y0, x1, y1, cost)
+
+    def _fill_layer_rect(self, layer:bytearray, x0:int, y0:int, x1:int, y1:int, value:int) -> None:
+        left:int = max(0, min(x0, x1))
+        right:int = min(self.col - 1, max(x0, x1))
+        top:int = max(0, min(y0, y1))
+        bottom:int = min(self.row - 1, max(y0, y1))
+        if left > right or top > bottom:
+            return
+
+        span:bytes = bytes([value]) * (right - left + 1)
+        for y in range(top, bottom + 1):
+            begin:int = y * self.col + left
+            layer[begin:begin + len(span)] = span
+
+        self.version += 1
+
+    def draw_line(self, x0:int, y0:int, x1:int, y1:int, value:int = BLOCKED) -> None:
+        # Bresenham
+        dx:int = abs(x1 - x0)
+        dy:int = -abs(y1 - y0)
+        sx:int = 1 if x0 < x1 else -1
+        sy:int = 1 if y0 < y1 else -1
+        err:int = dx + dy
+
+        while True:
+            if self.in_bounds(x0, y0):
+                self.cells[y0 * self.col + x0] = value
+
+            if x0 == x1 and y0 == y1:
+                break
+
+            e2:int = 2 * err
+            if e2 >= dy:
+                err += dy
+                x0 += sx
+            if e2 <= dx:
+                err += dx
+                y0 += sy
+
+        self.version += 1
+
+    def flood_fill(self, x:int, y:int, value:int = BLOCKED) -> None:
+        # Scanline fill over 8-connected cells, spans are found with
+        # bytearray.find/rfind and written with one slice assignment each
+        col:int = self.col
+        cells:bytearray = self.cells
+        target:int = cells[y * col + x]
+        if target == value:
+            return
+
+        other:int = BLOCKED if target == EMPTY else EMPTY
+        stack:list[tuple[int, int]] = [(x, y)]
+
+        while len(stack) > 0:
+            sx, sy = stack.pop()
+            row_start:int = sy * col
+            row_end:int = row_start + col
+            index:int = row_start + sx
+            if cells[index] != target:
+                continue
+
+            left:int = cells.rfind(other, row_start, index) + 1
+            if left == 0:
+                left = row_start
+            right:int = cells.find(other, index, row_end)
+            if right == -1:
+                right = row_end
+
+            cells[left:right] = bytes([value]) * (right - left)
+
+            for ny in (sy - 1, sy + 1):
+                if ny < 0 or ny >= self.row:
+                    continue
+
+                begin:int = ny * col + max(left - row_start - 1, 0)
+                end:int = ny * col + min(right - row_start + 1, col)
+                i:int = cells.find(target, begin, end)
+                while i != -1:
+                    stack.append((i - ny * col, ny))
+                    i = cells.find(other, i, end)
+                    if i == -1:
+                        break
+                    i = cells.find(target, i, end)
+
+        self.version += 1
+
+    def fill_random(self, density:float, seed:int|None = None) -> None:
+        rng:Random = Random(seed)
+        self.cells[:] = rng.randbytes(len(self.cells)).translate(_density_table(density))
+        self.version += 1
+
+    def generate_maze(self, seed:int|None = None) -> None:
+        # Iterative backtracker, maze cells sit on even (x, y) starting at the
+        # top left, walls everywhere else
+        rng:Random = Random(seed)
+        col:int = self.col
+        cells:bytearray = self.cells
+        cells[:] = bytes([BLOCKED]) * len(cells)
+
+        cell_cols:int = (col + 1) // 2
+        cell_rows:int = (self.row + 1) // 2
+        visited:bytearray = bytearray(cell_cols * cell_rows)
+        moves:tuple[tuple[int, int], ...] = ((0, -1), (1, 0), (0, 1), (-1, 0))
+
+        visited[0] = 1
+        cells[0] = EMPTY
+        stack:list[tuple[int, int]] = [(0, 0)]
+        while len(stack) > 0:
+            cx, cy = stack[-1]
+            options:list[tuple[int, int]] = []
+            for dx, dy in moves:
+                nx:int = cx + dx
+                ny:int = cy + dy
+                if 0 <= nx < cell_cols and 0 <= ny < cell_rows and not visited[ny * cell_cols + nx]:
+                    options.append((nx, ny))
+
+            if len(options) == 0:
+                stack.pop()
+                continue
+
+            nx, ny = options[rng.randrange(len(options))]
+            visited[ny * cell_cols + nx] = 1
+            cells[(cy + ny) * col + cx + nx] = EMPTY
+            cells[ny * 2 * col + nx * 2] = EMPTY
+            stack.append((nx, ny))
+
+        self.version += 1
+
+    def generate_caves(self, density:float = 0.45, steps:int = 4, seed:int|None = None) -> None:
+        # Cellular automaton (4-5 rule) run on the whole map as one big integer,
+        # neighbour counts are summed with bitwise adders instead of per cell
+        col:int = self.col
+        row:int = self.row
+        stride:int = col + 2
+        self.fill_random(density, seed)
+
+        padded:bytearray = bytearray([BLOCKED]) * (stride * (row + 2))
+        for y in range(row):
+            begin:int = (y + 1) * stride + 1
+            padded[begin:begin + col] = self.cells[y * col:(y + 1) * col]
+
+        # Bit i of board is padded[i], the padding ring stays blocked
+        size:int = len(padded)
+        full:int = (1 << size) - 1
+        inner:int = self._get_inner_mask(col, row)
+        border:int = full & ~inner
+        board:int = int(padded[::-1].translate(_TO_ASCII), 2)
+
+        shifts:tuple[int, ...] = (-stride - 1, -stride, -stride + 1, -1, 1, stride - 1, stride, stride + 1)
+        for _ in range(steps):
+            neighbours:list[int] = [(board >> s if s > 0 else board << -s) & full for s in shifts]
+
+            # Bit-sliced population count of the eight neighbour planes
+            b0:int = 0
+            b1:int = 0
+            b2:int = 0
+            b3:int = 0
+            for n in neighbours:
+                carry0:int = b0 & n
+                b0 ^= n
+                carry1:int = b1 & carry0
+                b1 ^= carry0
+                carry2:int = b2 & carry1
+                b2 ^= carry1
+                b3 |= carry2
+
+            at_least_4:int = b2 | b3
+            at_least_5:int = b3 | (b2 & (b0 | b1))
+            board = ((at_least_5 | (board & at_least_4)) & inner) | border
+
+        bits:bytes = format(board, "b").zfill(size).encode()
+        padded = bytearray(bits.translate(_FROM_ASCII)[::-1])
+        for y in range(row):
+            begin = (y + 1) * stride + 1
+            self.cells[y * col:(y + 1) * col] = padded[begin:begin + col]
+
+        self.version += 1
+
+    @staticmethod
+    def _get_inner_mask(col:int, row:int) -> int:
+        stride:int = col + 2
+        line:int = ((1 << col) - 1) << 1
+        mask:int = 0
+        for y in range(1, row + 1):
+            mask |= line << (y * stride)
+
+        return mask
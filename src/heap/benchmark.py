@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+
+from __future__ import annotations
+from array import array
+from collections.abc import Callable
+from dataclasses import dataclass
+from random import Random
+from time import perf_counter_ns
+import argparse
+import heapq
+import struct
+import tracemalloc
+
+from astar.astar import QUEUE_DECREASE, QUEUE_POP, QUEUE_PUSH, _search_grid
+from .heap import GenericHeap, IndexedHeap
+
+_MAGIC:bytes = b"PQT1"
+_HEADER:struct.Struct = struct.Struct("<4sII")
+
+
+class QueueTrace:
+    def __init__(self) -> None:
+        self.ops:array = array("B")
+        self.items:array = array("I")
+        self.keys:array = array("q")
+
+    def __len__(self) -> int:
+        return len(self.ops)
+
+    def record(self, op:int, item:int, key:int) -> None:
+        self.ops.append(op)
+        self.items.append(item)
+        self.keys.append(key)
+
+
+def save_traces(path:str, traces:list[QueueTrace]) -> None:
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, len(traces), 0))
+        for trace in traces:
+            f.write(struct.pack("<I", len(trace)))
+            trace.ops.tofile(f)
+            trace.items.tofile(f)
+            trace.keys.tofile(f)
+
+
+def load_traces(path:str) -> list[QueueTrace]:
+    traces:list[QueueTrace] = []
+    with open(path, "rb") as f:
+        magic, count, _ = _HEADER.unpack(f.read(_HEADER.size))
+        if magic != _MAGIC:
+            raise ValueError(f"[{path}] is not a queue trace file")
+
+        for _ in range(count):
+            (length,) = struct.unpack("<I", f.read(4))
+            trace:QueueTrace = QueueTrace()
+            trace.ops.fromfile(f, length)
+            trace.items.fromfile(f, length)
+            trace.keys.fromfile(f, length)
+            traces.append(trace)
+
+    return traces
+
+
+def record_traces(col:int, row:int, density:float, queries:int, seed:int) -> list[QueueTrace]:
+    rng:Random = Random(seed)
+    grid:bytearray = bytearray(1 if rng.random() < density else 0 for _ in range(col * row))
+    free:list[int] = [i for i in range(col * row) if not grid[i]]
+
+    traces:list[QueueTrace] = []
+    for _ in range(queries):
+        start:int = rng.choice(free)
+        end:int = rng.choice(free)
+        trace:QueueTrace = QueueTrace()
+        _search_grid(col, row, grid, (start % col, start // col), (end % col, end // col), recorder=trace.record)
+        traces.append(trace)
+
+    return traces
+
+
+# Queue adapters, all expose push(item, key), pop() -> item and decrease(item, key)
+class HeapqQueue:
+    def __init__(self) -> None:
+        self._heap:list[tuple[int, int]] = []
+        self._keys:dict[int, int] = {}
+
+    def push(self, item:int, key:int) -> None:
+        self._keys[item] = key
+        heapq.heappush(self._heap, (key, item))
+
+    def pop(self) -> int:
+        while True:
+            key, item = heapq.heappop(self._heap)
+            if self._keys.get(item) == key:
+                del self._keys[item]
+                return item
+
+    def decrease(self, item:int, key:int) -> None:
+        self.push(item, key)
+
+
+@dataclass
+class _Entry:
+    item:int
+    key:int
+
+
+def _entry_cmp(a:_Entry, b:_Entry) -> bool:
+    return a.key < b.key
+
+
+class GenericHeapQueue:
+    # Mirrors start_path_finding: decrease-key edits the entry then calls fix()
+    def __init__(self) -> None:
+        self._heap:GenericHeap[_Entry] = GenericHeap[_Entry]([], _entry_cmp)
+        self._entries:dict[int, _Entry] = {}
+
+    def push(self, item:int, key:int) -> None:
+        entry:_Entry = _Entry(item, key)
+        self._entries[item] = entry
+        self._heap.push(entry)
+
+    def pop(self) -> int:
+        entry:_Entry = self._heap.pop()
+        self._entries.pop(entry.item, None)
+        return entry.item
+
+    def decrease(self, item:int, key:int) -> None:
+        entry:_Entry|None = self._entries.get(item)
+        if entry is None:
+            self.push(item, key)
+            return
+
+        entry.key = key
+        self._heap.fix()
+
+
+class IndexedHeapQueue:
+    def __init__(self) -> None:
+        self._heap:IndexedHeap = IndexedHeap()
+
+    def push(self, item:int, key:int) -> None:
+        self._heap.push(item, key)
+
+    def pop(self) -> int:
+        return self._heap.pop()
+
+    def decrease(self, item:int, key:int) -> None:
+        if self._heap.contains(item):
+            self._heap.decrease(item, key)
+        else:
+            self._heap.push(item, key)
+
+
+QUEUES:dict[str, Callable[[], object]] = {
+    "heapq": HeapqQueue,
+    "GenericHeap": GenericHeapQueue,
+    "IndexedHeap": IndexedHeapQueue,
+}
+
+
+def _replay(traces:list[QueueTrace], factory:Callable[[], object]) -> None:
+    for trace in traces:
+        queue = factory()
+        push = queue.push
+        pop = queue.pop
+        decrease = queue.decrease
+        items:array = trace.items
+        keys:array = trace.keys
+
+        for i, op in enumerate(trace.ops):
+            if op == QUEUE_PUSH:
+                push(items[i], keys[i])
+            elif op == QUEUE_POP:
+                pop()
+            elif op == QUEUE_DECREASE:
+                decrease(items[i], keys[i])
+
+
+def run_benchmark(traces:list[QueueTrace], repeat:int = 3) -> dict[str, tuple[float, int]]:
+    total_ops:int = sum(len(t) for t in traces)
+    results:dict[str, tuple[float, int]] = {}
+
+    for name, factory in QUEUES.items():
+        # Time without tracemalloc, it slows every allocation down
+        best_ns:int = -1
+        for _ in range(repeat):
+            time_start:int = perf_counter_ns()
+            _replay(traces, factory)
+            elapsed:int = perf_counter_ns() - time_start
+            if best_ns == -1 or elapsed < best_ns:
+                best_ns = elapsed
+
+        tracemalloc.start()
+        _replay(traces, factory)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        results[name] = (best_ns / max(total_ops, 1), peak)
+
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-c", "--col", help="Column size of the generated map", type=int, default=200)
+    parser.add_argument("-r", "--row", help="Row size of the generated map", type=int, default=200)
+    parser.add_argument("-d", "--density", help="Blocker density, 0 to 1", type=float, default=0.25)
+    parser.add_argument("-q", "--queries", help="Number of recorded queries", type=int, default=20)
+    parser.add_argument("-s", "--seed", type=int, default=0)
+    parser.add_argument("--load", help="Replay traces from this file instead of recording", default=None)
+    parser.add_argument("--save", help="Save the recorded traces to this file", default=None)
+
+    args = parser.parse_args()
+
+    if args.load is not None:
+        traces:list[QueueTrace] = load_traces(args.load)
+    else:
+        traces = record_traces(args.col, args.row, args.density, args.queries, args.seed)
+
+    if args.save is not None:
+        save_traces(args.save, traces)
+
+    push_count:int = sum(t.ops.count(QUEUE_PUSH) for t in traces)
+    pop_count:int = sum(t.ops.count(QUEUE_POP) for t in traces)
+    decrease_count:int = sum(t.ops.count(QUEUE_DECREASE) for t in traces)
+    print(f"traces: [{len(traces)}] push: [{push_count}] pop: [{pop_count}] decrease: [{decrease_count}]")
+
+    for name, (ns_per_op, peak) in run_benchmark(traces).items():
+        print(f"{name:>12}: [{ns_per_op:.01f} ns/op] peak memory: [{peak / 1024:.01f} KiB]")
+
+
+if __name__ == "__main__":
+    main()
@@ -78,6 +78,81 @@ class GenericHeap(Generic[T]):
         self._elements[i], self._elements[j] = self._elements[j], self._elements[i]
 
 
+class IndexedHeap():
+    def __init__(self) -> None:
+        super().__init__()
+        self._keys:list[int] = []
+        self._items:list[int] = []
+        self._positions:dict[int, int] = {}
+
+    def __str__(self) -> str:
+        return ", ".join(f"{i}:{k}" for i, k in zip(self._items, self._keys))
+
+    def len(self) -> int:
+        return self._keys.__len__()
+
+    def contains(self, item:int) -> bool:
+        return item in self._positions
+
+    def push(self, item:int, key:int) -> None:
+        self._keys.append(key)
+        self._items.append(item)
+        self._positions[item] = len(self._items) - 1
+        self._sift_up(len(self._items) - 1)
+
+    def pop(self) -> int:
+        if len(self._items) == 0:
+            raise IndexError(f"Array length is 0, unable to pop")
+
+        self._swap(0, len(self._items) - 1)
+
+        self._keys.pop(-1)
+        item:int = self._items.pop(-1)
+        del self._positions[item]
+
+        self._sift_down(0)
+
+        return item
+
+    def decrease(self, item:int, key:int) -> None:
+        index:int = self._positions[item]
+        if key >= self._keys[index]:
+            return
+
+        self._keys[index] = key
+        self._sift_up(index)
+
+    def _sift_up(self, child:int) -> None:
+        keys:list[int] = self._keys
+        parent:int = (child - 1) // 2
+        while child > 0 and keys[child] < keys[parent]:
+            self._swap(child, parent)
+            child = parent
+            parent = (child - 1) // 2
+
+    def _sift_down(self, curr:int) -> None:
+        keys:list[int] = self._keys
+        end:int = len(keys) - 1
+        left:int = (curr * 2) + 1
+        while left <= end:
+            swap:int = left
+            if left + 1 <= end and keys[left + 1] < keys[left]:
+                swap = left + 1
+
+            if keys[swap] < keys[curr]:
+                self._swap(swap, curr)
+                curr = swap
+                left = (curr * 2) + 1
+            else:
+                return
+
+    def _swap(self, i:int, j:int) -> None:
+        self._keys[i], self._keys[j] = self._keys[j], self._keys[i]
+        self._items[i], self._items[j] = self._items[j], self._items[i]
+        self._positions[self._items[i]] = i
+        self._positions[self._items[j]] = j
+
+
 def cmp(a:int, b:int) -> bool:
     return a < b
 
@@ -3,6 +3,7 @@
 from PyQt6.QtWidgets import QApplication
 from visuals.visualizer_window import VisualizerWindow
 from visuals.size_input_windows import SizeInputWindow
+from gridmap.chunked import ChunkedGrid
 import sys
 import argparse
 
@@ -10,7 +11,7 @@ size_input_windows:SizeInputWindow|None = None
 visualizer_window:VisualizerWindow|None = None
 
 
-def create_visualizer_window(col:int, row:int) -> None:
+def create_visualizer_window(col:int, row:int, chunked_grid:ChunkedGrid|None = None) -> None:
     print(f"create_visualizer_window - {col = } , {row = }")
 
     global size_input_windows
@@ -21,7 +22,7 @@ def create_visualizer_window(col:int, row:int) -> None:
         if is_close:
             print(f"size_input_windows closed")
 
-    visualizer_window = VisualizerWindow(col, row)
+    visualizer_window = VisualizerWindow(col, row, chunked_grid)
     visualizer_window.show()
 
 
@@ -31,10 +32,13 @@ def create_size_input_window() -> None:
     size_input_windows.show()
 
 
-def main(col:int, row:int) -> None:
+def main(col:int, row:int, map_path:str|None = None) -> None:
     app:QApplication = QApplication(sys.argv)
 
-    if col > 1 and row > 1:
+    if map_path is not None:
+        chunked_grid:ChunkedGrid = ChunkedGrid(map_path)
+        create_visualizer_window(chunked_grid.col, chunked_grid.row, chunked_grid)
+    elif col > 1 and row > 1:
         create_visualizer_window(col, row)
     else:
         create_size_input_window()
@@ -47,10 +51,13 @@ if __name__ == "__main__":
     group = parser.add_argument_group()
     group.add_argument("-c", "--c", help="Column size, needs to be > 1", type=int, default=-1)
     group.add_argument("-r", "--r", help="Row size, needs to be > 1", type=int, default=-1)
+    group.add_argument("-m", "--map", help="Chunked grid file, tiles are loaded on demand", type=str, default=None)
 
     args = parser.parse_args()
 
     col:int = getattr(args, "c")
     row:int = getattr(args, "r")
 
-    main(col, row)
+    map_path:str|None = getattr(args, "map")
+
+    main(col, row, map_path)
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+
+from __future__ import annotations
+from time import perf_counter
+import argparse
+import asyncio
+import json
+import random
+
+
+async def _open(unix:str|None, port:int) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    if unix is not None:
+        return await asyncio.open_unix_connection(unix, limit=1 << 24)
+
+    return await asyncio.open_connection("127.0.0.1", port, limit=1 << 24)
+
+
+async def _call(reader:asyncio.StreamReader, writer:asyncio.StreamWriter, request:dict) -> dict:
+    writer.write(json.dumps(request, separators=(",", ":")).encode() + b"\n")
+    await writer.drain()
+    return json.loads(await reader.readline())
+
+
+def _get_percentile(sorted_values:list[float], p:float) -> float:
+    if len(sorted_values) == 0:
+        return 0.0
+
+    return sorted_values[min(int(len(sorted_values) * p), len(sorted_values) - 1)]
+
+
+async def run_load(unix:str|None, port:int, map_name:str|None, requests:int, connections:int, distinct:int, heuristic:str, seed:int) -> None:
+    reader, writer = await _open(unix, port)
+    maps:dict[str, list[int]] = (await _call(reader, writer, {"id": 0, "op": "maps"}))["maps"]
+    writer.close()
+
+    if map_name is None:
+        map_name = next(iter(maps))
+    col, row = maps[map_name]
+
+    # A small pool of distinct queries makes repeats, and so coalescing, likely
+    rng:random.Random = random.Random(seed)
+    pool:list[tuple[list[int], list[int]]] = [([rng.randrange(col), rng.randrange(row)], [rng.randrange(col), rng.randrange(row)]) for _ in range(max(distinct, 1))]
+    queue:asyncio.Queue[int] = asyncio.Queue()
+    for i in range(requests):
+        queue.put_nowait(i)
+
+    latencies:list[float] = []
+    errors:list[str] = []
+
+    async def client() -> None:
+        # Closed loop: one request in flight per connection
+        reader, writer = await _open(unix, port)
+        try:
+            while not queue.empty():
+                i:int = queue.get_nowait()
+                start, end = pool[rng.randrange(len(pool))]
+                time_start:float = perf_counter()
+                response:dict = await _call(reader, writer, {"id": i, "map": map_name, "start": start, "end": end, "heuristic": heuristic})
+                latencies.append(perf_counter() - time_start)
+                if "error" in response:
+                    errors.append(response["error"])
+        finally:
+            writer.close()
+
+    time_start:float = perf_counter()
+    await asyncio.gather(*(client() for _ in range(max(connections, 1))))
+    elapsed:float = perf_counter() - time_start
+
+    latencies.sort()
+    print(f"map: [{map_name}] {col} x {row} requests: [{len(latencies)}] connections: [{connections}] errors: [{len(errors)}]")
+    print(f"throughput: [{len(latencies) / elapsed:.01f} req/s] in [{elapsed:.02f} sec]")
+    print(
+        f"latency ms p50: [{_get_percentile(latencies, 0.5) * 1000:.02f}] p90: [{_get_percentile(latencies, 0.9) * 1000:.02f}] "
+        f"p99: [{_get_percentile(latencies, 0.99) * 1000:.02f}] max: [{_get_percentile(latencies, 1.0) * 1000:.02f}]"
+    )
+    if len(errors) > 0:
+        print(f"first error: [{errors[0]}]")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-u", "--unix", help="Unix socket path of the server", type=str, default=None)
+    parser.add_argument("-p", "--port", help="Localhost TCP port of the server", type=int, default=7878)
+    parser.add_argument("-m", "--map", help="Map name, defaults to the first served map", type=str, default=None)
+    parser.add_argument("-n", "--requests", help="Total requests", type=int, default=1000)
+    parser.add_argument("-c", "--connections", help="Concurrent connections", type=int, default=16)
+    parser.add_argument("-d", "--distinct", help="Distinct queries to draw from", type=int, default=200)
+    parser.add_argument("--heuristic", choices=("square", "octile"), default="square")
+    parser.add_argument("-s", "--seed", type=int, default=0)
+
+    args = parser.parse_args()
+
+    asyncio.run(run_load(args.unix, args.port, args.map, args.requests, args.connections, args.distinct, args.heuristic, args.seed))
+
+
+if __name__ == "__main__":
+    main()
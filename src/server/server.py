@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import argparse
+import asyncio
+import json
+import os
+import signal
+
+from astar.astar import _make_octile_heuristic, _make_square_heuristic, _search_masks
+from astar.masks import build_masks
+from gridmap.chunked import ChunkedGrid
+from timing.profiling import Profiler
+
+HEURISTICS:tuple[str, ...] = ("square", "octile")
+
+# Longest request line accepted, longer lines close the connection
+_LINE_LIMIT:int = 1 << 16
+
+# Per-worker views of the shared map masks, set up once by _init_worker
+_worker_maps:dict[str, tuple[shared_memory.SharedMemory, int, int]] = {}
+# Per-worker sampler when the server runs with --profile-every
+_worker_profiler:Profiler|None = None
+
+
+def _init_worker(maps:list[tuple[str, str, int, int]], profile_every:int = 0, profile_dir:str = "profiles") -> None:
+    global _worker_profiler
+
+    for name, shm_name, col, row in maps:
+        _worker_maps[name] = (shared_memory.SharedMemory(name=shm_name), col, row)
+
+    if profile_every > 0:
+        _worker_profiler = Profiler(profile_every, profile_dir)
+
+
+def _run_query(name:str, start:tuple[int, int], end:tuple[int, int], heuristic:str) -> list[list[int]]|None:
+    shm, col, row = _worker_maps[name]
+    h = _make_octile_heuristic(col) if heuristic == "octile" else _make_square_heuristic(col)
+    if _worker_profiler is None:
+        path = _search_masks(col, row, shm.buf, start, end, h)
+    else:
+        params:dict = {"map": name, "start": start, "end": end, "heuristic": heuristic}
+        path = _worker_profiler.run("query", params, _search_masks, col, row, shm.buf, start, end, h)
+    return None if path is None else [[x, y] for x, y in path]
+
+
+class _MapInfo:
+    def __init__(self, name:str, col:int, row:int, shm:shared_memory.SharedMemory) -> None:
+        self.name:str = name
+        self.col:int = col
+        self.row:int = row
+        self.shm:shared_memory.SharedMemory = shm
+
+
+class PathServer:
+    # JSON lines over a stream socket. A request is
+    #   {"id": .., "map": name, "start": [x, y], "end": [x, y], "heuristic": "square"}
+    # and the answer {"id": .., "path": [[x, y], ...] | null} or {"id": .., "error": ..},
+    # answers can come back out of order. {"id": .., "op": "maps"} lists the maps.
+    def __init__(self, map_paths:list[str], workers:int|None = None, max_pending:int = 256, profile_every:int = 0, profile_dir:str = "profiles") -> None:
+        self.maps:dict[str, _MapInfo] = {}
+        self.coalesced:int = 0
+
+        for path in map_paths:
+            name:str = os.path.splitext(os.path.basename(path))[0]
+            grid:ChunkedGrid = ChunkedGrid(path)
+            try:
+                masks:bytearray = build_masks(grid.col, grid.row, grid.read_rect(0, 0, grid.col, grid.row))
+            finally:
+                grid.close()
+
+            shm = shared_memory.SharedMemory(create=True, size=max(len(masks), 1))
+            shm.buf[:len(masks)] = masks
+            self.maps[name] = _MapInfo(name, grid.col, grid.row, shm)
+
+        init_maps:list[tuple[str, str, int, int]] = [(m.name, m.shm.name, m.col, m.row) for m in self.maps.values()]
+        self._executor = ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1, initializer=_init_worker, initargs=(init_maps, profile_every, profile_dir))
+        # Requests being worked on, the read loops stop reading when it is full
+        self._pending = asyncio.Semaphore(max_pending)
+        self._in_flight:dict[tuple[str, tuple[int, int], tuple[int, int], str], asyncio.Future] = {}
+
+    def close(self) -> None:
+        self._executor.shutdown()
+        for info in self.maps.values():
+            info.shm.close()
+            info.shm.unlink()
+        self.maps.clear()
+
+    async def serve_unix(self, path:str) -> None:
+        server = await asyncio.start_unix_server(self._handle_connection, path, limit=_LINE_LIMIT)
+        async with server:
+            await server.serve_forever()
+
+    async def serve_tcp(self, host:str, port:int) -> None:
+        server = await asyncio.start_server(self._handle_connection, host, port, limit=_LINE_LIMIT)
+        async with server:
+            await server.serve_forever()
+
+    async def find_path(self, name:str, start:tuple[int, int], end:tuple[int, int], heuristic:str) -> list[list[int]]|None:
+        # Identical queries already running share one pool job
+        key = (name, start, end, heuristic)
+        future:asyncio.Future|None = self._in_flight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._executor, _run_query, name, start, end, heuristic)
+        self._in_flight[key] = future
+        try:
+            return await asyncio.shield(future)
+        finally:
+            self._in_flight.pop(key, None)
+
+    def _parse_query(self, request:dict) -> tuple[str, tuple[int, int], tuple[int, int], str]:
+        name = request.get("map")
+        if name not in self.maps:
+            raise ValueError(f"Unknown map [{name}]")
+
+        info:_MapInfo = self.maps[name]
+        points:list[tuple[int, int]] = []
+        for field in ("start", "end"):
+            pt = request.get(field)
+            # type() rather than isinstance(), JSON true / false would pass as 1 / 0
+            if type(pt) is not list or len(pt) != 2 or not all(type(v) is int for v in pt):
+                raise ValueError(f"[{field}] must be [x, y]")
+            if not (0 <= pt[0] < info.col and 0 <= pt[1] < info.row):
+                raise ValueError(f"[{field}] {pt} is outside the map [{info.col} x {info.row}]")
+            points.append((pt[0], pt[1]))
+
+        heuristic = request.get("heuristic", "square")
+        if heuristic not in HEURISTICS:
+            raise ValueError(f"Unknown heuristic [{heuristic}]")
+
+        return name, points[0], points[1], heuristic
+
+    async def _handle_request(self, line:bytes, writer:asyncio.StreamWriter, write_lock:asyncio.Lock) -> None:
+        response:dict
+        request_id = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("Request must be a JSON object")
+
+            request_id = request.get("id")
+            if request.get("op") == "maps":
+                response = {"id": request_id, "maps": {m.name: [m.col, m.row] for m in self.maps.values()}}
+            else:
+                path = await self.find_path(*self._parse_query(request))
+                response = {"id": request_id, "path": path}
+        except ValueError as e:
+            response = {"id": request_id, "error": f"{e}"}
+        except Exception as e:
+            response = {"id": request_id, "error": f"Search failed: {e!r}"}
+        finally:
+            self._pending.release()
+
+        async with write_lock:
+            writer.write(json.dumps(response, separators=(",", ":")).encode() + b"\n")
+            await writer.drain()
+
+    async def _handle_connection(self, reader:asyncio.StreamReader, writer:asyncio.StreamWriter) -> None:
+        write_lock = asyncio.Lock()
+        tasks:set[asyncio.Task] = set()
+        try:
+            while True:
+                try:
+                    line:bytes = await reader.readline()
+                except (ValueError, ConnectionError):
+                    break
+
+                if len(line) == 0:
+                    break
+
+                if line.strip() == b"":
+                    continue
+
+                # Backpressure: no slot, no further reads, the socket buffers
+                # fill up and clients block on send
+                await self._pending.acquire()
+                task = asyncio.create_task(self._handle_request(line, writer, write_lock))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+
+            if len(tasks) > 0:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("maps", help="Chunked grid files, served by file name without extension", nargs="+")
+    parser.add_argument("-u", "--unix", help="Unix socket path to listen on", type=str, default=None)
+    parser.add_argument("-p", "--port", help="Localhost TCP port to listen on", type=int, default=7878)
+    parser.add_argument("-w", "--workers", help="Worker processes, defaults to the cpu count", type=int, default=None)
+    parser.add_argument("--max-pending", help="Requests in progress before reads pause", type=int, default=256)
+    parser.add_argument("--profile-every", help="Profile one query in N per worker, 0 disables", type=int, default=0)
+    parser.add_argument("--profile-dir", help="Where sampled pstats and tracemalloc snapshots go", type=str, default="profiles")
+
+    args = parser.parse_args()
+
+    async def run() -> None:
+        server = PathServer(args.maps, args.workers, args.max_pending, args.profile_every, args.profile_dir)
+        main_task = asyncio.current_task()
+        if main_task is not None:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, main_task.cancel)
+        try:
+            print(f"Serving maps {list(server.maps)} on [{args.unix or f'127.0.0.1:{args.port}'}]")
+            if args.unix is not None:
+                await server.serve_unix(args.unix)
+            else:
+                await server.serve_tcp("127.0.0.1", args.port)
+        finally:
+            server.close()
+            if args.unix is not None and os.path.exists(args.unix):
+                os.unlink(args.unix)
+            print(f"Coalesced requests: [{server.coalesced}]")
+
+    try:
+        asyncio.run(run())
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+
+
+if __name__ == "__main__":
+    main()
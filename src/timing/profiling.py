@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+
+from __future__ import annotations
+from collections.abc import Callable
+from functools import wraps
+from typing import Any
+import cProfile
+import inspect
+import os
+import re
+import tracemalloc
+
+# ASTAR_PROFILE=N profiles one call in N of every @profiled function, unset
+# or 0 leaves the functions undecorated. Files go to ASTAR_PROFILE_DIR.
+PROFILE_ENV:str = "ASTAR_PROFILE"
+PROFILE_DIR_ENV:str = "ASTAR_PROFILE_DIR"
+PROFILE_DIR:str = "profiles"
+
+# Stack depth kept per allocation in the snapshots
+PROFILE_FRAMES:int = 16
+
+# Set while a profiled call runs, nested samples would fight over cProfile
+_active:bool = False
+
+
+def _format_value(value:Any) -> str|None:
+    # Only small query values make it into file names, maps and callables don't
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, str)):
+        return re.sub(r"[^\w.]+", "_", f"{value}")[:32]
+    if isinstance(value, tuple) and len(value) == 2 and all(isinstance(v, int) for v in value):
+        return f"{value[0]}_{value[1]}"
+
+    return None
+
+
+def get_query_tag(params:dict[str, Any]) -> str:
+    parts:list[str] = []
+    for key, value in params.items():
+        text:str|None = _format_value(value)
+        if text is not None:
+            parts.append(f"{key}={text}")
+
+    return "-".join(parts)
+
+
+class Profiler:
+    # Runs one call in every sample_every under cProfile and tracemalloc and
+    # saves <name>-<query>-<pid>-<seq>.pstats / .tracemalloc into out_dir.
+    # Load them with pstats.Stats(path) and tracemalloc.Snapshot.load(path).
+    def __init__(self, sample_every:int = 1, out_dir:str = PROFILE_DIR) -> None:
+        self.sample_every:int = max(sample_every, 1)
+        self.out_dir:str = out_dir
+        self.calls:int = 0
+        self.saved:list[str] = []
+
+    def sample(self) -> bool:
+        self.calls += 1
+        return self.calls % self.sample_every == 0 and not _active
+
+    def run(self, name:str, params:dict[str, Any], f:Callable[..., Any], *args, **kw) -> Any:
+        if not self.sample():
+            return f(*args, **kw)
+
+        return self.profile(name, params, f, *args, **kw)
+
+    def profile(self, name:str, params:dict[str, Any], f:Callable[..., Any], *args, **kw) -> Any:
+        global _active
+
+        # Under telemetry tracemalloc may already be tracing, leave it running
+        was_tracing:bool = tracemalloc.is_tracing()
+        if not was_tracing:
+            tracemalloc.start(PROFILE_FRAMES)
+
+        profile = cProfile.Profile()
+        _active = True
+        try:
+            profile.enable()
+            try:
+                result = f(*args, **kw)
+            finally:
+                profile.disable()
+            snapshot:tracemalloc.Snapshot = tracemalloc.take_snapshot()
+        finally:
+            _active = False
+            if not was_tracing:
+                tracemalloc.stop()
+
+        os.makedirs(self.out_dir, exist_ok=True)
+        tag:str = get_query_tag(params)
+        base:str = os.path.join(self.out_dir, "-".join(p for p in (re.sub(r"[^\w.]+", "_", name), tag, f"{os.getpid()}", f"{self.calls}") if p != ""))
+        profile.dump_stats(f"{base}.pstats")
+        snapshot.dump(f"{base}.tracemalloc")
+        self.saved.append(base)
+        print(f"profile: [{name}] saved [{base}.pstats] and [{base}.tracemalloc]")
+        return result
+
+
+def _get_env_profiler() -> Profiler|None:
+    try:
+        every:int = int(os.environ.get(PROFILE_ENV, "0"))
+    except ValueError:
+        return None
+
+    if every <= 0:
+        return None
+
+    return Profiler(every, os.environ.get(PROFILE_DIR_ENV, PROFILE_DIR))
+
+
+# Decided once at import, so a disabled run keeps the plain functions
+env_profiler:Profiler|None = _get_env_profiler()
+
+
+def profiled(f):
+    # Opt in through the environment, see PROFILE_ENV. For an API switch hand
+    # a Profiler to the caller instead, e.g. telemetry.run_search(profiler=..)
+    if env_profiler is None:
+        return f
+
+    profiler:Profiler = env_profiler
+    signature:inspect.Signature = inspect.signature(f)
+
+    @wraps(f)
+    def wrap(*args, **kw):
+        if not profiler.sample():
+            return f(*args, **kw)
+
+        bound = signature.bind_partial(*args, **kw)
+        return profiler.profile(f.__name__, dict(bound.arguments), f, *args, **kw)
+    return wrap
@@ -4,9 +4,9 @@ from collections.abc import Callable
 
 from .node import NODE_SIZE
 
-from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QPen
-from PyQt6.QtWidgets import QGraphicsScene, QGraphicsView
+from PyQt6.QtCore import QLineF, QRectF, Qt
+from PyQt6.QtGui import QBrush, QImage, QPen, QPixmap
+from PyQt6.QtWidgets import QGraphicsPixmapItem, QGraphicsScene, QGraphicsView
 from PyQt6.QtWidgets import QGraphicsItemGroup
 from PyQt6.QtWidgets import QGraphicsLineItem
 
@@ -15,6 +15,8 @@ class GridScene(QGraphicsScene):
     def __init__(self, col:int, row:int, mouse_click_callback:Callable[[int, int], None], mouse_move_callback:Callable[[int, int], None]):
         super().__init__(0, 0, NODE_SIZE * col, NODE_SIZE * row)
 
+        self._col:int = col
+        self._row:int = row
         self._mouse_click_callback = mouse_click_callback
         self._mouse_move_callback = mouse_move_callback
 
@@ -44,21 +46,40 @@ class GridScene(QGraphicsScene):
 
         self.addItem(group_border)
 
-        # Grid Seperator
-        group_seperator = QGraphicsItemGroup()
-        for y in range(1, row):
-            for x in range(1, col):
-                lh = QGraphicsLineItem(0, y * NODE_SIZE, self.width(), y * NODE_SIZE)
-                lh.setPen(p_black)
-                lh.setOpacity(0.25)
-                group_seperator.addToGroup(lh)
+        # Grid separators and empty cell dots are painted in drawBackground,
+        # only for the exposed area, so the scene holds no per cell items
 
-                lv = QGraphicsLineItem(x * NODE_SIZE, 0, x * NODE_SIZE, self.height())
-                lv.setPen(p_black)
-                lv.setOpacity(0.25)
-                group_seperator.addToGroup(lv)
+    def drawBackground(self, painter, rect) -> None:
+        super().drawBackground(painter, rect)
 
-        self.addItem(group_seperator)
+        left:int = max(int(rect.left() // NODE_SIZE), 0)
+        right:int = min(int(rect.right() // NODE_SIZE) + 1, self._col)
+        top:int = max(int(rect.top() // NODE_SIZE), 0)
+        bottom:int = min(int(rect.bottom() // NODE_SIZE) + 1, self._row)
+        if left >= right or top >= bottom:
+            return
+
+        painter.save()
+
+        p_black = QPen(Qt.GlobalColor.black)
+        p_black.setWidth(3)
+        painter.setPen(p_black)
+        painter.setOpacity(0.25)
+        for x in range(max(left, 1), min(right + 1, self._col)):
+            painter.drawLine(QLineF(x * NODE_SIZE, top * NODE_SIZE, x * NODE_SIZE, bottom * NODE_SIZE))
+        for y in range(max(top, 1), min(bottom + 1, self._row)):
+            painter.drawLine(QLineF(left * NODE_SIZE, y * NODE_SIZE, right * NODE_SIZE, y * NODE_SIZE))
+
+        circle_size = NODE_SIZE * 0.2
+        circle_offset = (NODE_SIZE - circle_size) * 0.5
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(QBrush(Qt.GlobalColor.gray))
+        painter.setOpacity(0.15)
+        for y in range(top, bottom):
+            for x in range(left, right):
+                painter.drawEllipse(QRectF(NODE_SIZE * x + circle_offset, NODE_SIZE * y + circle_offset, circle_size, circle_size))
+
+        painter.restore()
 
     def mousePressEvent(self, event) -> None:
         self._is_mouse_clicked = True
@@ -103,10 +124,51 @@ class GridScene(QGraphicsScene):
         return x, y
 
 
+class CellLayer(QGraphicsPixmapItem):
+    # Draws a region of a flat cell buffer as one indexed image, one pixel per
+    # cell, the owner keeps the region on the visible part of the grid
+    def __init__(self, colors:list[int]):
+        super().__init__()
+
+        self._colors:list[int] = colors
+        self._region:tuple[int, int, int, int] = (0, 0, 0, 0)
+        self._image:QImage = QImage()
+
+        self.setScale(NODE_SIZE)
+        self.setTransformationMode(Qt.TransformationMode.FastTransformation)
+        self.setAcceptedMouseButtons(Qt.MouseButton.NoButton)
+
+    def set_region(self, x:int, y:int, w:int, h:int, cells:bytes) -> None:
+        image:QImage = QImage(cells, w, h, w, QImage.Format.Format_Indexed8)
+        image.setColorTable(self._colors)
+        self._image = image.copy()
+        self._region = (x, y, w, h)
+
+        self.setPos(x * NODE_SIZE, y * NODE_SIZE)
+        self.setPixmap(QPixmap.fromImage(self._image))
+
+    def update_cell(self, x:int, y:int, value:int) -> None:
+        rx, ry, w, h = self._region
+        if x < rx or x >= rx + w or y < ry or y >= ry + h:
+            return
+
+        self._image.setPixel(x - rx, y - ry, value)
+        self.setPixmap(QPixmap.fromImage(self._image))
+
+
 class GridView(QGraphicsView):
-    def __init__(self, scene:GridScene):
+    def __init__(self, scene:GridScene, viewport_callback:Callable[[], None]|None = None):
         super(GridView, self).__init__()
+        self._viewport_callback = viewport_callback
         self.setMouseTracking(True)
         self.setScene(scene)
 
+    def scrollContentsBy(self, dx:int, dy:int) -> None:
+        super().scrollContentsBy(dx, dy)
+        if self._viewport_callback is not None:
+            self._viewport_callback()
 
+    def resizeEvent(self, event) -> None:
+        super().resizeEvent(event)
+        if self._viewport_callback is not None:
+            self._viewport_callback()
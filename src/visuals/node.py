@@ -42,15 +42,8 @@ class Node():
         self.node_type = node_type
 
         if self.node_type == NodeType.EMPTY:
-            circle_scale = 0.2
-            circle_size = NODE_SIZE * circle_scale
-            circle_offset = (NODE_SIZE - circle_size) * 0.5
-
-            self._dot.setBrush(QBrush(Qt.GlobalColor.gray))
-            self._dot.setOpacity(0.15)
-            self._dot.setRect(NODE_SIZE * self.x + circle_offset, NODE_SIZE * self.y + circle_offset, circle_size, circle_size)
-
-            self._dot.setVisible(True)
+            # The empty cell dot is painted by the scene background
+            self._dot.setVisible(False)
             self._text.setVisible(False)
             self._line.setVisible(False)
 
@@ -109,7 +102,27 @@ class Node():
             self._line.setVisible(True)
 
         elif self.node_type == NodeType.PATH_OPEN:
-            ...
+            circle_scale = 0.4
+            circle_size = NODE_SIZE * circle_scale
+            circle_offset = (NODE_SIZE - circle_size) * 0.5
+
+            self._dot.setBrush(QBrush(Qt.GlobalColor.green))
+            self._dot.setOpacity(0.6)
+            self._dot.setRect(NODE_SIZE * self.x + circle_offset, NODE_SIZE * self.y + circle_offset, circle_size, circle_size)
+
+            self._dot.setVisible(True)
+            self._text.setVisible(False)
+            self._line.setVisible(False)
 
         elif self.node_type == NodeType.PATH_CLOSED:
-            ...
+            circle_scale = 0.4
+            circle_size = NODE_SIZE * circle_scale
+            circle_offset = (NODE_SIZE - circle_size) * 0.5
+
+            self._dot.setBrush(QBrush(Qt.GlobalColor.darkCyan))
+            self._dot.setOpacity(0.8)
+            self._dot.setRect(NODE_SIZE * self.x + circle_offset, NODE_SIZE * self.y + circle_offset, circle_size, circle_size)
+
+            self._dot.setVisible(True)
+            self._text.setVisible(False)
+            self._line.setVisible(False)
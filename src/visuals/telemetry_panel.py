@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+
+from astar.telemetry import SearchStats
+
+from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import QAbstractItemView, QHeaderView, QTableWidget, QTableWidgetItem
+
+COLUMNS:tuple[str, ...] = ("Run", "Engine", "Time (ms)", "Expanded", "Peak Open", "Path", "Memory (KB)")
+
+
+class TelemetryPanel(QTableWidget):
+    # Newest search on top, at most history rows. Engines compared on the same
+    # query share a run number so they read side by side.
+    def __init__(self, history:int = 20) -> None:
+        super().__init__(0, len(COLUMNS))
+
+        self._history:int = max(history, 1)
+        self._run:int = 0
+
+        self.setHorizontalHeaderLabels(COLUMNS)
+        self.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        self.horizontalHeader().setStretchLastSection(True)
+        self.verticalHeader().setVisible(False)
+        self.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.setMaximumHeight(180)
+
+    def new_run(self) -> None:
+        self._run += 1
+
+    def add_stats(self, stats:SearchStats) -> None:
+        values:tuple[str, ...] = (
+            f"{self._run}",
+            stats.engine,
+            f"{stats.wall_time * 1000:.02f}",
+            f"{stats.expanded}",
+            f"{stats.peak_open}",
+            f"{stats.path_length}" if stats.path_length > 0 else "-",
+            f"{stats.memory / 1024:.01f}",
+        )
+
+        self.insertRow(0)
+        for column, value in enumerate(values):
+            item = QTableWidgetItem(value)
+            if column != 1:
+                item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+            self.setItem(0, column, item)
+
+        while self.rowCount() > self._history:
+            self.removeRow(self.rowCount() - 1)
+
+    def clear_stats(self) -> None:
+        self.setRowCount(0)
@@ -2,12 +2,19 @@
 
 from enum import Enum, auto
 
-from .grid import GridScene, GridView
-from .node import Node, NodeType
-from astar.astar import start_path_finding, start_path_finding_heapq
-
-from PyQt6.QtCore import Qt
-from PyQt6.QtWidgets import QApplication, QHBoxLayout, QLabel, QVBoxLayout, QWidget, QPushButton, QMainWindow
+from .grid import CellLayer, GridScene, GridView
+from .node import NODE_SIZE, Node, NodeType
+from .telemetry_panel import TelemetryPanel
+from astar.cache import PathCache
+from astar.masks import MoveMasks
+from astar.telemetry import ENGINES, SearchStats, run_nearest_search, run_search
+from astar.trace import EVENT_CLOSE, EVENT_OPEN, SearchTrace
+from gridmap.chunked import ChunkedGrid, ChunkedMasks
+from gridmap.gridmap import BLOCKED, EMPTY, PLAIN, GridMap
+
+from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtGui import qRgba
+from PyQt6.QtWidgets import QApplication, QComboBox, QFileDialog, QHBoxLayout, QLabel, QVBoxLayout, QWidget, QPushButton, QMainWindow, QSlider, QSpinBox
 
 import sys
 
@@ -16,13 +23,22 @@ class State(Enum):
     IDLE = auto()
     SETTING_START = auto()
     SETTING_END = auto()
+    ADDING_END = auto()
     SETTING_BLOCKER = auto()
+    SETTING_BLOCKER_RECT = auto()
+    SETTING_BLOCKER_LINE = auto()
+    SETTING_BLOCKER_FLOOD = auto()
+    SETTING_TERRAIN_RECT = auto()
 
 
 class VisualizerWindow(QMainWindow):
-    def __init__(self, col:int, row:int) -> None:
+    def __init__(self, col:int, row:int, chunked_grid:ChunkedGrid|None = None) -> None:
         super().__init__()
 
+        if chunked_grid is not None:
+            col = chunked_grid.col
+            row = chunked_grid.row
+
         CONTROLS_MAX_WIDTH:int = 180
         LABELS_MAX_HEIGHT:int = 16
 
@@ -32,27 +48,62 @@ class VisualizerWindow(QMainWindow):
         self._row:int = row
 
         self._state:State = State.IDLE
-        self._node_list:list[list[Node]] = []
+        # Nodes are only created for cells that show something
+        self._nodes:dict[tuple[int, int], Node] = {}
         self._start_node:Node|None = None
         self._end_node:Node|None = None
-        self._blockers:list[Node] = []
+        # Extra targets, a search with any of them goes to the nearest end node
+        self._extra_end_nodes:list[Node] = []
+        self._grid_map:GridMap|ChunkedGrid
+        self._move_masks:MoveMasks|ChunkedMasks
+        if chunked_grid is None:
+            self._grid_map = GridMap(col, row)
+            self._move_masks = MoveMasks(col, row, self._grid_map.cells)
+        else:
+            self._grid_map = chunked_grid
+            self._move_masks = ChunkedMasks(chunked_grid)
+        self._edit_anchor:tuple[int, int]|None = None
+        # Search results survive single blocker edits that do not touch them
+        self._path_cache:PathCache = PathCache()
         self._paths:list[Node] = []
+        self._trace:SearchTrace|None = None
+        self._trace_pos:int = 0
+        self._trace_nodes:list[Node] = []
+        self._replay_timer = QTimer(self)
 
         self._label_node_start = QLabel()
         self._label_node_end = QLabel()
         self._label_node_blocker = QLabel()
         self._label_node_clear = QLabel()
         self._label_start = QLabel()
+        self._label_replay = QLabel()
         
         self._button_node_start_set = QPushButton()
         self._button_node_start_clear = QPushButton()
         self._button_node_end_set = QPushButton()
+        self._button_node_end_add = QPushButton()
         self._button_node_end_clear = QPushButton()
         self._button_node_blocker_set = QPushButton()
         self._button_node_blocker_clear = QPushButton()
+        self._button_blocker_rect = QPushButton()
+        self._button_blocker_line = QPushButton()
+        self._button_blocker_flood = QPushButton()
+        self._button_blocker_random = QPushButton()
+        self._button_blocker_maze = QPushButton()
+        self._button_blocker_caves = QPushButton()
+        self._button_terrain_rect = QPushButton()
+        self._button_terrain_clear = QPushButton()
+        self._spin_terrain_cost = QSpinBox()
         self._button_node_clear_all = QPushButton()
         self._button_node_clear_path = QPushButton()
         self._button_start_visualizer = QPushButton()
+        self._button_compare_engines = QPushButton()
+        self._combo_engine = QComboBox()
+        self._button_replay_load = QPushButton()
+        self._button_replay_save = QPushButton()
+        self._button_replay_play = QPushButton()
+        self._slider_replay = QSlider(Qt.Orientation.Horizontal)
+        self._spin_replay_speed = QSpinBox()
 
         # Start Node Section
         self._label_node_start.setText("Start Node: [ , ]")
@@ -69,6 +120,8 @@ class VisualizerWindow(QMainWindow):
         self._label_node_end.setFixedSize(CONTROLS_MAX_WIDTH, LABELS_MAX_HEIGHT)
         self._button_node_end_set.setText("Set End Node")
         self._button_node_end_set.clicked.connect(self._button_press_end_set)
+        self._button_node_end_add.setText("Add End Node")
+        self._button_node_end_add.clicked.connect(self._button_press_end_add)
         self._button_node_end_clear.setText("Clear End Node")
         self._button_node_end_clear.clicked.connect(self._button_press_end_clear)
 
@@ -78,6 +131,27 @@ class VisualizerWindow(QMainWindow):
         self._button_node_blocker_set.clicked.connect(self._button_press_blocker_set)
         self._button_node_blocker_clear.setText("Clear Blocker Nodes")
         self._button_node_blocker_clear.clicked.connect(self._button_press_blocker_clear)
+        self._button_blocker_rect.setText("Blocker Rect")
+        self._button_blocker_rect.clicked.connect(self._button_press_blocker_rect)
+        self._button_blocker_line.setText("Blocker Line")
+        self._button_blocker_line.clicked.connect(self._button_press_blocker_line)
+        self._button_blocker_flood.setText("Flood Fill")
+        self._button_blocker_flood.clicked.connect(self._button_press_blocker_flood)
+        self._button_blocker_random.setText("Random Blockers")
+        self._button_blocker_random.clicked.connect(self._button_press_blocker_random)
+        self._button_blocker_maze.setText("Generate Maze")
+        self._button_blocker_maze.clicked.connect(self._button_press_blocker_maze)
+        self._button_blocker_caves.setText("Generate Caves")
+        self._button_blocker_caves.clicked.connect(self._button_press_blocker_caves)
+
+        # Terrain Section
+        self._spin_terrain_cost.setRange(1, 255)
+        self._spin_terrain_cost.setValue(5)
+        self._spin_terrain_cost.setPrefix("Terrain Cost ")
+        self._button_terrain_rect.setText("Paint Terrain")
+        self._button_terrain_rect.clicked.connect(self._button_press_terrain_rect)
+        self._button_terrain_clear.setText("Clear Terrain")
+        self._button_terrain_clear.clicked.connect(self._button_press_terrain_clear)
 
         # Node Clearing Section
         self._label_node_clear.setFixedSize(CONTROLS_MAX_WIDTH, LABELS_MAX_HEIGHT)
@@ -90,6 +164,27 @@ class VisualizerWindow(QMainWindow):
         self._label_start.setFixedSize(CONTROLS_MAX_WIDTH, LABELS_MAX_HEIGHT)
         self._button_start_visualizer.setText("Start Visualizer")
         self._button_start_visualizer.clicked.connect(self._button_press_start_visualizer)
+        self._combo_engine.addItems(list(ENGINES))
+        self._button_compare_engines.setText("Compare Engines")
+        self._button_compare_engines.clicked.connect(self._button_press_compare_engines)
+
+        # Replay Section
+        self._label_replay.setText("Replay: [ - ]")
+        self._label_replay.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self._label_replay.setFixedSize(CONTROLS_MAX_WIDTH, LABELS_MAX_HEIGHT)
+        self._button_replay_load.setText("Load Trace")
+        self._button_replay_load.clicked.connect(self._button_press_replay_load)
+        self._button_replay_save.setText("Save Trace")
+        self._button_replay_save.clicked.connect(self._button_press_replay_save)
+        self._button_replay_play.setText("Play Trace")
+        self._button_replay_play.clicked.connect(self._button_press_replay_play)
+        self._slider_replay.setRange(0, 0)
+        self._slider_replay.valueChanged.connect(self._seek_trace)
+        self._spin_replay_speed.setRange(1, 1_000_000)
+        self._spin_replay_speed.setValue(10)
+        self._spin_replay_speed.setSuffix(" events / tick")
+        self._replay_timer.setInterval(16)
+        self._replay_timer.timeout.connect(self._replay_tick)
 
         # Combine Layouts
         layout_controls = QVBoxLayout()
@@ -98,15 +193,33 @@ class VisualizerWindow(QMainWindow):
         layout_controls.addWidget(self._button_node_start_clear)
         layout_controls.addWidget(self._label_node_end)
         layout_controls.addWidget(self._button_node_end_set)
+        layout_controls.addWidget(self._button_node_end_add)
         layout_controls.addWidget(self._button_node_end_clear)
         layout_controls.addWidget(self._label_node_blocker)
         layout_controls.addWidget(self._button_node_blocker_set)
         layout_controls.addWidget(self._button_node_blocker_clear)
+        layout_controls.addWidget(self._button_blocker_rect)
+        layout_controls.addWidget(self._button_blocker_line)
+        layout_controls.addWidget(self._button_blocker_flood)
+        layout_controls.addWidget(self._button_blocker_random)
+        layout_controls.addWidget(self._button_blocker_maze)
+        layout_controls.addWidget(self._button_blocker_caves)
+        layout_controls.addWidget(self._spin_terrain_cost)
+        layout_controls.addWidget(self._button_terrain_rect)
+        layout_controls.addWidget(self._button_terrain_clear)
         layout_controls.addWidget(self._label_node_clear)
         layout_controls.addWidget(self._button_node_clear_path)
         layout_controls.addWidget(self._button_node_clear_all)
         layout_controls.addWidget(self._label_start)
+        layout_controls.addWidget(self._combo_engine)
         layout_controls.addWidget(self._button_start_visualizer)
+        layout_controls.addWidget(self._button_compare_engines)
+        layout_controls.addWidget(self._label_replay)
+        layout_controls.addWidget(self._button_replay_load)
+        layout_controls.addWidget(self._button_replay_save)
+        layout_controls.addWidget(self._button_replay_play)
+        layout_controls.addWidget(self._slider_replay)
+        layout_controls.addWidget(self._spin_replay_speed)
 
         controls = QWidget()
         controls.setLayout(layout_controls)
@@ -114,55 +227,108 @@ class VisualizerWindow(QMainWindow):
 
         # Scene
         self._grid_scene = GridScene(self._col, self._row, self._mouse_click_callback, self._mouse_move_callback)
-        self._grid_view = GridView(self._grid_scene)
 
-        layout_full = QHBoxLayout()
-        layout_full.addWidget(controls)
-        layout_full.addWidget(self._grid_view)
+        # Blockers live in the grid map and are drawn by a single layer that
+        # only covers the visible part of the grid
+        self._blocker_layer = CellLayer([qRgba(0, 0, 0, 0), qRgba(255, 0, 0, 255)])
+        self._blocker_layer.setZValue(1)
+        self._grid_scene.addItem(self._blocker_layer)
 
-        # Grid
-        for y in range(row):
-            new_list:list[Node] = []
-            for x in range(col):
-                node:Node = Node(x, y)
-                new_list.append(node)
-                for graphic_item in node.get_graphic_item():
-                    self._grid_scene.addItem(graphic_item)
+        # Terrain costs are drawn straight from the map's cost array, under the
+        # nodes, plain ground is transparent and higher costs get darker
+        terrain_colors:list[int] = [qRgba(0, 0, 0, 0)] * (PLAIN + 1) + [qRgba(139, 90, 43, min(40 + cost, 220)) for cost in range(PLAIN + 1, 256)]
+        self._terrain_layer = CellLayer(terrain_colors)
+        self._terrain_layer.setZValue(-1)
+        self._grid_scene.addItem(self._terrain_layer)
 
-            self._node_list.append(new_list)
+        self._grid_view = GridView(self._grid_scene, self._refresh_cell_layers)
+
+        # Telemetry of the last searches, under the grid
+        self._telemetry_panel = TelemetryPanel()
+
+        layout_view = QVBoxLayout()
+        layout_view.addWidget(self._grid_view)
+        layout_view.addWidget(self._telemetry_panel)
+
+        layout_full = QHBoxLayout()
+        layout_full.addWidget(controls)
+        layout_full.addLayout(layout_view)
 
         widget_full = QWidget()
         widget_full.setLayout(layout_full)
 
         self.setCentralWidget(widget_full)
 
+    def closeEvent(self, event) -> None:
+        if isinstance(self._grid_map, ChunkedGrid):
+            self._grid_map.flush()
+
+        return super().closeEvent(event)
+
+    def _get_node(self, x:int, y:int) -> Node:
+        node:Node|None = self._nodes.get((x, y))
+        if node is None:
+            node = Node(x, y)
+            for graphic_item in node.get_graphic_item():
+                self._grid_scene.addItem(graphic_item)
+            self._nodes[(x, y)] = node
+
+        return node
+
+    def _refresh_cell_layers(self) -> None:
+        rect = self._grid_view.mapToScene(self._grid_view.viewport().rect()).boundingRect()
+        left:int = max(int(rect.left() // NODE_SIZE) - 1, 0)
+        top:int = max(int(rect.top() // NODE_SIZE) - 1, 0)
+        right:int = min(int(rect.right() // NODE_SIZE) + 2, self._col)
+        bottom:int = min(int(rect.bottom() // NODE_SIZE) + 2, self._row)
+        if left >= right or top >= bottom:
+            return
+
+        cells:bytes = self._grid_map.read_rect(left, top, right - left, bottom - top, EMPTY)
+        self._blocker_layer.set_region(left, top, right - left, bottom - top, cells)
+
+        if isinstance(self._grid_map, GridMap):
+            costs:bytes = self._grid_map.read_cost_rect(left, top, right - left, bottom - top)
+            self._terrain_layer.set_region(left, top, right - left, bottom - top, costs)
+
     def _update_labels(self) -> None:
         if self._start_node is not None:
             self._label_node_start.setText(f"Start Node: [ {self._start_node.x} , {self._start_node.y} ]")
         else:
             self._label_node_start.setText(f"Start Node: [ , ]")
 
-        if self._end_node is not None:
+        if self._end_node is not None and len(self._extra_end_nodes) > 0:
+            self._label_node_end.setText(f"End Node: [ {self._end_node.x} , {self._end_node.y} ] +{len(self._extra_end_nodes)}")
+        elif self._end_node is not None:
             self._label_node_end.setText(f"End Node: [ {self._end_node.x} , {self._end_node.y} ]")
         else:
             self._label_node_end.setText(f"End Node: [ , ]")
 
-        if self._state == State.IDLE:
-            self._button_node_start_set.setText(f"Set Start Node")
-            self._button_node_end_set.setText(f"Set End Node")
-            self._button_node_blocker_set.setText(f"Set Blocker Nodes")
-        elif self._state == State.SETTING_START:
+        self._button_node_start_set.setText(f"Set Start Node")
+        self._button_node_end_set.setText(f"Set End Node")
+        self._button_node_end_add.setText(f"Add End Node")
+        self._button_node_blocker_set.setText(f"Set Blocker Nodes")
+        self._button_blocker_rect.setText(f"Blocker Rect")
+        self._button_blocker_line.setText(f"Blocker Line")
+        self._button_blocker_flood.setText(f"Flood Fill")
+        self._button_terrain_rect.setText(f"Paint Terrain")
+
+        if self._state == State.SETTING_START:
             self._button_node_start_set.setText(f"Setting Start Node")
-            self._button_node_end_set.setText(f"Set End Node")
-            self._button_node_blocker_set.setText(f"Set Blocker Nodes")
         elif self._state == State.SETTING_END:
-            self._button_node_start_set.setText(f"Set Start Node")
             self._button_node_end_set.setText(f"Setting End Node")
-            self._button_node_blocker_set.setText(f"Set Blocker Nodes")
+        elif self._state == State.ADDING_END:
+            self._button_node_end_add.setText(f"Adding End Nodes")
         elif self._state == State.SETTING_BLOCKER:
-            self._button_node_start_set.setText("Set Start Node")
-            self._button_node_end_set.setText("Set End Node")
             self._button_node_blocker_set.setText("Setting Blocker Nodes")
+        elif self._state == State.SETTING_BLOCKER_RECT:
+            self._button_blocker_rect.setText("Setting Blocker Rect")
+        elif self._state == State.SETTING_BLOCKER_LINE:
+            self._button_blocker_line.setText("Setting Blocker Line")
+        elif self._state == State.SETTING_BLOCKER_FLOOD:
+            self._button_blocker_flood.setText("Setting Flood Fill")
+        elif self._state == State.SETTING_TERRAIN_RECT:
+            self._button_terrain_rect.setText("Painting Terrain")
 
     def _clear_node(self, node:Node|None) -> None:
         if node is not None:
@@ -188,29 +354,102 @@ class VisualizerWindow(QMainWindow):
 
         self._update_labels()
 
+    def _add_end_node(self, new_node:Node) -> None:
+        # The first end node is the primary one, the rest are extra targets
+        if self._end_node is None:
+            self._set_end_node(new_node)
+            return
+
+        new_node.set_node_type(NodeType.END)
+        self._extra_end_nodes.append(new_node)
+
+        self._update_labels()
+
     def _clear_end_node(self) -> None:
         self._clear_node(self._end_node)
         self._end_node = None
 
-    def _append_blocker_node(self, new_node) -> None:
-        if new_node.node_type != NodeType.EMPTY:
+        for node in self._extra_end_nodes:
+            self._clear_node(node)
+        self._extra_end_nodes.clear()
+
+    def _is_empty(self, node:Node) -> bool:
+        return node.node_type == NodeType.EMPTY and not self._grid_map.is_blocked(node.x, node.y)
+
+    def _append_blocker_node(self, new_node:Node) -> None:
+        if not self._is_empty(new_node):
             return
 
-        new_node.set_node_type(NodeType.BLOCKER)
-        self._blockers.append(new_node)
+        self._grid_map.set_cell(new_node.x, new_node.y, BLOCKED)
+        self._move_masks.update_cell(new_node.x, new_node.y)
+        self._path_cache.invalidate([(new_node.x, new_node.y)], True, self._grid_map.version)
+        self._blocker_layer.update_cell(new_node.x, new_node.y, BLOCKED)
 
-    def _remove_blocker_node(self, node) -> None:
-        if node.node_type != NodeType.BLOCKER:
+    def _remove_blocker_node(self, node:Node) -> None:
+        if not self._grid_map.is_blocked(node.x, node.y):
             return
 
-        node.set_node_type(NodeType.EMPTY)
-        self._blockers.remove(node)
+        self._grid_map.set_cell(node.x, node.y, EMPTY)
+        self._move_masks.update_cell(node.x, node.y)
+        self._path_cache.invalidate([(node.x, node.y)], False, self._grid_map.version)
+        self._blocker_layer.update_cell(node.x, node.y, EMPTY)
 
     def _clear_blocker_nodes(self) -> None:
-        for n in self._blockers:
-            self._clear_node(n)
+        if not isinstance(self._grid_map, GridMap):
+            print(f"Clearing blockers needs an in-memory map")
+            return
+
+        self._grid_map.clear()
+        self._move_masks.rebuild()
+        self._refresh_cell_layers()
+
+    def _apply_bulk_edit(self) -> None:
+        # Bulk edits already changed the model in one pass, keep start/end free
+        # and hand the scene one update
+        for node in [self._start_node, self._end_node] + self._extra_end_nodes:
+            if node is not None and self._grid_map.is_blocked(node.x, node.y):
+                self._grid_map.set_cell(node.x, node.y, EMPTY)
+
+        self._clear_path_nodes()
+        self._move_masks.rebuild()
+        self._refresh_cell_layers()
 
-        self._blockers.clear()
+    def _get_bulk_map(self) -> GridMap|None:
+        if isinstance(self._grid_map, GridMap):
+            return self._grid_map
+
+        print(f"Bulk edits need an in-memory map")
+        return None
+
+    def _apply_edit_at(self, x:int, y:int) -> None:
+        grid_map:GridMap|None = self._get_bulk_map()
+        if grid_map is None:
+            return
+
+        if self._state == State.SETTING_BLOCKER_FLOOD:
+            grid_map.flood_fill(x, y, EMPTY if grid_map.is_blocked(x, y) else BLOCKED)
+            self._apply_bulk_edit()
+            return
+
+        if self._edit_anchor is None:
+            self._edit_anchor = (x, y)
+            return
+
+        ax, ay = self._edit_anchor
+        self._edit_anchor = None
+        if self._state == State.SETTING_TERRAIN_RECT:
+            # Costs leave the move masks alone, only the layer needs a redraw
+            grid_map.fill_cost_rect(ax, ay, x, y, self._spin_terrain_cost.value())
+            self._clear_path_nodes()
+            self._refresh_cell_layers()
+            return
+
+        if self._state == State.SETTING_BLOCKER_RECT:
+            grid_map.fill_rect(ax, ay, x, y)
+        elif self._state == State.SETTING_BLOCKER_LINE:
+            grid_map.draw_line(ax, ay, x, y)
+
+        self._apply_bulk_edit()
 
     def _clear_path_nodes(self) -> None:
         for n in self._paths:
@@ -218,6 +457,146 @@ class VisualizerWindow(QMainWindow):
 
         self._paths.clear()
 
+    def _clear_trace_nodes(self) -> None:
+        self._replay_timer.stop()
+        self._button_replay_play.setText("Play Trace")
+
+        for n in self._trace_nodes:
+            if n.node_type in (NodeType.PATH_OPEN, NodeType.PATH_CLOSED):
+                self._clear_node(n)
+
+        self._trace_nodes.clear()
+        self._trace_pos = 0
+        self._slider_replay.blockSignals(True)
+        self._slider_replay.setValue(0)
+        self._slider_replay.blockSignals(False)
+
+    def _update_replay_label(self) -> None:
+        if self._trace is None:
+            self._label_replay.setText("Replay: [ - ]")
+        else:
+            self._label_replay.setText(f"Replay: [ {self._trace_pos} / {len(self._trace)} ]")
+
+    def _seek_trace(self, pos:int) -> None:
+        # Only node states change here, the search itself ran when the trace was recorded
+        if self._trace is None:
+            return
+
+        kinds = self._trace.kinds
+        cells = self._trace.cells
+        col:int = self._trace.col
+
+        while self._trace_pos < pos:
+            node = self._get_node(cells[self._trace_pos] % col, cells[self._trace_pos] // col)
+            kind:int = kinds[self._trace_pos]
+            self._trace_pos += 1
+
+            if node.node_type not in (NodeType.EMPTY, NodeType.PATH_OPEN, NodeType.PATH_CLOSED):
+                continue
+
+            if kind == EVENT_OPEN:
+                if node.node_type == NodeType.EMPTY:
+                    self._trace_nodes.append(node)
+                node.set_node_type(NodeType.PATH_OPEN)
+            elif kind == EVENT_CLOSE:
+                node.set_node_type(NodeType.PATH_CLOSED)
+
+        while self._trace_pos > pos:
+            self._trace_pos -= 1
+            node = self._get_node(cells[self._trace_pos] % col, cells[self._trace_pos] // col)
+            kind = kinds[self._trace_pos]
+
+            if node.node_type not in (NodeType.PATH_OPEN, NodeType.PATH_CLOSED):
+                continue
+
+            if kind == EVENT_OPEN:
+                node.set_node_type(NodeType.EMPTY)
+            elif kind == EVENT_CLOSE:
+                node.set_node_type(NodeType.PATH_OPEN)
+
+        self._update_replay_label()
+
+    def _replay_tick(self) -> None:
+        if self._trace is None or self._trace_pos >= len(self._trace):
+            self._replay_timer.stop()
+            self._button_replay_play.setText("Play Trace")
+            return
+
+        self._slider_replay.setValue(min(self._trace_pos + self._spin_replay_speed.value(), len(self._trace)))
+
+    def _button_press_replay_load(self) -> None:
+        path, _ = QFileDialog.getOpenFileName(self, "Load Trace", "", "Search Trace (*.trc);;All Files (*)")
+        if path == "":
+            return
+
+        try:
+            trace:SearchTrace = SearchTrace.load(path)
+        except (OSError, ValueError) as e:
+            print(f"Unable to load trace [{path}]: {e}")
+            return
+
+        if trace.col != self._col or trace.row != self._row:
+            print(f"Trace grid [{trace.col} x {trace.row}] does not match [{self._col} x {self._row}]")
+            return
+
+        self._set_trace(trace)
+
+    def _button_press_replay_save(self) -> None:
+        # Records the selected engine on the current query, then saves it and
+        # keeps it loaded for replay
+        query = self._get_search_query()
+        if query is None:
+            return
+
+        start, end = query
+        masks = self._move_masks.masks if isinstance(self._move_masks, MoveMasks) else self._move_masks
+        trace:SearchTrace = SearchTrace(self._col, self._row, start, end)
+        ENGINES[self._combo_engine.currentText()](self._col, self._row, start, end, masks, trace.record, self._get_terrain_costs())
+
+        path, _ = QFileDialog.getSaveFileName(self, "Save Trace", "", "Search Trace (*.trc);;All Files (*)")
+        if path == "":
+            return
+
+        try:
+            trace.save(path)
+        except OSError as e:
+            print(f"Unable to save trace [{path}]: {e}")
+            return
+
+        self._set_trace(trace)
+
+    def _set_trace(self, trace:SearchTrace) -> None:
+        self._state = State.IDLE
+        self._clear_path_nodes()
+        self._clear_trace_nodes()
+
+        self._trace = trace
+        for pt, set_node in ((trace.start, self._set_start_node), (trace.end, self._set_end_node)):
+            if 0 <= pt[0] < self._col and 0 <= pt[1] < self._row:
+                node = self._get_node(pt[0], pt[1])
+                if self._is_empty(node):
+                    set_node(node)
+
+        self._slider_replay.setRange(0, len(trace))
+        self._update_replay_label()
+        self._update_labels()
+
+    def _button_press_replay_play(self) -> None:
+        if self._trace is None:
+            print(f"Trace is [None]")
+            return
+
+        if self._replay_timer.isActive():
+            self._replay_timer.stop()
+            self._button_replay_play.setText("Play Trace")
+            return
+
+        if self._trace_pos >= len(self._trace):
+            self._slider_replay.setValue(0)
+
+        self._replay_timer.start()
+        self._button_replay_play.setText("Pause Trace")
+
     def _button_press_start_set(self) -> None:
         if self._state == State.SETTING_START:
             self._state = State.IDLE
@@ -239,6 +618,14 @@ class VisualizerWindow(QMainWindow):
 
         self._update_labels()
 
+    def _button_press_end_add(self) -> None:
+        if self._state == State.ADDING_END:
+            self._state = State.IDLE
+        else:
+            self._state = State.ADDING_END
+
+        self._update_labels()
+
     def _button_press_end_clear(self) -> None:
         self._state = State.IDLE
         self._clear_end_node()
@@ -257,9 +644,74 @@ class VisualizerWindow(QMainWindow):
         self._clear_blocker_nodes()
         self._update_labels()
 
+    def _toggle_edit_state(self, state:State) -> None:
+        self._edit_anchor = None
+        if self._state == state:
+            self._state = State.IDLE
+        else:
+            self._state = state
+
+        self._update_labels()
+
+    def _button_press_blocker_rect(self) -> None:
+        self._toggle_edit_state(State.SETTING_BLOCKER_RECT)
+
+    def _button_press_blocker_line(self) -> None:
+        self._toggle_edit_state(State.SETTING_BLOCKER_LINE)
+
+    def _button_press_blocker_flood(self) -> None:
+        self._toggle_edit_state(State.SETTING_BLOCKER_FLOOD)
+
+    def _button_press_terrain_rect(self) -> None:
+        self._toggle_edit_state(State.SETTING_TERRAIN_RECT)
+
+    def _button_press_terrain_clear(self) -> None:
+        self._state = State.IDLE
+        self._clear_terrain()
+        self._update_labels()
+
+    def _clear_terrain(self) -> None:
+        if isinstance(self._grid_map, GridMap):
+            self._grid_map.clear_costs()
+            self._clear_path_nodes()
+            self._refresh_cell_layers()
+
+    def _get_terrain_costs(self) -> bytearray|None:
+        # Plain maps search without a cost layer, the 10 / 15 fast path
+        if isinstance(self._grid_map, GridMap) and self._grid_map.costs.count(PLAIN) != len(self._grid_map.costs):
+            return self._grid_map.costs
+
+        return None
+
+    def _button_press_blocker_random(self) -> None:
+        self._state = State.IDLE
+        grid_map:GridMap|None = self._get_bulk_map()
+        if grid_map is not None:
+            grid_map.fill_random(0.3)
+            self._apply_bulk_edit()
+        self._update_labels()
+
+    def _button_press_blocker_maze(self) -> None:
+        self._state = State.IDLE
+        grid_map:GridMap|None = self._get_bulk_map()
+        if grid_map is not None:
+            grid_map.generate_maze()
+            self._apply_bulk_edit()
+        self._update_labels()
+
+    def _button_press_blocker_caves(self) -> None:
+        self._state = State.IDLE
+        grid_map:GridMap|None = self._get_bulk_map()
+        if grid_map is not None:
+            grid_map.generate_caves()
+            self._apply_bulk_edit()
+        self._update_labels()
+
     def _button_press_clear_path(self) -> None:
         self._state = State.IDLE
         self._clear_path_nodes()
+        self._clear_trace_nodes()
+        self._update_replay_label()
         self._update_labels()
 
     def _button_press_clear_all(self) -> None:
@@ -267,30 +719,82 @@ class VisualizerWindow(QMainWindow):
         self._clear_start_node()
         self._clear_end_node()
         self._clear_blocker_nodes()
+        self._clear_terrain()
         self._clear_path_nodes()
+        self._clear_trace_nodes()
+        self._update_replay_label()
         self._update_labels()
 
-    def _button_press_start_visualizer(self) -> None:
+    def _get_search_query(self) -> tuple[tuple[int, int], tuple[int, int]]|None:
         if self._start_node is None:
             print(f"Start Node is [None]")
-            return
+            return None
 
         if self._end_node is None:
             print(f"End Node is [None]")
+            return None
+
+        return (self._start_node.x, self._start_node.y), (self._end_node.x, self._end_node.y)
+
+    def _run_engines(self, engines:list[str]) -> None:
+        query = self._get_search_query()
+        if query is None:
             return
 
-        start:tuple[int, int] = (self._start_node.x, self._start_node.y)
-        end:tuple[int, int] = (self._end_node.x, self._end_node.y)
-        blockers = tuple((node.x, node.y) for node in self._blockers)
+        start, end = query
+        # Chunked maps are searched through the mask tile cache
+        masks = self._move_masks.masks if isinstance(self._move_masks, MoveMasks) else self._move_masks
+        costs:bytearray|None = self._get_terrain_costs()
+
+        self._clear_path_nodes()
+        self._telemetry_panel.new_run()
+        if len(self._extra_end_nodes) > 0:
+            self._run_nearest_search(start, masks, costs)
+            return
+
+        return_path:tuple[tuple[int, int,], ...]|None = None
+        stats:SearchStats|None = None
+        for i, engine in enumerate(engines):
+            path, engine_stats = run_search(engine, self._col, self._row, start, end, masks, self._path_cache, self._grid_map.version, costs)
+            self._telemetry_panel.add_stats(engine_stats)
+            if i == 0:
+                return_path = path
+                stats = engine_stats
+
+        if stats is not None:
+            self._label_start.setText(f"{stats.wall_time * 1000:.02f} ms, {stats.expanded} expanded")
+        self._update_cache_label()
 
-        return_path:tuple[tuple[int, int,], ...]|None = start_path_finding(self._col, self._row, start, end, blockers)
-        #return_path_v2:tuple[tuple[int, int,], ...]|None = start_path_finding_heapq(self._col, self._row, start, end, blockers)
+        if return_path is None:
+            print(f"There is no return path!")
+        else:
+            self._display_return_path(return_path)
+
+    def _update_cache_label(self) -> None:
+        cache_stats = self._path_cache.stats
+        self._label_node_clear.setText(f"Cache: {cache_stats.hits} hit / {cache_stats.misses} miss")
+
+    def _run_nearest_search(self, start:tuple[int, int], masks, costs:bytearray|None) -> None:
+        # Several end nodes: one search that stops at the nearest of them
+        targets:list[tuple[int, int]] = [(n.x, n.y) for n in [self._end_node] + self._extra_end_nodes if n is not None]
+        return_path, stats = run_nearest_search(self._col, self._row, start, targets, masks, costs)
+        self._telemetry_panel.add_stats(stats)
+        self._label_start.setText(f"{stats.wall_time * 1000:.02f} ms, {stats.expanded} expanded")
 
         if return_path is None:
             print(f"There is no return path!")
         else:
+            print(f"Nearest end node: [ {return_path[0][0]} , {return_path[0][1]} ]")
             self._display_return_path(return_path)
 
+    def _button_press_start_visualizer(self) -> None:
+        self._run_engines([self._combo_engine.currentText()])
+
+    def _button_press_compare_engines(self) -> None:
+        # The selected engine runs first and its path is the one displayed
+        selected:str = self._combo_engine.currentText()
+        self._run_engines([selected] + [engine for engine in ENGINES if engine != selected])
+
     def _display_return_path(self, path:tuple[tuple[int, int], ...]) -> None:
         # path pts are reverse ordered
         index:int = 0
@@ -298,7 +802,7 @@ class VisualizerWindow(QMainWindow):
             pt_a:tuple[int, int] = path[index]
             pt_b:tuple[int, int] = path[index + 1]
 
-            node = self._node_list[pt_a[1]][pt_a[0]]
+            node = self._get_node(pt_a[0], pt_a[1])
             if node.node_type == NodeType.EMPTY:
                 node.set_node_type(NodeType.PATH, pt_b)
                 self._paths.append(node)
@@ -306,43 +810,54 @@ class VisualizerWindow(QMainWindow):
             index += 1
 
     def _mouse_click_callback(self, x:int, y:int) -> None:
-        node = self._node_list[y][x]
+        node = self._get_node(x, y)
 
         if self._state == State.IDLE:
             return
 
+        elif self._state in (State.SETTING_BLOCKER_RECT, State.SETTING_BLOCKER_LINE, State.SETTING_BLOCKER_FLOOD, State.SETTING_TERRAIN_RECT):
+            self._apply_edit_at(x, y)
+
         elif self._state == State.SETTING_START:
-            if node.node_type == NodeType.EMPTY:
+            if self._is_empty(node):
                 self._set_start_node(node)
 
         elif self._state == State.SETTING_END:
-            if node.node_type == NodeType.EMPTY:
+            if self._is_empty(node):
                 self._set_end_node(node)
 
+        elif self._state == State.ADDING_END:
+            if self._is_empty(node):
+                self._add_end_node(node)
+
         elif self._state == State.SETTING_BLOCKER:
-            if node.node_type == NodeType.EMPTY:
+            if self._is_empty(node):
                 self._append_blocker_node(node)
-            elif node.node_type == NodeType.BLOCKER:
+            elif self._grid_map.is_blocked(x, y):
                 self._remove_blocker_node(node)
 
     def _mouse_move_callback(self, x:int, y:int) -> None:
-        node = self._node_list[y][x]
+        node = self._get_node(x, y)
 
         if self._state == State.IDLE:
             return
 
         elif self._state == State.SETTING_START:
-            if node.node_type == NodeType.EMPTY:
+            if self._is_empty(node):
                 self._set_start_node(node)
 
         elif self._state == State.SETTING_END:
-            if node.node_type == NodeType.EMPTY:
+            if self._is_empty(node):
                 self._set_end_node(node)
 
+        elif self._state == State.ADDING_END:
+            if self._is_empty(node):
+                self._add_end_node(node)
+
         elif self._state == State.SETTING_BLOCKER:
-            if node.node_type == NodeType.EMPTY:
+            if self._is_empty(node):
                 self._append_blocker_node(node)
-            elif node.node_type == NodeType.BLOCKER:
+            elif self._grid_map.is_blocked(x, y):
                 self._remove_blocker_node(node)
 
 
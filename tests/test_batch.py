@@ -0,0 +1,35 @@
+import random
+
+import pytest
+
+from astar.astar import _search_masks, make_grid
+from astar.batch import BatchResult, start_path_finding_batch
+from astar.masks import build_masks
+
+
+def test_batch_matches_search_masks():
+    rng = random.Random(7)
+    col, row = 30, 24
+    blockers = tuple({(rng.randrange(col), rng.randrange(row)) for _ in range(180)})
+    masks = build_masks(col, row, make_grid(col, row, blockers))
+    queries = [((rng.randrange(col), rng.randrange(row)), (rng.randrange(col), rng.randrange(row))) for _ in range(60)]
+
+    # Small chunks so the results come back from several pool jobs
+    result = start_path_finding_batch(col, row, queries, blockers, workers=2, chunk_size=7)
+    assert len(result) == len(queries)
+    for i, (start, end) in enumerate(queries):
+        assert result.get_path(i) == _search_masks(col, row, masks, start, end)
+        assert result.pruned[i] == 0
+
+    # A cap no query reaches changes nothing
+    capped = start_path_finding_batch(col, row, queries, blockers, workers=1, chunk_size=16, max_nodes=col * row * 8)
+    assert [capped.get_path(i) for i in range(len(capped))] == [result.get_path(i) for i in range(len(result))]
+    assert not any(capped.pruned)
+
+
+def test_batch_result():
+    assert len(start_path_finding_batch(5, 5, [], ())) == 0
+
+    result = BatchResult()
+    with pytest.raises(IndexError):
+        result.get_path(0)
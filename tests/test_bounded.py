@@ -0,0 +1,55 @@
+import random
+
+from astar.astar import _make_octile_heuristic, _search_masks
+from astar.bounded import _search_bounded, start_path_finding_bounded
+from astar.cache import _get_path_cost
+from astar.masks import build_masks
+from gridmap.gridmap import GridMap
+
+
+def _make_map(seed:int) -> GridMap:
+    grid_map = GridMap(32, 24)
+    grid_map.fill_random(0.3, seed=seed)
+    return grid_map
+
+
+def test_unpruned_search_matches_search_masks():
+    rng = random.Random(1)
+    for seed in range(4):
+        grid_map = _make_map(seed)
+        col, row = grid_map.col, grid_map.row
+        masks = build_masks(col, row, grid_map.cells)
+        octile = _make_octile_heuristic(col)
+
+        for _ in range(20):
+            start = (rng.randrange(col), rng.randrange(row))
+            end = (rng.randrange(col), rng.randrange(row))
+            expected = _search_masks(col, row, masks, start, end, octile)
+            result = _search_bounded(col, row, masks, start, end, rng.choice((40, 120, 4000)), octile)
+            if not result.pruned:
+                assert (result.path is None) == (expected is None)
+                if result.path is not None:
+                    assert _get_path_cost(result.path) == _get_path_cost(expected)
+            elif result.path is not None:
+                # A pruned path is still a path, just maybe not the best one
+                assert result.path[0] == end and result.path[-1] == start
+                assert _get_path_cost(result.path) >= _get_path_cost(expected)
+            # One expansion can overshoot the cap by its eight children
+            assert result.peak_nodes <= result.max_nodes + 8
+
+
+def test_fallback_finishes_unpruned():
+    grid_map = _make_map(9)
+    grid_map.set_cell(0, 0, 0)
+    grid_map.set_cell(31, 23, 0)
+    col, row = grid_map.col, grid_map.row
+    masks = build_masks(col, row, grid_map.cells)
+    octile = _make_octile_heuristic(col)
+
+    expected = _search_masks(col, row, masks, (0, 0), (31, 23), octile)
+    result = start_path_finding_bounded(col, row, (0, 0), (31, 23), (), max_nodes=8, heuristic=octile, masks=masks, fallback_nodes=col * row * 8)
+    assert not result.pruned
+    assert result.max_nodes > 8
+    assert (result.path is None) == (expected is None)
+    if result.path is not None:
+        assert _get_path_cost(result.path) == _get_path_cost(expected)
@@ -0,0 +1,76 @@
+import os
+import random
+
+import pytest
+
+from astar.astar import _make_octile_heuristic, _search_masks, start_path_finding, start_path_finding_heapq
+from astar.bounds import GoalBounds
+from astar.cache import _get_path_cost
+from astar.masks import build_masks
+from gridmap.gridmap import GridMap
+
+
+def _build(seed:int) -> tuple[GridMap, bytearray, GoalBounds]:
+    grid_map = GridMap(21, 15)
+    grid_map.fill_random(0.3, seed=seed)
+    masks = build_masks(grid_map.col, grid_map.row, grid_map.cells)
+    return grid_map, masks, GoalBounds.build(grid_map.col, grid_map.row, masks, workers=2, chunk_size=50)
+
+
+def test_pruned_search_matches_search_masks():
+    rng = random.Random(4)
+    for seed in range(2):
+        grid_map, masks, bounds = _build(seed)
+        col, row = grid_map.col, grid_map.row
+        octile = _make_octile_heuristic(col)
+
+        for _ in range(40):
+            start = (rng.randrange(col), rng.randrange(row))
+            end = (rng.randrange(col), rng.randrange(row))
+            expected = _search_masks(col, row, masks, start, end, octile)
+            # Dijkstra too, every shortest path must survive the pruning
+            for heuristic in (octile, lambda a, b: 0):
+                path = _search_masks(col, row, masks, start, end, heuristic, pruning=bounds)
+                assert (path is None) == (expected is None)
+                if path is not None:
+                    assert _get_path_cost(path) == _get_path_cost(expected)
+
+
+def test_save_load_round_trip(tmp_path):
+    _, _, bounds = _build(5)
+    path = os.path.join(tmp_path, "map.gbt")
+    bounds.save(path)
+
+    loaded = GoalBounds.load(path)
+    assert (loaded.col, loaded.row) == (bounds.col, bounds.row)
+    assert loaded.boxes.typecode == bounds.boxes.typecode
+    assert loaded.boxes == bounds.boxes
+
+    with open(path, "r+b") as f:
+        f.write(b"XXXX")
+    with pytest.raises(ValueError):
+        GoalBounds.load(path)
+
+
+def test_pruning_refuses_a_cost_layer():
+    grid_map, masks, bounds = _build(6)
+    col, row = grid_map.col, grid_map.row
+    blockers = grid_map.get_blockers()
+    for search in (
+        lambda: _search_masks(col, row, masks, (0, 0), (5, 5), pruning=bounds, costs=grid_map.costs),
+        lambda: start_path_finding(col, row, (0, 0), (5, 5), blockers, masks=masks, pruning=bounds, costs=grid_map.costs),
+        lambda: start_path_finding_heapq(col, row, (0, 0), (5, 5), blockers, masks=masks, pruning=bounds, costs=grid_map.costs),
+    ):
+        with pytest.raises(ValueError):
+            search()
+
+
+def test_compacted_boxes():
+    grid_map, masks, bounds = _build(7)
+    col, row = grid_map.col, grid_map.row
+    assert bounds.boxes.typecode == "H"
+    assert len(bounds.boxes) == col * row * 8 * 4
+
+    # Chunk boundaries don't matter
+    other = GoalBounds.build(col, row, masks, workers=1, chunk_size=col * row)
+    assert other.boxes == bounds.boxes
@@ -0,0 +1,128 @@
+import random
+
+from astar.astar import _make_octile_heuristic, _search_masks
+from astar.cache import PathCache, _get_path_cost
+from astar.masks import MoveMasks
+from gridmap.gridmap import BLOCKED, EMPTY, GridMap
+
+
+def _search(grid_map:GridMap, move_masks:MoveMasks, start, end, costs=None):
+    return _search_masks(grid_map.col, grid_map.row, move_masks.masks, start, end, _make_octile_heuristic(grid_map.col), costs=costs)
+
+
+def test_weighted_path_cost():
+    costs = bytearray([1, 2, 3, 4])
+    path = ((1, 1), (0, 1), (0, 0))
+    assert _get_path_cost(path) == 20
+    # End first like the engines, (0, 0) is the start and is never entered
+    assert _get_path_cost(path, 2, costs) == 10 * 4 + 10 * 3
+
+
+def test_path_cost_charges_the_end_not_the_start():
+    costs = bytearray([9, 1, 1, 5])
+    masks = MoveMasks(4, 1, bytes(4)).masks
+    path = _search_masks(4, 1, masks, (0, 0), (3, 0), costs=costs)
+    assert _get_path_cost(path, 4, costs) == 10 + 10 + 50
+
+
+def test_removal_on_terrain_invalidates_stale_path():
+    # Row 0 is expensive and a wall at x = 10 closes the plain ground below
+    # it, the cached path crosses on row 0. Opening the wall far from that
+    # path makes a much cheaper route that an unweighted bound would miss.
+    grid_map = GridMap(21, 11)
+    grid_map.fill_cost_rect(0, 0, 20, 0, 50)
+    grid_map.fill_rect(10, 1, 10, 10)
+    move_masks = MoveMasks(grid_map.col, grid_map.row, grid_map.cells)
+    costs = grid_map.costs
+    start, end = (0, 0), (20, 0)
+
+    cache = PathCache()
+    search = lambda: _search(grid_map, move_masks, start, end, costs)
+    cached = cache.find_path(grid_map.version, start, end, "masks", "octile", search, grid_map.col, costs)
+
+    grid_map.set_cell(10, 9, EMPTY)
+    move_masks.update_cell(10, 9)
+    cache.invalidate([(10, 9)], False, grid_map.version)
+
+    fresh = _search(grid_map, move_masks, start, end, costs)
+    path = cache.find_path(grid_map.version, start, end, "masks", "octile", search, grid_map.col, costs)
+    assert _get_path_cost(fresh, grid_map.col, costs) < _get_path_cost(cached, grid_map.col, costs)
+    assert _get_path_cost(path, grid_map.col, costs) == _get_path_cost(fresh, grid_map.col, costs)
+
+
+def test_cached_paths_stay_optimal_under_edits():
+    rng = random.Random(4)
+    grid_map = GridMap(25, 18)
+    grid_map.fill_random(0.25, seed=1)
+    grid_map.fill_cost_rect(3, 2, 12, 9, 6)
+    move_masks = MoveMasks(grid_map.col, grid_map.row, grid_map.cells)
+    costs = grid_map.costs
+    cache = PathCache(64)
+    pairs = [((rng.randrange(25), rng.randrange(18)), (rng.randrange(25), rng.randrange(18))) for _ in range(40)]
+
+    for _ in range(300):
+        start, end = rng.choice(pairs)
+        if not grid_map.is_blocked(*start) and not grid_map.is_blocked(*end):
+            search = lambda: _search(grid_map, move_masks, start, end, costs)
+            path = cache.find_path(grid_map.version, start, end, "masks", "octile", search, grid_map.col, costs)
+            fresh = search()
+            assert (path is None) == (fresh is None)
+            if path is not None:
+                assert _get_path_cost(path, grid_map.col, costs) == _get_path_cost(fresh, grid_map.col, costs)
+                assert not any(grid_map.is_blocked(x, y) for x, y in path)
+
+        x, y = rng.randrange(25), rng.randrange(18)
+        blocked = not grid_map.is_blocked(x, y)
+        grid_map.set_cell(x, y, BLOCKED if blocked else EMPTY)
+        move_masks.update_cell(x, y)
+        cache.invalidate([(x, y)], blocked, grid_map.version)
+
+    assert cache.stats.hits > 0
+
+
+def test_lru_and_versions():
+    cache = PathCache(2)
+    path = ((1, 0), (0, 0))
+    for x in range(3):
+        cache.put(0, (0, 0), (x, 0), "masks", "octile", path)
+    assert len(cache) == 2 and cache.stats.evictions == 1
+    assert cache.get(0, (0, 0), (0, 0), "masks", "octile") == (None, False)
+
+    # A hit moves the entry to the back, the other one goes next
+    assert cache.get(0, (0, 0), (1, 0), "masks", "octile") == (path, True)
+    cache.put(0, (0, 0), (3, 0), "masks", "octile", path)
+    assert cache.get(0, (0, 0), (2, 0), "masks", "octile")[1] is False
+    assert cache.get(0, (0, 0), (1, 0), "masks", "square")[1] is False
+
+    # A version nobody invalidated for drops everything
+    assert cache.get(1, (0, 0), (1, 0), "masks", "octile") == (None, False)
+    assert len(cache) == 0
+
+
+def test_blocker_invalidates_touching_paths_only():
+    cache = PathCache()
+    cache.put(0, (0, 0), (4, 4), "masks", "octile", ((4, 4), (3, 3), (2, 2), (1, 1), (0, 0)))
+    cache.put(0, (0, 9), (4, 9), "masks", "octile", ((4, 9), (3, 9), (2, 9), (1, 9), (0, 9)))
+    cache.put(0, (9, 9), (9, 0), "masks", "octile", None)
+
+    # (3, 2) can close the diagonal step (2, 2) -> (3, 3)
+    cache.invalidate([(3, 2)], True, 1)
+    assert cache.get(1, (0, 0), (4, 4), "masks", "octile")[1] is False
+    assert cache.get(1, (0, 9), (4, 9), "masks", "octile")[1] is True
+    assert cache.get(1, (9, 9), (9, 0), "masks", "octile")[1] is True
+
+    # A removal may open a way to a goal that had none
+    cache.invalidate([(5, 5)], False, 2)
+    assert cache.get(2, (9, 9), (9, 0), "masks", "octile")[1] is False
+    assert cache.get(2, (0, 9), (4, 9), "masks", "octile")[1] is True
+
+
+def test_removal_drops_inexact_heuristics():
+    # Far from both paths, only the optimal engine's entry can be kept
+    path = ((4, 0), (3, 0), (2, 0), (1, 0), (0, 0))
+    cache = PathCache()
+    cache.put(0, (0, 0), (4, 0), "masks", "octile", path)
+    cache.put(0, (0, 0), (4, 0), "masks", "square", path)
+    cache.invalidate([(30, 30)], False, 1)
+    assert cache.get(1, (0, 0), (4, 0), "masks", "octile")[1] is True
+    assert cache.get(1, (0, 0), (4, 0), "masks", "square")[1] is False
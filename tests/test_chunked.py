@@ -0,0 +1,77 @@
+import os
+import random
+
+import pytest
+
+from astar.astar import _make_octile_heuristic, _search_masks
+from astar.masks import build_masks
+from gridmap.chunked import ChunkedGrid, ChunkedMasks
+from gridmap.gridmap import BLOCKED, EMPTY, GridMap
+
+
+def _make_map(col:int, row:int) -> GridMap:
+    grid_map = GridMap(col, row)
+    grid_map.fill_random(0.3, seed=col)
+    return grid_map
+
+
+def test_round_trip(tmp_path):
+    # Sizes that are not multiples of the tile, with a cache smaller than the map
+    grid_map = _make_map(23, 17)
+    path = os.path.join(tmp_path, "map.chg")
+    ChunkedGrid.from_cells(path, 23, 17, grid_map.cells, tile=5, cache_tiles=3).close()
+
+    grid = ChunkedGrid(path, cache_tiles=2)
+    assert (grid.col, grid.row, grid.tile) == (23, 17, 5)
+    assert bytes(grid[i] for i in range(len(grid))) == bytes(grid_map.cells)
+    assert grid.read_rect(-2, 14, 8, 5) == grid_map.read_rect(-2, 14, 8, 5)
+    assert grid.stats.evictions > 0
+
+    rng = random.Random(1)
+    for _ in range(50):
+        x, y = rng.randrange(23), rng.randrange(17)
+        value = BLOCKED if rng.random() < 0.5 else EMPTY
+        grid.set_cell(x, y, value)
+        grid_map.set_cell(x, y, value)
+    # Clipped at both ends, nothing spills onto the next tile row
+    grid.write_row(3, 8, bytes([BLOCKED]) * 30)
+    grid_map.fill_rect(3, 8, 22, 8)
+    grid.write_row(-4, 9, bytes([EMPTY]) * 6)
+    grid_map.fill_rect(0, 9, 1, 9, EMPTY)
+    grid.write_row(0, 17, bytes([BLOCKED]) * 5)
+    grid.close()
+
+    reopened = ChunkedGrid(path)
+    assert reopened.read_rect(0, 0, 23, 17) == bytes(grid_map.cells)
+    reopened.close()
+
+    with open(path, "r+b") as f:
+        f.write(b"XXXX")
+    with pytest.raises(ValueError):
+        ChunkedGrid(path)
+
+
+def test_chunked_masks_match_build_masks(tmp_path):
+    grid_map = _make_map(29, 21)
+    col, row = grid_map.col, grid_map.row
+    grid = ChunkedGrid.from_cells(os.path.join(tmp_path, "map.chg"), col, row, grid_map.cells, tile=6)
+    chunked_masks = ChunkedMasks(grid, cache_tiles=4)
+    assert bytes(chunked_masks[i] for i in range(len(chunked_masks))) == build_masks(col, row, grid_map.cells)
+
+    # An edit on a tile corner has to reach the halo of all four tiles
+    for x, y in ((5, 5), (6, 6), (0, 0), (28, 20)):
+        value = EMPTY if grid_map.is_blocked(x, y) else BLOCKED
+        grid.set_cell(x, y, value)
+        grid_map.set_cell(x, y, value)
+        chunked_masks.update_cell(x, y)
+        assert bytes(chunked_masks[i] for i in range(len(chunked_masks))) == build_masks(col, row, grid_map.cells)
+
+    rng = random.Random(3)
+    masks = build_masks(col, row, grid_map.cells)
+    octile = _make_octile_heuristic(col)
+    for _ in range(20):
+        start = (rng.randrange(col), rng.randrange(row))
+        end = (rng.randrange(col), rng.randrange(row))
+        assert _search_masks(col, row, chunked_masks, start, end, octile) == _search_masks(col, row, masks, start, end, octile)
+
+    grid.close()
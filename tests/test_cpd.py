@@ -0,0 +1,62 @@
+import os
+import random
+
+import pytest
+
+from astar.astar import _make_octile_heuristic, _search_masks
+from astar.cache import _get_path_cost
+from astar.cpd import PathDatabase
+from astar.masks import build_masks
+from gridmap.gridmap import GridMap
+
+
+def _build() -> tuple[GridMap, bytearray, PathDatabase]:
+    grid_map = GridMap(15, 11)
+    grid_map.fill_random(0.3, seed=6)
+    masks = build_masks(grid_map.col, grid_map.row, grid_map.cells)
+    return grid_map, masks, PathDatabase.build(grid_map.col, grid_map.row, masks, workers=2, chunk_size=40)
+
+
+def test_paths_match_search_masks():
+    grid_map, masks, database = _build()
+    col, row = grid_map.col, grid_map.row
+    octile = _make_octile_heuristic(col)
+    free = [i for i in range(col * row) if not grid_map.cells[i]]
+
+    # Every pair of free cells
+    for a in free:
+        for b in free:
+            start, end = (a % col, a // col), (b % col, b // col)
+            expected = _search_masks(col, row, masks, start, end, octile)
+            path = database.get_path(start, end)
+            assert (path is None) == (expected is None)
+            if path is not None:
+                assert path[0] == end and path[-1] == start
+                assert _get_path_cost(path) == _get_path_cost(expected)
+
+
+def test_save_load_round_trip(tmp_path):
+    grid_map, _, database = _build()
+    path = os.path.join(tmp_path, "map.cpd")
+    database.save(path)
+
+    loaded = PathDatabase.load(path)
+    try:
+        assert (loaded.col, loaded.row, len(loaded)) == (database.col, database.row, len(database))
+        assert list(loaded.offsets) == list(database.offsets)
+        assert list(loaded.starts) == list(database.starts)
+        assert bytes(loaded.codes) == bytes(database.codes)
+
+        rng = random.Random(7)
+        for _ in range(200):
+            start = (rng.randrange(grid_map.col), rng.randrange(grid_map.row))
+            end = (rng.randrange(grid_map.col), rng.randrange(grid_map.row))
+            if not grid_map.is_blocked(*start):
+                assert loaded.get_path(start, end) == database.get_path(start, end)
+    finally:
+        loaded.close()
+
+    with open(path, "r+b") as f:
+        f.write(b"XXXX")
+    with pytest.raises(ValueError):
+        PathDatabase.load(path)
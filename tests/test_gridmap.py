@@ -0,0 +1,109 @@
+from collections import deque
+from random import Random
+
+from gridmap.gridmap import BLOCKED, EMPTY, GridMap
+
+
+def _count_reachable(grid, x, y):
+    # 4-connected, maze corridors never need diagonals
+    seen = {(x, y)}
+    queue = deque([(x, y)])
+    while len(queue) > 0:
+        cx, cy = queue.popleft()
+        for nx, ny in ((cx, cy - 1), (cx + 1, cy), (cx, cy + 1), (cx - 1, cy)):
+            if grid.in_bounds(nx, ny) and not grid.is_blocked(nx, ny) and (nx, ny) not in seen:
+                seen.add((nx, ny))
+                queue.append((nx, ny))
+
+    return len(seen)
+
+
+def test_generate_maze():
+    for col, row in ((21, 15), (20, 14), (1, 1), (2, 7)):
+        grid = GridMap(col, row)
+        grid.generate_maze(seed=col)
+
+        # Every even cell is open, odd / odd cells are always walls
+        for y in range(row):
+            for x in range(col):
+                if x % 2 == 0 and y % 2 == 0:
+                    assert not grid.is_blocked(x, y)
+                if x % 2 == 1 and y % 2 == 1:
+                    assert grid.is_blocked(x, y)
+
+        # A perfect maze: all open cells connected, no loops
+        cells = ((col + 1) // 2) * ((row + 1) // 2)
+        open_cells = grid.cells.count(EMPTY)
+        assert open_cells == 2 * cells - 1
+        assert _count_reachable(grid, 0, 0) == open_cells
+
+
+def test_fill_rect_and_read_rect():
+    grid = GridMap(8, 6)
+    version = grid.version
+    grid.fill_rect(6, 4, 2, 1)
+    grid.fill_rect(-5, -5, 0, 0)
+    grid.fill_rect(20, 20, 30, 30)
+    assert grid.version > version
+
+    for y in range(6):
+        for x in range(8):
+            assert grid.is_blocked(x, y) == ((2 <= x <= 6 and 1 <= y <= 4) or (x, y) == (0, 0))
+
+    rect = grid.read_rect(-1, 3, 4, 2)
+    assert rect == bytes([BLOCKED, EMPTY, EMPTY, BLOCKED, BLOCKED, EMPTY, EMPTY, BLOCKED])
+    assert grid.read_rect(10, 10, 2, 2) == bytes([BLOCKED]) * 4
+
+
+def test_flood_fill_matches_bfs():
+    rng = Random(3)
+    for _ in range(20):
+        grid = GridMap(17, 13)
+        grid.fill_random(0.4, seed=rng.randrange(1 << 30))
+        x, y = rng.randrange(17), rng.randrange(13)
+        target = grid.cells[y * 17 + x]
+
+        # 8-connected region of the start cell
+        region = {(x, y)}
+        queue = deque([(x, y)])
+        while len(queue) > 0:
+            cx, cy = queue.popleft()
+            for dx in (-1, 0, 1):
+                for dy in (-1, 0, 1):
+                    nx, ny = cx + dx, cy + dy
+                    if grid.in_bounds(nx, ny) and (nx, ny) not in region and grid.cells[ny * 17 + nx] == target:
+                        region.add((nx, ny))
+                        queue.append((nx, ny))
+
+        before = bytes(grid.cells)
+        value = BLOCKED if target == EMPTY else EMPTY
+        grid.flood_fill(x, y, value)
+        for cy in range(13):
+            for cx in range(17):
+                expected = value if (cx, cy) in region else before[cy * 17 + cx]
+                assert grid.cells[cy * 17 + cx] == expected
+
+
+def test_generate_caves_matches_per_cell_rule():
+    col, row = 23, 11
+    grid = GridMap(col, row)
+    grid.generate_caves(density=0.45, steps=0, seed=5)
+    cells = bytearray(grid.cells)
+
+    # Reference 4-5 rule, outside the map counts as wall
+    for _ in range(3):
+        nxt = bytearray(len(cells))
+        for y in range(row):
+            for x in range(col):
+                walls = 0
+                for dx in (-1, 0, 1):
+                    for dy in (-1, 0, 1):
+                        if dx == 0 and dy == 0:
+                            continue
+                        nx, ny = x + dx, y + dy
+                        walls += 1 if not (0 <= nx < col and 0 <= ny < row) else cells[ny * col + nx]
+                nxt[y * col + x] = BLOCKED if walls >= 5 or (cells[y * col + x] and walls >= 4) else EMPTY
+        cells = nxt
+
+    grid.generate_caves(density=0.45, steps=3, seed=5)
+    assert grid.cells == cells
@@ -0,0 +1,56 @@
+import os
+import random
+
+import pytest
+
+from astar import hda
+from astar.astar import _make_octile_heuristic, _search_masks, make_grid
+from astar.cache import _get_path_cost
+from astar.hda import start_path_finding_hda
+from astar.masks import build_masks
+from gridmap.gridmap import GridMap
+
+
+def test_hda_matches_search_masks():
+    rng = random.Random(5)
+    grid_map = GridMap(30, 22)
+    grid_map.fill_random(0.3, seed=5)
+    col, row = grid_map.col, grid_map.row
+    masks = build_masks(col, row, grid_map.cells)
+    blockers = grid_map.get_blockers()
+    octile = _make_octile_heuristic(col)
+    free = [i for i in range(col * row) if not grid_map.cells[i]]
+
+    # A small ring capacity makes the workers hit full rings
+    for workers, ring_capacity in ((1, 1 << 14), (2, 1 << 14), (3, 16)):
+        for _ in range(3):
+            a, b = rng.choice(free), rng.choice(free)
+            start, end = (a % col, a // col), (b % col, b // col)
+            expected = _search_masks(col, row, masks, start, end, octile)
+            path = start_path_finding_hda(col, row, start, end, blockers, workers=workers, masks=masks, ring_capacity=ring_capacity)
+            assert (path is None) == (expected is None)
+            if path is not None:
+                assert path[0] == end and path[-1] == start
+                assert _get_path_cost(path) == _get_path_cost(expected)
+
+
+_run_worker = hda._hda_worker
+
+
+def _exit_worker(index, *args):
+    # Worker 1 dies at once, the others run normally
+    if index == 1:
+        os._exit(3)
+    _run_worker(index, *args)
+
+
+def test_worker_failure_raises(monkeypatch):
+    masks = build_masks(20, 20, bytes(400))
+    monkeypatch.setattr(hda, "_hda_worker", _exit_worker)
+    with pytest.raises(RuntimeError):
+        start_path_finding_hda(20, 20, (0, 0), (19, 19), (), workers=3, masks=masks)
+
+
+def test_unreachable_goal():
+    masks = build_masks(9, 5, make_grid(9, 5, [(4, y) for y in range(5)]))
+    assert start_path_finding_hda(9, 5, (0, 0), (8, 4), (), workers=2, masks=masks) is None
@@ -0,0 +1,44 @@
+import os
+
+import pytest
+
+from astar.astar import QUEUE_DECREASE, QUEUE_POP, QUEUE_PUSH
+from heap.benchmark import QUEUES, load_traces, record_traces, save_traces
+
+
+def test_traces_round_trip(tmp_path):
+    traces = record_traces(30, 30, 0.25, 4, seed=1)
+    assert all(len(t) > 0 for t in traces)
+    path = os.path.join(tmp_path, "queue.pqt")
+    save_traces(path, traces)
+
+    loaded = load_traces(path)
+    assert len(loaded) == len(traces)
+    for a, b in zip(loaded, traces):
+        assert (a.ops, a.items, a.keys) == (b.ops, b.items, b.keys)
+
+    with open(path, "r+b") as f:
+        f.write(b"NOPE")
+    with pytest.raises(ValueError):
+        load_traces(path)
+
+
+def test_queues_pop_the_same_keys():
+    # Ties may come out in any order, the popped keys may not
+    traces = record_traces(30, 30, 0.3, 5, seed=2)
+    for trace in traces:
+        popped = {}
+        for name, factory in QUEUES.items():
+            queue = factory()
+            keys = {}
+            out = []
+            for op, item, key in zip(trace.ops, trace.items, trace.keys):
+                if op == QUEUE_PUSH or op == QUEUE_DECREASE:
+                    keys[item] = key
+                    (queue.push if op == QUEUE_PUSH else queue.decrease)(item, key)
+                elif op == QUEUE_POP:
+                    out.append(keys[queue.pop()])
+            popped[name] = out
+
+        first = popped.pop("heapq")
+        assert all(out == first for out in popped.values())
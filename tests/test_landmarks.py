@@ -0,0 +1,74 @@
+import os
+import random
+
+import pytest
+
+from astar.astar import _make_octile_heuristic, _search_masks
+from astar.cache import _get_path_cost
+from astar.landmarks import UNREACHABLE, Landmarks, _get_distance_table
+from astar.masks import build_masks
+from gridmap.gridmap import GridMap
+
+
+def _make_map(seed:int) -> GridMap:
+    grid_map = GridMap(28, 20)
+    grid_map.fill_random(0.3, seed=seed)
+    return grid_map
+
+
+def test_distance_table_matches_path_costs():
+    grid_map = _make_map(1)
+    col, row = grid_map.col, grid_map.row
+    masks = build_masks(col, row, grid_map.cells)
+    source = grid_map.cells.find(0)
+    table = _get_distance_table(col, row, masks, source)
+    octile = _make_octile_heuristic(col)
+
+    for cell in range(col * row):
+        path = _search_masks(col, row, masks, (source % col, source // col), (cell % col, cell // col), octile)
+        if path is None:
+            assert table[cell] == UNREACHABLE
+        else:
+            assert table[cell] == _get_path_cost(path)
+
+
+def test_alt_search_matches_search_masks():
+    rng = random.Random(2)
+    for seed in range(4):
+        grid_map = _make_map(seed)
+        col, row = grid_map.col, grid_map.row
+        masks = build_masks(col, row, grid_map.cells)
+        landmarks = Landmarks.build(col, row, grid_map.cells, 4)
+        octile = _make_octile_heuristic(col)
+
+        for _ in range(25):
+            a = (rng.randrange(col), rng.randrange(row))
+            b = (rng.randrange(col), rng.randrange(row))
+            expected = _search_masks(col, row, masks, a, b, octile)
+            path = _search_masks(col, row, masks, a, b, landmarks.cell_heuristic)
+            assert (path is None) == (expected is None)
+            if path is not None:
+                assert _get_path_cost(path) == _get_path_cost(expected)
+
+
+def test_save_load_round_trip(tmp_path):
+    grid_map = _make_map(3)
+    landmarks = Landmarks.build(grid_map.col, grid_map.row, grid_map.cells, 3)
+    path = os.path.join(tmp_path, "map.alt")
+    landmarks.save(path)
+
+    loaded = Landmarks.load(path, grid_map.col, grid_map.row)
+    assert (loaded.col, loaded.row) == (grid_map.col, grid_map.row)
+    assert loaded.landmarks == landmarks.landmarks
+    assert loaded.tables == landmarks.tables
+
+    # A table for another map size is refused
+    with pytest.raises(ValueError):
+        Landmarks.load(path, grid_map.col + 1, grid_map.row)
+    with pytest.raises(ValueError):
+        Landmarks.load(path, grid_map.col, grid_map.row - 1)
+
+    with open(path, "r+b") as f:
+        f.write(b"XXXX")
+    with pytest.raises(ValueError):
+        Landmarks.load(path, grid_map.col, grid_map.row)
@@ -0,0 +1,55 @@
+import random
+
+from astar.astar import _make_octile_heuristic, _octile_xy, _search_grid, _search_masks, start_path_finding, start_path_finding_heapq
+from astar.cache import _get_path_cost
+from astar.masks import MoveMasks, _get_cell_mask, build_masks
+from gridmap.gridmap import BLOCKED, EMPTY, GridMap
+
+
+def _octile_pt(a, b):
+    return _octile_xy(a.x - b.x, a.y - b.y)
+
+
+def test_build_masks_matches_cell_masks():
+    for col, row, density in ((1, 1, 0.0), (7, 1, 0.3), (1, 9, 0.3), (23, 17, 0.1), (23, 17, 0.4), (16, 16, 0.7)):
+        grid_map = GridMap(col, row)
+        grid_map.fill_random(density, seed=col * row)
+        masks = build_masks(col, row, grid_map.cells)
+        assert list(masks) == [_get_cell_mask(col, row, grid_map.cells, i) for i in range(col * row)]
+
+
+def test_update_cell_matches_rebuild():
+    rng = random.Random(1)
+    grid_map = GridMap(19, 13)
+    move_masks = MoveMasks(grid_map.col, grid_map.row, grid_map.cells)
+    for _ in range(200):
+        x, y = rng.randrange(19), rng.randrange(13)
+        grid_map.set_cell(x, y, EMPTY if grid_map.is_blocked(x, y) else BLOCKED)
+        move_masks.update_cell(x, y)
+        assert move_masks.masks == build_masks(19, 13, grid_map.cells)
+
+
+def test_engines_match_search_masks():
+    rng = random.Random(2)
+    for seed in range(6):
+        grid_map = GridMap(26, 19)
+        grid_map.fill_random(0.3, seed=seed)
+        col, row = grid_map.col, grid_map.row
+        masks = build_masks(col, row, grid_map.cells)
+        blockers = grid_map.get_blockers()
+        octile = _make_octile_heuristic(col)
+
+        for _ in range(10):
+            start = (rng.randrange(col), rng.randrange(row))
+            end = (rng.randrange(col), rng.randrange(row))
+            expected = _search_masks(col, row, masks, start, end, octile)
+            assert _search_grid(col, row, grid_map.cells, start, end, octile) == expected
+
+            # PfNode engines, with and without the prebuilt masks
+            for engine in (start_path_finding, start_path_finding_heapq):
+                for engine_masks in (None, masks):
+                    path = engine(col, row, start, end, blockers, _octile_pt, masks=engine_masks)
+                    assert (path is None) == (expected is None)
+                    if path is not None:
+                        assert path[0] == end and path[-1] == start
+                        assert _get_path_cost(path) == _get_path_cost(expected)
@@ -0,0 +1,47 @@
+import random
+
+from astar.astar import _make_octile_heuristic, _octile_xy, _search_masks
+from astar.cache import _get_path_cost
+from astar.masks import build_masks
+from astar.multigoal import _KDTree, _search_nearest
+from gridmap.gridmap import GridMap
+
+
+def test_kd_tree_matches_scan():
+    rng = random.Random(1)
+    points = [(rng.randrange(100), rng.randrange(100)) for _ in range(60)]
+    tree = _KDTree(points)
+    for _ in range(300):
+        x, y = rng.randrange(-10, 110), rng.randrange(-10, 110)
+        assert tree.nearest(x, y) == min(_octile_xy(x - px, y - py) for px, py in points)
+
+
+def test_nearest_matches_cheapest_single_search():
+    rng = random.Random(2)
+    for seed in range(6):
+        grid_map = GridMap(27, 20)
+        grid_map.fill_random(0.3, seed=seed)
+        if seed % 2:
+            grid_map.fill_cost_rect(3, 3, 15, 15, 4)
+        col, row = grid_map.col, grid_map.row
+        masks = build_masks(col, row, grid_map.cells)
+        costs = grid_map.costs if seed % 2 else None
+        octile = _make_octile_heuristic(col)
+
+        for count in (1, 5, 20):
+            start = (rng.randrange(col), rng.randrange(row))
+            targets = [(rng.randrange(col), rng.randrange(row)) for _ in range(count)]
+            best = None
+            for target in targets:
+                path = _search_masks(col, row, masks, start, target, octile, costs=costs)
+                if path is not None and (best is None or _get_path_cost(path, col, costs) < best):
+                    best = _get_path_cost(path, col, costs)
+
+            # Same answer through the plain scan and the KD-tree heuristic
+            for use_kd_tree in (False, True):
+                result = _search_nearest(col, row, masks, start, targets, use_kd_tree, costs=costs)
+                assert (result is None) == (best is None)
+                if result is not None:
+                    target, path = result
+                    assert target in targets and path[0] == target and path[-1] == start
+                    assert _get_path_cost(path, col, costs) == best
@@ -0,0 +1,37 @@
+import os
+import pstats
+import tracemalloc
+
+from astar.masks import build_masks
+from astar.telemetry import ENGINES, run_nearest_search, run_search
+from timing.profiling import Profiler, get_query_tag
+
+
+def test_query_tag_keeps_small_values():
+    tag = get_query_tag({"col": 30, "start": (1, 2), "masks": bytearray(4), "recorder": None, "engine": "Masks / octile"})
+    assert tag == "col=30-start=1_2-engine=Masks_octile"
+
+
+def test_sampling_one_in_n(tmp_path):
+    profiler = Profiler(3, str(tmp_path))
+    results = [profiler.run("square", {"x": i}, lambda v: v * v, i) for i in range(9)]
+    assert results == [i * i for i in range(9)]
+    assert len(profiler.saved) == 3
+    assert profiler.calls == 9
+
+
+def test_telemetry_profiles_only_its_own_pass(tmp_path):
+    # The timed and counted runs go through undecorated engines, so every
+    # query is seen by the profiler exactly once
+    masks = build_masks(20, 20, bytes(400))
+    profiler = Profiler(1, str(tmp_path))
+    for engine in ENGINES:
+        run_search(engine, 20, 20, (0, 0), (19, 12), masks, profiler=profiler)
+    run_nearest_search(20, 20, (0, 0), [(19, 12), (3, 17)], masks, profiler=profiler)
+
+    assert profiler.calls == len(ENGINES) + 1
+    assert len(profiler.saved) == len(ENGINES) + 1
+    for base in profiler.saved:
+        assert "start=0_0" in os.path.basename(base)
+        assert pstats.Stats(f"{base}.pstats").total_calls > 0
+        assert isinstance(tracemalloc.Snapshot.load(f"{base}.tracemalloc"), tracemalloc.Snapshot)
@@ -0,0 +1,94 @@
+import asyncio
+import json
+import os
+
+import pytest
+
+from astar.astar import _make_octile_heuristic, _search_masks
+from astar.masks import build_masks
+from gridmap.chunked import ChunkedGrid
+from server.server import PathServer
+
+COL = 12
+ROW = 9
+
+
+@pytest.fixture
+def server(tmp_path):
+    cells = bytearray(COL * ROW)
+    for y in range(1, ROW):
+        cells[y * COL + 5] = 1
+
+    ChunkedGrid.from_cells(os.path.join(tmp_path, "walls.chg"), COL, ROW, cells, tile=4).close()
+    path_server = PathServer([os.path.join(tmp_path, "walls.chg")], workers=1)
+    yield path_server, cells
+    path_server.close()
+
+
+@pytest.mark.parametrize("point", [
+    [True, False],
+    [1.0, 2],
+    ["1", 2],
+    [1],
+    [1, 2, 3],
+    None,
+    {"x": 1, "y": 2},
+    [-1, 0],
+    [COL, 0],
+])
+def test_parse_query_rejects_bad_points(server, point):
+    path_server, _ = server
+    with pytest.raises(ValueError):
+        path_server._parse_query({"map": "walls", "start": point, "end": [0, 0]})
+    with pytest.raises(ValueError):
+        path_server._parse_query({"map": "walls", "start": [0, 0], "end": point})
+
+
+def test_parse_query(server):
+    path_server, _ = server
+    assert path_server._parse_query({"map": "walls", "start": [0, 8], "end": [11, 8]}) == ("walls", (0, 8), (11, 8), "square")
+    with pytest.raises(ValueError):
+        path_server._parse_query({"map": "other", "start": [0, 0], "end": [1, 1]})
+    with pytest.raises(ValueError):
+        path_server._parse_query({"map": "walls", "start": [0, 0], "end": [1, 1], "heuristic": "manhattan"})
+
+
+def test_protocol(server, tmp_path):
+    path_server, cells = server
+    sock_path = os.path.join(tmp_path, "astar.sock")
+
+    async def run():
+        task = asyncio.create_task(path_server.serve_unix(sock_path))
+        while not os.path.exists(sock_path):
+            await asyncio.sleep(0.01)
+
+        reader, writer = await asyncio.open_unix_connection(sock_path)
+        requests = [
+            {"id": 1, "op": "maps"},
+            {"id": 2, "map": "walls", "start": [0, 8], "end": [11, 8], "heuristic": "octile"},
+            {"id": 3, "map": "walls", "start": [True, False], "end": [11, 8]},
+        ]
+        for request in requests:
+            writer.write(json.dumps(request).encode() + b"\n")
+        writer.write(b"[1, 2]\n")
+        await writer.drain()
+
+        responses = {}
+        for _ in range(len(requests) + 1):
+            response = json.loads(await reader.readline())
+            responses[response["id"]] = response
+
+        writer.close()
+        await writer.wait_closed()
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return responses
+
+    responses = asyncio.run(run())
+
+    masks = build_masks(COL, ROW, cells)
+    expected = _search_masks(COL, ROW, masks, (0, 8), (11, 8), _make_octile_heuristic(COL))
+    assert responses[1]["maps"] == {"walls": [COL, ROW]}
+    assert [tuple(p) for p in responses[2]["path"]] == list(expected)
+    assert "error" in responses[3]
+    assert "error" in responses[None]
@@ -0,0 +1,73 @@
+import random
+
+from astar.astar import FOUND, NO_PATH, SEARCHING, _make_octile_heuristic, _search_masks, make_grid
+from astar.masks import build_masks
+from astar.sliced import SliceScheduler, begin
+from gridmap.gridmap import GridMap
+
+
+def _make_map(seed:int, col:int = 40, row:int = 30) -> GridMap:
+    rng = random.Random(seed)
+    grid_map = GridMap(col, row)
+    grid_map.fill_random(rng.choice((0.1, 0.25, 0.4)), seed=seed)
+    if seed % 3 == 0:
+        grid_map.fill_cost_rect(5, 5, 20, 20, 4)
+    return grid_map
+
+
+def test_steps_match_one_shot_search():
+    rng = random.Random(3)
+    for seed in range(40):
+        grid_map = _make_map(seed)
+        col, row = grid_map.col, grid_map.row
+        masks = build_masks(col, row, grid_map.cells)
+        costs = grid_map.costs if seed % 3 == 0 else None
+        heuristic = _make_octile_heuristic(col) if seed % 2 else None
+        start = (rng.randrange(col), rng.randrange(row))
+        end = (rng.randrange(col), rng.randrange(row))
+        expected = _search_masks(col, row, masks, start, end, heuristic, costs=costs)
+
+        handle = begin(col, row, masks, start, end, heuristic, costs=costs)
+        while handle.step(max_expansions=rng.randint(1, 7)) == SEARCHING:
+            pass
+        assert handle.path == expected
+        assert handle.status == (NO_PATH if expected is None else FOUND)
+
+        timed = begin(col, row, masks, start, end, heuristic, costs=costs)
+        while timed.step(max_ns=20_000) == SEARCHING:
+            pass
+        assert timed.path == expected
+
+
+def test_step_budget_and_cancel():
+    masks = build_masks(50, 50, bytes(2500))
+    handle = begin(50, 50, masks, (0, 0), (49, 30))
+    assert handle.step(max_expansions=5) == SEARCHING
+    assert handle.expanded == 5
+    handle.cancel()
+    assert handle.done and handle.status == NO_PATH and handle.path is None
+    assert handle.step() == NO_PATH
+
+
+def test_scheduler_shares_by_priority():
+    col, row = 120, 120
+    masks = build_masks(col, row, make_grid(col, row, [(60, y) for y in range(119)]))
+    finished = []
+    scheduler = SliceScheduler(8)
+    low = [scheduler.submit(begin(col, row, masks, (0, i), (119, i)), 1, finished.append) for i in range(3)]
+    high = scheduler.submit(begin(col, row, masks, (0, 50), (119, 50)), 4, finished.append)
+
+    # Slices are a fixed number of expansions, so the shares do not depend
+    # on how fast the frames run
+    while high.expanded < 800:
+        scheduler.run_frame(1_000_000)
+    assert not any(h.done for h in low + [high])
+    assert 3 <= high.expanded / min(h.expanded for h in low) <= 5
+
+    scheduler.cancel(low[0])
+    while len(scheduler) > 0:
+        scheduler.run_frame(1_000_000)
+
+    assert low[0].status == NO_PATH
+    assert all(h.status == FOUND for h in low[1:] + [high])
+    assert sorted(map(id, finished)) == sorted(map(id, low[1:] + [high]))
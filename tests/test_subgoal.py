@@ -0,0 +1,82 @@
+import os
+import random
+
+import pytest
+
+from astar.astar import _make_octile_heuristic, _search_masks
+from astar.cache import _get_path_cost
+from astar.masks import GRID_STEPS, build_masks
+from astar.subgoal import SubgoalGraph
+from gridmap.gridmap import GridMap
+
+
+def _make_maps():
+    for seed in range(3):
+        grid_map = GridMap(31, 23)
+        grid_map.fill_random((0.1, 0.25, 0.4)[seed], seed=seed)
+        yield grid_map
+
+    grid_map = GridMap(31, 23)
+    grid_map.generate_caves(seed=4)
+    yield grid_map
+
+    grid_map = GridMap(31, 23)
+    grid_map.generate_maze(seed=5)
+    yield grid_map
+
+
+def _assert_walkable(col, masks, path):
+    # Every step is a move the masks allow
+    for a, b in zip(path[1:], path):
+        steps = [(dx, dy) for _, dx, dy, _ in GRID_STEPS]
+        k = steps.index((b[0] - a[0], b[1] - a[1]))
+        assert masks[a[1] * col + a[0]] & (1 << k)
+
+
+def test_find_path_matches_search_masks():
+    rng = random.Random(6)
+    for grid_map in _make_maps():
+        col, row = grid_map.col, grid_map.row
+        masks = build_masks(col, row, grid_map.cells)
+        graph = SubgoalGraph.build(col, row, grid_map.cells)
+        octile = _make_octile_heuristic(col)
+        free = [i for i in range(col * row) if not grid_map.cells[i]]
+
+        for _ in range(60):
+            a, b = rng.choice(free), rng.choice(free)
+            start, end = (a % col, a // col), (b % col, b // col)
+            expected = _search_masks(col, row, masks, start, end, octile)
+            path = graph.find_path(start, end)
+            assert (path is None) == (expected is None)
+            if path is None:
+                continue
+
+            assert path[0] == end and path[-1] == start
+            _assert_walkable(col, masks, path)
+            assert _get_path_cost(path) == _get_path_cost(expected)
+
+        # Blocked ends, the masks of a blocked cell still allow its moves
+        blocked = [i for i in range(col * row) if grid_map.cells[i]]
+        for _ in range(20):
+            a, b = rng.choice(blocked), rng.choice(free + blocked)
+            if rng.random() < 0.5:
+                a, b = b, a
+            assert graph.find_path((a % col, a // col), (b % col, b // col)) is None
+
+
+def test_save_load_round_trip(tmp_path):
+    grid_map = GridMap(25, 19)
+    grid_map.generate_caves(seed=2)
+    graph = SubgoalGraph.build(grid_map.col, grid_map.row, grid_map.cells)
+    path = os.path.join(tmp_path, "map.sgr")
+    graph.save(path)
+
+    loaded = SubgoalGraph.load(path)
+    assert (loaded.col, loaded.row, loaded.grid) == (graph.col, graph.row, graph.grid)
+    for name in ("subgoals", "offsets", "targets", "costs"):
+        assert getattr(loaded, name) == getattr(graph, name)
+
+    with open(path, "r+b") as f:
+        f.write(b"SGR1")
+    with pytest.raises(ValueError):
+        SubgoalGraph.load(path)
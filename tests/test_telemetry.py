@@ -0,0 +1,54 @@
+from astar.astar import _make_octile_heuristic, _make_square_heuristic, _search_masks
+from astar.cache import PathCache
+from astar.masks import build_masks
+from astar.telemetry import ENGINE_HEURISTICS, ENGINES, compare_engines, run_search
+from gridmap.gridmap import GridMap
+
+
+def _make_map() -> GridMap:
+    grid_map = GridMap(24, 18)
+    grid_map.fill_random(0.25, seed=8)
+    grid_map.fill_cost_rect(4, 4, 12, 12, 3)
+    grid_map.set_cell(1, 1, 0)
+    grid_map.set_cell(22, 16, 0)
+    return grid_map
+
+
+def test_engines_report_their_search():
+    grid_map = _make_map()
+    col, row = grid_map.col, grid_map.row
+    masks = build_masks(col, row, grid_map.cells)
+    start, end = (1, 1), (22, 16)
+    expected = {
+        "Masks / square": _search_masks(col, row, masks, start, end, _make_square_heuristic(col), costs=grid_map.costs),
+        "Masks / octile": _search_masks(col, row, masks, start, end, _make_octile_heuristic(col), costs=grid_map.costs),
+    }
+
+    results = compare_engines(list(ENGINES), col, row, start, end, masks, costs=grid_map.costs)
+    assert len(results) == len(ENGINES)
+    for engine, (path, stats) in zip(ENGINES, results):
+        assert stats.engine == engine
+        assert path is not None and path[0] == end and path[-1] == start
+        assert stats.path_length == len(path)
+        assert stats.expanded > 0 and stats.peak_open > 0
+        if engine in expected:
+            assert path == expected[engine]
+
+
+def test_cached_search():
+    grid_map = _make_map()
+    col, row = grid_map.col, grid_map.row
+    masks = build_masks(col, row, grid_map.cells)
+    cache = PathCache()
+    engine = "Masks / octile"
+    assert ENGINE_HEURISTICS[engine] == "octile"
+
+    path, stats = run_search(engine, col, row, (1, 1), (22, 16), masks, cache, grid_map.version, grid_map.costs)
+    cached, cached_stats = run_search(engine, col, row, (1, 1), (22, 16), masks, cache, grid_map.version, grid_map.costs)
+    assert cached == path
+    assert cached_stats.engine == f"{engine} (cached)" and cached_stats.expanded == 0
+    assert cache.stats.hits == 1
+
+    # Another version is a miss
+    _, stats = run_search(engine, col, row, (1, 1), (22, 16), masks, cache, grid_map.version + 1, grid_map.costs)
+    assert stats.engine == engine
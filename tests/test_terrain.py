@@ -0,0 +1,79 @@
+import heapq
+import random
+
+from astar.astar import _make_octile_heuristic, _octile_xy, _search_masks, get_min_cost, start_path_finding, start_path_finding_heapq
+from astar.cache import _get_path_cost
+from astar.masks import build_masks, get_delta_table
+from gridmap.gridmap import PLAIN, GridMap
+
+
+def _octile_pt(a, b):
+    return _octile_xy(a.x - b.x, a.y - b.y)
+
+
+def _get_costs_from(col, masks, costs, source):
+    # Reference Dijkstra, every step scaled by the cost of the cell it enters
+    dist = {source: 0}
+    open_heap = [(0, source)]
+    while len(open_heap) > 0:
+        d, curr = heapq.heappop(open_heap)
+        if d > dist[curr]:
+            continue
+        for delta, cost in get_delta_table(col)[masks[curr]]:
+            child = curr + delta
+            new_d = d + cost * costs[child]
+            if new_d < dist.get(child, new_d + 1):
+                dist[child] = new_d
+                heapq.heappush(open_heap, (new_d, child))
+
+    return dist
+
+
+def test_cost_layer_edits():
+    grid_map = GridMap(6, 4)
+    assert grid_map.costs == bytes([PLAIN]) * 24
+    grid_map.fill_cost_rect(4, 3, 1, 1, 7)
+    assert grid_map.read_cost_rect(0, 0, 6, 4) == bytes([1] * 6 + [1, 7, 7, 7, 7, 1] * 3)
+    assert grid_map.read_cost_rect(-1, 3, 2, 2) == bytes([1, 1, 1, 1])
+    assert get_min_cost(grid_map.costs) == 1
+
+    grid_map.fill_cost_rect(0, 0, 5, 3, 3)
+    assert get_min_cost(grid_map.costs) == 3
+    version = grid_map.version
+    grid_map.clear_costs()
+    assert grid_map.costs == bytes([PLAIN]) * 24 and grid_map.version > version
+
+
+def test_weighted_searches_are_optimal():
+    rng = random.Random(3)
+    for seed in range(4):
+        grid_map = GridMap(25, 18)
+        grid_map.fill_random(0.2, seed=seed)
+        for _ in range(6):
+            x, y = rng.randrange(25), rng.randrange(18)
+            grid_map.fill_cost_rect(x, y, x + rng.randrange(8), y + rng.randrange(8), rng.randint(2, 9))
+        if seed % 2:
+            # No plain ground left, the heuristic scale is above one
+            grid_map.costs[:] = bytes(max(c, 2) for c in grid_map.costs)
+
+        col, row = grid_map.col, grid_map.row
+        masks = build_masks(col, row, grid_map.cells)
+        costs = grid_map.costs
+        blockers = grid_map.get_blockers()
+        free = [i for i in range(col * row) if not grid_map.cells[i]]
+
+        for _ in range(5):
+            a = rng.choice(free)
+            dist = _get_costs_from(col, masks, costs, a)
+            for _ in range(5):
+                b = rng.choice(free)
+                start, end = (a % col, a // col), (b % col, b // col)
+                paths = [
+                    _search_masks(col, row, masks, start, end, _make_octile_heuristic(col), costs=costs),
+                    start_path_finding(col, row, start, end, blockers, _octile_pt, masks=masks, costs=costs),
+                    start_path_finding_heapq(col, row, start, end, blockers, _octile_pt, costs=costs),
+                ]
+                for path in paths:
+                    assert (path is None) == (b not in dist)
+                    if path is not None:
+                        assert _get_path_cost(path, col, costs) == dist[b]
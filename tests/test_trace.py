@@ -0,0 +1,48 @@
+import random
+from array import array
+
+import pytest
+
+from astar.astar import _make_octile_heuristic, _search_masks, make_grid
+from astar.masks import build_masks
+from astar.trace import EVENT_CLOSE, SearchTrace, _decode_cells, _encode_cells, record_search
+
+
+def test_varint_deltas_round_trip():
+    rng = random.Random(7)
+    cells = array("I", [0, 0, 1, 0, 127, 128, 64, 16383, 16384, 0, 0xFFFFFFFF, 0, 0x7FFFFFFF])
+    cells.extend(rng.randrange(1 << 32) for _ in range(500))
+    cells.extend(rng.randrange(50) for _ in range(500))
+
+    encoded = _encode_cells(cells)
+    assert _decode_cells(encoded, len(cells)) == cells
+
+
+def test_small_deltas_stay_one_byte():
+    cells = array("I", range(100, 150))
+    assert len(_encode_cells(cells)) == 2 + 49
+    assert _encode_cells(array("I", [1, 0])) == bytes([2, 1])
+
+
+def test_trace_file_round_trip(tmp_path):
+    col, row = 30, 20
+    rng = random.Random(2)
+    masks = build_masks(col, row, make_grid(col, row, {(rng.randrange(col), rng.randrange(row)) for _ in range(120)}))
+    start, end = (0, 0), (29, 19)
+
+    path, trace = record_search(col, row, masks, start, end, _make_octile_heuristic(col))
+    assert path == _search_masks(col, row, masks, start, end, _make_octile_heuristic(col))
+    assert len(trace) > 0 and trace.kinds.count(EVENT_CLOSE) == len(trace.get_expansions())
+
+    trace.save(str(tmp_path / "search.trc"))
+    loaded = SearchTrace.load(str(tmp_path / "search.trc"))
+    assert (loaded.col, loaded.row, loaded.start, loaded.end) == (col, row, start, end)
+    assert loaded.kinds == trace.kinds
+    assert loaded.cells == trace.cells
+
+
+def test_load_rejects_other_files(tmp_path):
+    path = tmp_path / "other.trc"
+    path.write_bytes(bytes(64))
+    with pytest.raises(ValueError):
+        SearchTrace.load(str(path))